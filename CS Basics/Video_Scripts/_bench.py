@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""Benchmarks for the generator and the repo tooling on a synthetic, scaled-up corpus.
+
+    python _bench.py run [--scale 10] [--scale 100] [--out FILE] [--workdir DIR]
+    python _bench.py compare OLD.json NEW.json
+
+"run" builds a corpus of N copies of Section0-6 and Video_Scripts (headings and
+topic numbers varied per copy so the index vocabulary grows too), then times
+each stage in a fresh subprocess with its own scratch cache:
+
+    generate      render every Topic script through the generator into a directory
+    parse         stream every markdown file through the section parser
+    index_build   cold build of the search index
+    index_update  no-op update of the same index
+    query         phrase-query latency against the built index
+
+Peak RSS comes from the stage's own process. Results go to
+.cache/bench/<commit>.json unless --out is given; "compare" diffs two such files.
+"""
+
+import argparse
+import json
+import os
+import platform
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from _fsutil import CACHE_DIR, REPO_ROOT, VIDEO_SCRIPTS_DIR, atomic_write, corpus_files
+
+CORPUS_RE = re.compile(r"^(?:Section[0-6]/|CS Basics/Video_Scripts/)[^/]+\.md$")
+TOPIC_RE = re.compile(r"^Topic_(\d+)_")
+HEADING_RE = re.compile(rb"^(#{1,6} .*?)[ \t]*$", re.M)
+# Keeps synthetic topic numbers unique across copies
+TOPIC_STRIDE = 1000
+
+QUERIES = ("consistent hashing", "rate limiter", "cache invalidation", "leader election",
+           "back pressure", "two phase commit", "read replica", "idempotency key")
+
+STAGES = {
+    "generate": """
+from _generate_scripts import render_topics
+from _sinks import DirectorySink
+from _topic_registry import discover_topics, select_topics
+sources = select_topics(discover_topics(os.path.join(ROOT, "CS Basics", "Video_Scripts")))
+start = time.perf_counter()
+results = render_topics(sources, DirectorySink(os.path.join(WORK, "generated")), {}, False, 1)
+seconds = time.perf_counter() - start
+nbytes = sum(os.path.getsize(s.path) for s in sources)
+report(seconds, files=len(results), bytes=nbytes, mb_per_s=nbytes / seconds / 1e6)
+""",
+    "parse": """
+from _fsutil import corpus_files
+from _mdsections import iter_sections
+start = time.perf_counter()
+files = corpus_files(ROOT)
+sections = nbytes = 0
+for rel in files:
+    for s in iter_sections(os.path.join(ROOT, rel)):
+        sections += 1
+        nbytes += s.end - s.start
+seconds = time.perf_counter() - start
+report(seconds, files=len(files), sections=sections, mb_per_s=nbytes / seconds / 1e6)
+""",
+    "index_build": """
+from _search_index import INDEX_PATH, update_index
+start = time.perf_counter()
+changed, _ = update_index(ROOT)
+report(time.perf_counter() - start, files=len(changed), index_bytes=os.path.getsize(INDEX_PATH))
+""",
+    "index_update": """
+from _search_index import update_index
+start = time.perf_counter()
+changed, _ = update_index(ROOT)
+report(time.perf_counter() - start, files=len(changed))
+""",
+    "query": """
+from _search_index import SearchIndex
+index = SearchIndex()
+latencies = []
+start = time.perf_counter()
+for _ in range(20):
+    for q in QUERIES:
+        t = time.perf_counter()
+        index.search(q)
+        latencies.append(time.perf_counter() - t)
+seconds = time.perf_counter() - start
+latencies.sort()
+pick = lambda p: latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000
+report(seconds, queries=len(latencies), p50_ms=pick(0.5), p95_ms=pick(0.95), max_ms=latencies[-1] * 1000)
+""",
+}
+
+PRELUDE = """
+import json, os, sys, time
+ROOT, WORK = sys.argv[1], sys.argv[2]
+QUERIES = json.loads(sys.argv[3])
+def report(seconds, **extra):
+    print(json.dumps(dict(extra, seconds=seconds)))
+"""
+
+
+def _vary(data, copy):
+    """Copy `copy` of a file: every heading gets a per-copy suffix, so terms and anchors differ."""
+    if copy == 0:
+        return data
+    suffix = f" v{copy}".encode()
+    return HEADING_RE.sub(lambda m: m.group(1) + suffix, data)
+
+
+def build_corpus(dest, scale, root=REPO_ROOT):
+    """Write scale copies of the benchmark corpus under dest; returns (files, bytes)."""
+    files = nbytes = 0
+    for rel in corpus_files(root):
+        if not CORPUS_RE.match(rel):
+            continue
+        with open(os.path.join(root, rel), "rb") as f:
+            data = f.read()
+        directory, name = os.path.split(rel)
+        os.makedirs(os.path.join(dest, directory), exist_ok=True)
+        stem = name[:-3]
+        for copy in range(scale):
+            m = TOPIC_RE.match(name)
+            if m:
+                out = f"Topic_{int(m.group(1)) + copy * TOPIC_STRIDE}_{name[m.end():]}"
+            else:
+                out = name if copy == 0 else f"{stem}_x{copy:03d}.md"
+            body = _vary(data, copy)
+            with open(os.path.join(dest, directory, out), "wb") as f:
+                f.write(body)
+            files += 1
+            nbytes += len(body)
+    return files, nbytes
+
+
+def run_stage(name, root, work):
+    """Run one stage in a child process; returns its report plus peak RSS in KiB."""
+    env = dict(os.environ, VIDEO_SCRIPTS_CACHE=os.path.join(work, "cache"), PYTHONDONTWRITEBYTECODE="1")
+    proc = subprocess.Popen([sys.executable, "-c", PRELUDE + STAGES[name], root, work, json.dumps(QUERIES)],
+                            cwd=VIDEO_SCRIPTS_DIR, env=env, stdout=subprocess.PIPE)
+    out = proc.stdout.read()
+    proc.stdout.close()
+    _, status, usage = os.wait4(proc.pid, 0)
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    if proc.returncode:
+        raise SystemExit(f"stage {name} failed with exit code {proc.returncode}")
+    result = json.loads(out.decode().strip().splitlines()[-1])
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    result["max_rss_kb"] = usage.ru_maxrss // (1024 if sys.platform == "darwin" else 1)
+    return result
+
+
+def git_commit():
+    try:
+        head = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=REPO_ROOT,
+                               capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown", False
+    return head, bool(dirty)
+
+
+def run(scales, out, workdir=None, keep=False):
+    commit, dirty = git_commit()
+    results = {"commit": commit, "dirty": dirty, "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+               "python": platform.python_version(), "machine": platform.machine(),
+               "cpus": os.cpu_count(), "scales": {}}
+    base = workdir or tempfile.mkdtemp(prefix="vs-bench-")
+    try:
+        for scale in scales:
+            work = os.path.join(base, f"x{scale}")
+            shutil.rmtree(work, ignore_errors=True)
+            root = os.path.join(work, "corpus")
+            start = time.perf_counter()
+            files, nbytes = build_corpus(root, scale)
+            print(f"x{scale}: {files} files, {nbytes / 1e6:.1f} MB built in {time.perf_counter() - start:.1f} s",
+                  file=sys.stderr)
+            stages = {}
+            for name in STAGES:
+                stages[name] = run_stage(name, root, work)
+                print(f"  {name:<13} {stages[name]['seconds'] * 1000:10.1f} ms  "
+                      f"{stages[name]['max_rss_kb'] / 1024:8.1f} MiB peak", file=sys.stderr)
+            results["scales"][str(scale)] = {"files": files, "bytes": nbytes, "stages": stages}
+            if not keep:
+                shutil.rmtree(work, ignore_errors=True)
+    finally:
+        if not keep and workdir is None:
+            shutil.rmtree(base, ignore_errors=True)
+    out = out or os.path.join(CACHE_DIR, "bench", f"{commit}{'-dirty' if dirty else ''}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    atomic_write(out, (json.dumps(results, indent=2, sort_keys=True) + "\n").encode("utf-8"))
+    print(f"Wrote {out}", file=sys.stderr)
+
+
+def compare(old_path, new_path):
+    with open(old_path, encoding="utf-8") as f:
+        old = json.load(f)
+    with open(new_path, encoding="utf-8") as f:
+        new = json.load(f)
+    print(f"{old['commit']} -> {new['commit']}")
+    for scale in sorted(set(old["scales"]) & set(new["scales"]), key=int):
+        print(f"x{scale}:")
+        before, after = old["scales"][scale]["stages"], new["scales"][scale]["stages"]
+        for name in [n for n in STAGES if n in before and n in after]:
+            parts = []
+            for key, unit, factor in (("seconds", "ms", 1000), ("max_rss_kb", "MiB", 1 / 1024)):
+                a, b = before[name][key], after[name][key]
+                change = f"{(b - a) / a * 100:+.1f}%" if a else "n/a"
+                parts.append(f"{a * factor:9.1f} -> {b * factor:9.1f} {unit} ({change})")
+            print(f"  {name:<13} " + "   ".join(parts))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("run", help="build the synthetic corpus and time every stage")
+    p.add_argument("--scale", type=int, action="append", metavar="N",
+                   help="corpus multiplier (repeatable; default 10)")
+    p.add_argument("--out", metavar="FILE", help="results file (default .cache/bench/<commit>.json)")
+    p.add_argument("--workdir", metavar="DIR", help="where to build the corpus (default: a temp dir)")
+    p.add_argument("--keep", action="store_true", help="leave the synthetic corpus and caches in place")
+    p = sub.add_parser("compare", help="diff two results files")
+    p.add_argument("old")
+    p.add_argument("new")
+    args = parser.parse_args(argv)
+    if args.command == "run":
+        if any(n < 1 for n in args.scale or []):
+            parser.error("--scale must be >= 1")
+        run(args.scale or [10], args.out, args.workdir, args.keep)
+    else:
+        compare(args.old, args.new)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""Persistent catalog of the video series, keyed by topic number.
+
+    python _catalog.py update        # refresh from the Topic_*.md files (changed files only)
+    python _catalog.py show N        # one topic
+    python _catalog.py next N | prev N
+    python _catalog.py next-free
+    python _catalog.py check         # duplicate numbers, and gaps against the series plan; exits 1 on duplicates
+    python _catalog.py list
+
+Each script contributes its number, slug, title, level, stated length and
+content hash; the planned titles come from YouTube_Video_Series_Topics.md.
+The catalog lives in .cache/catalog/; loading it builds dict lookups by number
+and position, so queries never list the directory. "update" re-reads only files whose stat
+changed, and the generator refreshes the entries for the outputs it writes
+once a full scan has built the catalog.
+"""
+
+import os
+import re
+import sys
+from collections import namedtuple
+
+from _fsutil import SERIES_PLAN_PATH, VIDEO_SCRIPTS_DIR, load_cache, refresh_per_file, save_cache
+from _script_model import LENGTH_RE, LEVEL_RE
+from _topic_registry import TOPIC_FILE_RE, topic_number
+
+CACHE_NAME = os.path.join("catalog", "topics.pickle")
+
+PLAN_ROW_RE = re.compile(r"^\|\s*(\d+)\s*\|\s*(.*?)\s*\|\s*([BIS])\s*\|")
+SLUG_RE = re.compile(r"^Topic_\d+_(\w+)\.md$")
+
+TopicEntry = namedtuple("TopicEntry", "number name slug title level length sha256 planned_title")
+
+
+def describe(rel, data):
+    """Per-file catalog value parsed from a script's first lines."""
+    head = data[:2048].decode("utf-8", "replace")
+    title = next((line[2:].strip() for line in head.splitlines() if line.startswith("# ")), None)
+    length = LENGTH_RE.search(head)
+    level = LEVEL_RE.search(head)
+    return {"title": title,
+            "level": level.group(1) if level else None,
+            "length": (float(length.group(1)), float(length.group(2) or length.group(1))) if length else None}
+
+
+def parse_plan(path=SERIES_PLAN_PATH):
+    """{number: (title, level letter)} from the series plan tables."""
+    plan = {}
+    try:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                m = PLAN_ROW_RE.match(line)
+                if m:
+                    plan.setdefault(int(m.group(1)), (m.group(2), m.group(3)))
+    except FileNotFoundError:
+        pass
+    return plan
+
+
+class Catalog:
+    """O(1) lookups by topic number and by position in the series, over the cached entries."""
+
+    def __init__(self, state):
+        self.state = state
+        files, plan = state["files"], state["plan"]
+        self.by_number = {}
+        for name in sorted(files):
+            self.by_number.setdefault(topic_number(name), []).append(name)
+        self.numbers = sorted(self.by_number)
+        self.position = {n: i for i, n in enumerate(self.numbers)}
+        self.plan = plan
+
+    def __len__(self):
+        return len(self.numbers)
+
+    def __contains__(self, number):
+        return number in self.by_number
+
+    def get(self, number):
+        names = self.by_number.get(number)
+        if not names:
+            return None
+        name = names[0]
+        entry = self.state["files"][name]
+        value = entry["value"]
+        planned = self.plan.get(number)
+        return TopicEntry(number, name, SLUG_RE.match(name).group(1), value["title"], value["level"],
+                          value["length"], entry["sha256"], planned[0] if planned else None)
+
+    def next(self, number):
+        i = self.position.get(number)
+        if i is None:
+            raise KeyError(f"no script for topic {number}")
+        return self.get(self.numbers[i + 1]) if i + 1 < len(self.numbers) else None
+
+    def prev(self, number):
+        i = self.position.get(number)
+        if i is None:
+            raise KeyError(f"no script for topic {number}")
+        return self.get(self.numbers[i - 1]) if i > 0 else None
+
+    def next_free(self):
+        return (self.numbers[-1] if self.numbers else 0) + 1
+
+    def duplicates(self):
+        return {n: names for n, names in self.by_number.items() if len(names) > 1}
+
+    def gaps(self):
+        """Numbers below the highest script, or in the plan, that have no script."""
+        top = self.numbers[-1] if self.numbers else 0
+        wanted = set(range(1, top + 1)) | set(self.plan)
+        return sorted(wanted - set(self.by_number))
+
+    def __iter__(self):
+        return (self.get(n) for n in self.numbers)
+
+
+def _load_state():
+    state = load_cache(CACHE_NAME, None)
+    if not isinstance(state, dict) or "files" not in state:
+        state = {"files": {}, "plan": {}, "plan_stat": None}
+    state.setdefault("complete", False)
+    return state
+
+
+def _refresh_plan(state):
+    try:
+        st = os.stat(SERIES_PLAN_PATH)
+        stamp = (st.st_size, st.st_mtime_ns)
+    except FileNotFoundError:
+        stamp = None
+    if stamp != state["plan_stat"]:
+        state["plan"], state["plan_stat"] = parse_plan(SERIES_PLAN_PATH), stamp
+        return True
+    return False
+
+
+def update_catalog(names=None, directory=VIDEO_SCRIPTS_DIR):
+    """Bring the catalog up to date and save it; returns (Catalog, recomputed names).
+
+    With names, only those files are checked (what the generator just wrote);
+    otherwise the directory is listed and every script is stat-checked. Names
+    are ignored until a full scan has completed the catalog once, so a partial
+    refresh never seeds it.
+    """
+    state = _load_state()
+    files = state["files"]
+    if names is None or not state["complete"]:
+        names = None
+        relpaths = sorted(n for n in os.listdir(directory) if TOPIC_FILE_RE.match(n))
+        changed = refresh_per_file(files, directory, relpaths, describe)
+        state["complete"] = True
+    else:
+        present = [n for n in names if TOPIC_FILE_RE.match(n) and os.path.exists(os.path.join(directory, n))]
+        subset = {n: files[n] for n in present if n in files}
+        changed = refresh_per_file(subset, directory, present, describe)
+        files.update(subset)
+        for gone in set(names) - set(present):
+            files.pop(gone, None)
+    plan_changed = _refresh_plan(state)
+    if changed or plan_changed or names is None:
+        save_cache(CACHE_NAME, state)
+    return Catalog(state), changed
+
+
+def load_catalog():
+    """The saved catalog, built by a full scan until one has completed."""
+    state = load_cache(CACHE_NAME, None)
+    if not isinstance(state, dict) or not state.get("complete"):
+        return update_catalog()[0]
+    return Catalog(state)
+
+
+def _print_entry(entry):
+    if entry is None:
+        print("(none)")
+        return
+    length = f"{entry.length[0]:g}-{entry.length[1]:g} min" if entry.length else "no length"
+    print(f"{entry.number:>4}  {entry.name}  [{entry.level or '?'}, {length}]  {entry.title}")
+    if entry.planned_title:
+        print(f"      planned: {entry.planned_title}")
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    command, rest = (argv[0], argv[1:]) if argv else (None, [])
+    if command == "update" and not rest:
+        catalog, changed = update_catalog()
+        print(f"{len(catalog)} topics, {len(changed)} re-read")
+    elif command in ("show", "next", "prev") and len(rest) == 1 and rest[0].isdigit():
+        catalog, number = load_catalog(), int(rest[0])
+        try:
+            _print_entry(catalog.get(number) if command == "show" else getattr(catalog, command)(number))
+        except KeyError as e:
+            raise SystemExit(f"error: {e.args[0]}")
+    elif command == "next-free" and not rest:
+        print(load_catalog().next_free())
+    elif command == "list" and not rest:
+        for entry in load_catalog():
+            _print_entry(entry)
+    elif command == "check" and not rest:
+        catalog = load_catalog()
+        duplicates, gaps = catalog.duplicates(), catalog.gaps()
+        for number, names in sorted(duplicates.items()):
+            print(f"duplicate topic {number}: {', '.join(names)}")
+        for number in gaps:
+            planned = catalog.plan.get(number)
+            print(f"gap: no script for topic {number}" + (f" ({planned[0]})" if planned else ""))
+        print(f"{len(catalog)} topics, {len(duplicates)} duplicate number(s), {len(gaps)} gap(s)", file=sys.stderr)
+        if duplicates:
+            raise SystemExit(1)
+    else:
+        raise SystemExit(__doc__)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""Validate relative markdown links and heading anchors across the repo.
+
+    python _check_links.py [--jobs N]
+
+Every markdown file is parsed once into its anchors (GitHub heading slugs plus
+explicit <a name/id> anchors) and its outgoing links; that parse is cached per
+file by mtime and hash, and changed files are re-parsed across a process pool.
+Validation itself only walks the cached link graph, so reruns are quick.
+Also flags "[text (path.md)" links that are missing their "](".
+"""
+
+import argparse
+import os
+import re
+import sys
+import time
+from collections import Counter
+from urllib.parse import unquote
+
+from _fsutil import CACHE_DIR, REPO_ROOT, corpus_files, load_cache, refresh_per_file, save_cache
+from _mdsections import FENCE_RE, HEADING_RE
+
+CACHE_NAME = os.path.join("links", "files.pickle")
+
+LINK_RE = re.compile(r"(?<!!)\[(?:[^\[\]]|\[[^\]]*\])*\]\(\s*<?([^)\s>]+)>?(?:\s+\"[^\"]*\")?\s*\)")
+IMAGE_RE = re.compile(r"!\[[^\]]*\]\(\s*<?([^)\s>]+)>?(?:\s+\"[^\"]*\")?\s*\)")
+MALFORMED_RE = re.compile(r"\[[^\]\n]*\(([^)\s]+\.md(?:#[^)\s]*)?)\)(?!\])")
+ANCHOR_TAG_RE = re.compile(r"<a\s+[^>]*?(?:name|id)=[\"']([^\"']+)[\"']", re.I)
+CODE_SPAN_RE = re.compile(r"`[^`]*`")
+TAG_RE = re.compile(r"<[^>]+>")
+EXTERNAL_RE = re.compile(r"^[a-z][a-z0-9+.-]*:", re.I)
+
+
+def slugify(title):
+    """GitHub-style heading anchor: lowercase, drop punctuation, spaces to hyphens."""
+    text = TAG_RE.sub("", title).strip().lower()
+    return re.sub(r"[^\w\- ]", "", text).replace(" ", "-")
+
+
+def parse_file(rel, data):
+    """Anchors defined in a file and the links it makes, as (line number, target, is_malformed)."""
+    anchors = set()
+    seen = Counter()
+    links = []
+    fence = None
+    for lineno, raw in enumerate(data.split(b"\n"), 1):
+        marker = FENCE_RE.match(raw)
+        if fence:
+            if marker and marker.group(1)[:1] == fence:
+                fence = None
+            continue
+        if marker:
+            fence = marker.group(1)[:1]
+            continue
+        line = CODE_SPAN_RE.sub("", raw.decode("utf-8", "replace"))
+        anchors.update(ANCHOR_TAG_RE.findall(line))
+        m = HEADING_RE.match(line)
+        if m:
+            slug = slugify(m.group(2))
+            anchors.add(slug if not seen[slug] else f"{slug}-{seen[slug]}")
+            seen[slug] += 1
+        for regex in (LINK_RE, IMAGE_RE):
+            links.extend((lineno, target, False) for target in regex.findall(line))
+        links.extend((lineno, target, True) for target in MALFORMED_RE.findall(line) if "](" not in line)
+    return {"anchors": anchors, "links": links}
+
+
+def resolve(rel, target):
+    """Split a link target into (repo-relative path or None for same file, anchor or None)."""
+    path, _, anchor = target.partition("#")
+    if not path:
+        return None, anchor or None
+    base = os.path.dirname(rel)
+    resolved = os.path.normpath(os.path.join(base, unquote(path))).replace(os.sep, "/")
+    return resolved, anchor or None
+
+
+def check_links(parsed, root=REPO_ROOT):
+    """Yield (file, line, target, problem) for every broken link in the parsed corpus."""
+    for rel in sorted(parsed):
+        for lineno, target, malformed in parsed[rel]["links"]:
+            if EXTERNAL_RE.match(target):
+                continue
+            if malformed:
+                yield rel, lineno, target, "malformed link (missing '](')"
+                continue
+            path, anchor = resolve(rel, target)
+            if path is not None:
+                if path.startswith("../") or not os.path.exists(os.path.join(root, path)):
+                    yield rel, lineno, target, "target does not exist"
+                    continue
+            if anchor:
+                dest = parsed.get(rel if path is None else path)
+                if dest is not None and unquote(anchor).lower() not in dest["anchors"]:
+                    yield rel, lineno, target, f"no heading anchor #{anchor}"
+
+
+def load_parsed(root=REPO_ROOT, jobs=1):
+    cache = load_cache(CACHE_NAME, {})
+    known = set(cache)
+    changed = refresh_per_file(cache, root, corpus_files(root), parse_file, jobs=jobs)
+    if changed or set(cache) != known or not os.path.exists(os.path.join(CACHE_DIR, CACHE_NAME)):
+        save_cache(CACHE_NAME, cache)
+    return {rel: entry["value"] for rel, entry in cache.items()}, changed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1, metavar="N",
+                        help="processes used to parse changed files (default: one per CPU)")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    parsed, changed = load_parsed(jobs=args.jobs)
+    problems = list(check_links(parsed))
+    elapsed = time.perf_counter() - start
+    for rel, lineno, target, problem in problems:
+        print(f"{rel}:{lineno}: {target}: {problem}")
+    total = sum(len(v["links"]) for v in parsed.values())
+    print(f"{total} links in {len(parsed)} files ({len(changed)} re-parsed), "
+          f"{len(problems)} broken, {elapsed * 1000:.0f} ms", file=sys.stderr)
+    if problems:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
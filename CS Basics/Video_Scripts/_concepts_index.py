@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+"""Generate and verify "Concepts By Chapter.md" from the chapter text.
+
+    python _concepts_index.py check              # flag listed chapters that no longer mention a concept
+    python _concepts_index.py generate [--write] # drop stale chapters, add newly covering ones
+
+The concept vocabulary and the chapter numbering come from the existing file
+(its "By Chapter" table is matched to Section1-6 chapter files by title).
+Concepts are matched on their key terms: stop words and generic words such as
+"strategy" or "design" are dropped, so "Sharding strategy" is found wherever
+a chapter talks about sharding. Each chapter is scanned once into counts for
+every concept alias; those are cached per file, so after an edit only the
+changed chapter is re-read.
+
+generate keeps the listed chapters that still mention a concept, in their
+order and with their notes ("31 (object/file)", "(referenced)"), and appends
+chapters that newly cover it: named in a heading, or mentioned often enough
+and densely enough, against the chapter's length and the other chapters (see
+covering_chapters).
+"""
+
+import argparse
+import difflib
+import hashlib
+import io
+import os
+import re
+import sys
+from collections import Counter, namedtuple
+
+from _fsutil import REPO_ROOT, atomic_write, corpus_files, load_cache, refresh_per_file, save_cache
+from _mdsections import iter_headings
+
+CONCEPTS_FILE = os.path.join(REPO_ROOT, "Concepts By Chapter.md")
+CACHE_NAME = os.path.join("concepts", "chapters.pickle")
+
+CHAPTER_FILE_RE = re.compile(r"^Section[1-6]/Chapter_\d+_(?!Supplement)\w+\.md$")
+CATEGORY_RE = re.compile(r"^##\s+\d+\.\s")
+ROW_RE = re.compile(r"^\|(.+)\|\s*$")
+
+ITEM_SPLIT_RE = re.compile(r",\s*(?![^()]*\))")
+ITEM_RE = re.compile(r"^(\d+)\b\s*(.*)$")
+
+# An unlisted chapter covers a concept when a heading names it,
+# or it has at least MIN_MENTIONS mentions, at least MIN_DENSITY per 1000 words,
+# and LIFT times the density of the median chapter (see covering_chapters)
+MIN_MENTIONS = 10
+MIN_DENSITY = 2.0
+LIFT = 4.0
+HEADING_SHARE = 0.1
+# Bump when scan_chapter's cached values change
+SCAN_VERSION = 2
+
+# Crude suffix stripping so "scaling", "scale" and "scalability" meet
+SUFFIXES = ("ibility", "ability", "ation", "ness", "ing", "able", "ible", "ity", "ies", "es", "ed", "s", "e")
+
+# aliases come from the label; extra from its multi-word notes ("(rate limiting)"),
+# which only keep a listed chapter, never add one
+ConceptRow = namedtuple("ConceptRow", "line concept chapters aliases extra")
+# mentions: occurrences of the alias's key terms as a phrase; terms: how many of
+# those key terms occur anywhere in the chapter
+Coverage = namedtuple("Coverage", "mentions in_heading terms")
+
+
+def _stem(word):
+    for suffix in SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            return word[:-len(suffix)]
+    return word
+
+
+STOPWORDS = frozenset("a an and are as at be by for from how in into is it its of on or the to under vs with".split())
+GENERIC = frozenset(_stem(w) for w in "algorithm approach architecture basics design general pattern protocol "
+                     "selection strategy system type".split())
+
+
+def normalize(text):
+    """Stemmed words of text, without stop words."""
+    return tuple(w for w in map(_stem, re.findall(r"[a-z0-9]+", text.lower())) if w not in STOPWORDS)
+
+
+def key_terms(words):
+    return tuple(w for w in words if w not in GENERIC) or words
+
+
+def _phrases(parts, skip=()):
+    found = []
+    for part in parts:
+        words = key_terms(normalize(part))
+        if words and len(" ".join(words)) >= 3 and words not in found and words not in skip:
+            found.append(words)
+    return tuple(found)
+
+
+def aliases(concept):
+    """(aliases, extra) key-term phrases for a concept label.
+
+    "SQL vs NoSQL" -> (sql,), (nosql,); a single-word note is an alias too
+    ("Distributed transactions (SAGA)" -> (saga,)), longer notes are extra.
+    """
+    label = re.sub(r"\([^)]*\)", " ", concept)
+    parts = [label] + re.split(r"\s*(?:/|,|&|→|\bvs\.?\s)\s*", label)
+    notes = [p for note in re.findall(r"\(([^)]*)\)", concept) for p in re.split(r"\s*[,/]\s*", note)]
+    found = _phrases(parts + [p for p in notes if len(p.split()) == 1])
+    return found, _phrases([p for p in notes if len(p.split()) > 1], found)
+
+
+def _cells(line):
+    m = ROW_RE.match(line)
+    return [c.strip() for c in m.group(1).split("|")] if m else None
+
+
+def parse_concepts_file(text):
+    """Return (concept rows, {chapter number: title}) from the existing index file."""
+    rows, titles = [], {}
+    section = None
+    for i, line in enumerate(text.splitlines()):
+        if line.startswith("## "):
+            section = "concepts" if CATEGORY_RE.match(line) else ("by_chapter" if "By Chapter" in line else None)
+            continue
+        cells = _cells(line)
+        if not section or not cells or len(cells) < 2 or set(cells[0]) <= set("-: "):
+            continue
+        if section == "by_chapter" and cells[0].isdigit():
+            titles[int(cells[0])] = cells[1]
+        elif section == "concepts" and cells[0] not in ("Concept", "Question / Concept"):
+            listed = re.sub(r"\([^)]*\)", " ", cells[1])
+            chapters = tuple(int(n) for n in re.findall(r"\b\d+\b", listed))
+            rows.append(ConceptRow(i, cells[0], chapters, *aliases(cells[0])))
+    return rows, titles
+
+
+def chapter_title(data):
+    first = data.split(b"\n", 1)[0].decode("utf-8", "replace")
+    return re.sub(r"^#\s*Chapter\s+\d+[.:]\s*", "", first).strip()
+
+
+def match_chapters(titles, chapter_files, root=REPO_ROOT):
+    """Map index chapter numbers to chapter files by closest title.
+
+    Scores are (share of the index title's words found in the file's title, string
+    similarity); pairs are assigned best-first so each file is used at most once.
+    """
+    candidates = {}
+    for rel in chapter_files:
+        with open(os.path.join(root, rel), "rb") as f:
+            candidates[rel] = chapter_title(f.readline())
+    scored = []
+    for number, title in titles.items():
+        words = set(normalize(title))
+        for rel, file_title in candidates.items():
+            overlap = len(words & set(normalize(file_title))) / max(len(words), 1)
+            ratio = difflib.SequenceMatcher(None, title.lower(), file_title.lower()).ratio()
+            scored.append((overlap, ratio, number, rel))
+    mapping, used = {}, set()
+    for overlap, _, number, rel in sorted(scored, reverse=True):
+        if overlap >= 0.5 and number not in mapping and rel not in used:
+            mapping[number] = rel
+            used.add(rel)
+    return mapping
+
+
+def scan_chapter(data, vocabulary):
+    """One pass over a chapter: (word count, coverage for every alias in vocabulary)."""
+    words = normalize(data.decode("utf-8", "replace"))
+    longest = max(len(a) for a in vocabulary)
+    grams = Counter()
+    for n in range(1, longest + 1):
+        grams.update(zip(*(words[i:] for i in range(n))))
+    headings = [" " + " ".join(normalize(t)) + " " for _, t, _ in iter_headings(io.BytesIO(data)) if t]
+    coverage = {}
+    for alias in vocabulary:
+        phrase = " " + " ".join(alias) + " "
+        coverage[alias] = Coverage(grams[alias], any(phrase in h for h in headings),
+                                   sum(1 for w in alias if grams[(w,)]))
+    return len(words), coverage
+
+
+def load_coverage(rows, chapter_files, root=REPO_ROOT):
+    vocabulary = sorted({a for row in rows for a in row.aliases + row.extra})
+    vocab_key = hashlib.sha256(repr((SCAN_VERSION, vocabulary)).encode()).hexdigest()
+    cache = load_cache(CACHE_NAME, {})
+    if cache.get("vocabulary") != vocab_key:
+        cache = {"vocabulary": vocab_key, "files": {}}
+    changed = refresh_per_file(cache["files"], root, chapter_files,
+                               lambda rel, data: scan_chapter(data, vocabulary))
+    save_cache(CACHE_NAME, cache)
+    return {rel: entry["value"] for rel, entry in cache["files"].items()}, changed
+
+
+def mentions(row, rel, coverage):
+    """Whether the chapter still mentions the concept: some alias as a phrase, or at
+    least two thirds of its key terms anywhere."""
+    hits = coverage[rel][1]
+    return any(hits[a].mentions or 3 * hits[a].terms >= 2 * len(a) for a in row.aliases + row.extra)
+
+
+def density(row, rel, coverage):
+    """(mentions of the best alias, mentions per 1000 words) in one chapter."""
+    words, hits = coverage[rel]
+    best = max(hits[a].mentions for a in row.aliases)
+    return best, best * 1000 / max(words, 1)
+
+
+def covering_chapters(row, mapping, coverage):
+    """Unlisted chapters that cover the concept, to append to its row.
+
+    Besides MIN_MENTIONS and MIN_DENSITY, a chapter's density must be LIFT times the
+    median chapter's, and a heading naming the whole label only counts when at most
+    HEADING_SHARE of the chapters have one, so words every chapter uses ("scale",
+    "log") add nothing.
+    """
+    stats = {n: density(row, rel, coverage) for n, rel in mapping.items()}
+    densities = sorted(d for _, d in stats.values())
+    floor = max(MIN_DENSITY, LIFT * densities[len(densities) // 2]) if densities else MIN_DENSITY
+    headed = {n for n, rel in mapping.items() if coverage[rel][1][row.aliases[0]].in_heading}
+    if len(headed) > HEADING_SHARE * len(mapping):
+        headed = set()
+    found = []
+    for number in sorted(mapping):
+        count, d = stats[number]
+        if number not in row.chapters and (number in headed or count >= MIN_MENTIONS and d >= floor):
+            found.append(number)
+    return found
+
+
+def analyze(root=REPO_ROOT):
+    with open(CONCEPTS_FILE, "r", encoding="utf-8") as f:
+        text = f.read()
+    rows, titles = parse_concepts_file(text)
+    chapter_files = [rel for rel in corpus_files(root) if CHAPTER_FILE_RE.match(rel)]
+    mapping = match_chapters(titles, chapter_files, root)
+    coverage, changed = load_coverage(rows, list(mapping.values()), root)
+    return text, rows, mapping, coverage, changed
+
+
+def check(rows, mapping, coverage):
+    """Yield (row, chapter number, problem) for listed chapters that no longer mention the concept."""
+    for row in rows:
+        for number in row.chapters:
+            rel = mapping.get(number)
+            if rel is None:
+                yield row, number, "chapter number not in the By Chapter table"
+            elif not mentions(row, rel, coverage):
+                yield row, number, f"{rel} no longer mentions it"
+
+
+def update_cell(cell, row, mapping, coverage):
+    """The "Covered in" cell with stale chapters dropped and covering ones appended.
+
+    Notes stay with their chapter; a dropped chapter's note moves to the end.
+    """
+    kept, notes = [], []
+    for item in ITEM_SPLIT_RE.split(cell.strip()):
+        m = ITEM_RE.match(item)
+        if not m:
+            if item and item != "—":
+                notes.append(item)
+        elif int(m.group(1)) in mapping and not mentions(row, mapping[int(m.group(1))], coverage):
+            if m.group(2):
+                notes.append(m.group(2))
+        else:
+            kept.append(item)
+    kept += map(str, covering_chapters(row, mapping, coverage))
+    if not kept:
+        return " ".join(["—"] + notes)
+    return ", ".join(kept) + "".join(" " + note for note in notes)
+
+
+def generate(text, rows, mapping, coverage):
+    lines = text.split("\n")
+    for row in rows:
+        cells = _cells(lines[row.line])
+        cell = update_cell(cells[1], row, mapping, coverage)
+        if cell != cells[1]:
+            cells[1] = cell
+            lines[row.line] = "| " + " | ".join(cells) + " |"
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=("check", "generate"))
+    parser.add_argument("--write", action="store_true", help="rewrite Concepts By Chapter.md in place")
+    args = parser.parse_args(argv)
+
+    text, rows, mapping, coverage, changed = analyze()
+    print(f"Scanned {len(changed)} changed chapter(s); {len(mapping)} chapters, {len(rows)} concepts",
+          file=sys.stderr)
+    if args.command == "check":
+        problems = list(check(rows, mapping, coverage))
+        for row, number, problem in problems:
+            print(f"{row.concept} -> {number}: {problem}")
+        if problems:
+            raise SystemExit(1)
+        print("All mappings still match the chapter text")
+        return
+    output = generate(text, rows, mapping, coverage)
+    if args.write:
+        atomic_write(CONCEPTS_FILE, output.encode("utf-8"))
+        print(f"Wrote {CONCEPTS_FILE}", file=sys.stderr)
+    else:
+        sys.stdout.write(output)
+
+
+if __name__ == "__main__":
+    main()
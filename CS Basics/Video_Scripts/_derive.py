@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""Derive draft video scripts from chapter sections, one cached stage at a time.
+
+    python _derive.py [--topic N] [--output DIR] [--force]
+
+Each recipe in RECIPES names the chapter sections a topic draws on. A draft
+goes through four stages:
+
+    extract    chapter file + heading    -> section text
+    outline    section text              -> sub-headings, key points, bullets, terms, first diagram
+    skeleton   recipe + outlines         -> lines for each script section (Hook ... Next Video)
+    render     skeleton                  -> final markdown, through the series template
+
+Every stage's output is stored under .cache/derive/<stage>/ keyed by a hash of
+its inputs, so editing one chapter section re-runs only the stages downstream
+of that section, and only for the recipes that use it. Drafts are written to
+--output (default .cache/derive/drafts); anything the chapters cannot supply
+is left as an HTML comment for the author.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+from collections import Counter, namedtuple
+
+from _catalog import load_catalog
+from _fsutil import CACHE_DIR, REPO_ROOT, atomic_write
+from _mdsections import FENCE_RE, HEADING_RE, find_section, read_range
+from _script_model import SECTION_KEYS
+from _template import SCRIPT_PLAN
+from _topic_registry import topic_number
+
+DERIVE_DIR = os.path.join(CACHE_DIR, "derive")
+DEFAULT_OUTPUT = os.path.join(DERIVE_DIR, "drafts")
+
+# Bump when a stage's output format or heuristics change; older cache entries are then ignored
+STAGE_VERSIONS = {"extract": 1, "outline": 1, "skeleton": 1, "render": 2}
+
+Recipe = namedtuple("Recipe", "name title level sections")
+
+CACHING = "Section4/Chapter_28_Caching_at_Scale_Redis_CDN_and_Edge_Systems.md"
+MULTI_REGION = "Section4/Chapter_30_Multi_Region_Systems.md"
+NEWS_FEED = "Section6/Chapter_49_News_Feed.md"
+
+RECIPES = [
+    Recipe("Topic_234_Distributed_Cache_Multi_Region.md", "Distributed Cache at Scale: Multi-Region", "Staff", (
+        (CACHING, "Cache Invalidation Strategies"),
+        (CACHING, "Consistency vs Freshness"),
+        (CACHING, "What is Edge Caching"),
+        (MULTI_REGION, "Model 3: Read-Local, Write-Central"),
+    )),
+    Recipe("Topic_235_News_Feed_Design.md", "News Feed: Fan-out, Ranking, Scale", "Staff", (
+        (NEWS_FEED, "Write Paths"),
+        (NEWS_FEED, "Read Paths"),
+        (NEWS_FEED, "Feed Storage Design"),
+        (NEWS_FEED, "What Breaks First at Scale"),
+        (MULTI_REGION, "Example 2: News Feed Service"),
+    )),
+]
+
+BOLD_RE = re.compile(r"\*\*([^*]+)\*\*")
+BULLET_RE = re.compile(r"^\s*(?:[-*+]|\d+[.)])\s+(.*)")
+SENTENCE_RE = re.compile(r"(.+?[.!?])(?:\s|$)")
+TROUBLE_RE = re.compile(r"\b(fail|failure|wrong|break|breaks|mistake|pitfall|risk|outage|not)\b", re.I)
+MARKUP_RE = re.compile(r"[*_`]|\[([^\]]*)\]\([^)]*\)")
+
+
+def _plain(text):
+    return MARKUP_RE.sub(lambda m: m.group(1) or "", text).strip()
+
+
+class StageCache:
+    """Content-addressed stage outputs: .cache/derive/<stage>/<hash of version + inputs>.json."""
+
+    def __init__(self, root=DERIVE_DIR, force=False):
+        self.root = root
+        self.force = force
+        self.stats = Counter()
+
+    def key(self, stage, inputs):
+        raw = json.dumps([stage, STAGE_VERSIONS[stage], inputs], sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def run(self, stage, inputs, compute):
+        """compute(*inputs) unless an output for exactly these inputs is cached. Returns (key, output)."""
+        key = self.key(stage, inputs)
+        path = os.path.join(self.root, stage, key[:2], key + ".json")
+        if not self.force:
+            try:
+                with open(path, encoding="utf-8") as f:
+                    self.stats[stage, "hit"] += 1
+                    return key, json.load(f)
+            except (OSError, ValueError):
+                pass
+        output = compute(*inputs)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        atomic_write(path, json.dumps(output, ensure_ascii=False).encode("utf-8"))
+        self.stats[stage, "miss"] += 1
+        return key, output
+
+
+def extract(rel, heading, file_sha256, root=REPO_ROOT):
+    path = os.path.join(root, rel)
+    loc = find_section(path, heading)
+    if loc is None:
+        raise ValueError(f"{rel} has no section starting with {heading!r}")
+    return {"source": rel, "heading": loc[1], "text": read_range(path, loc[2], loc[3])}
+
+
+def outline(section):
+    """Structure of one chapter section; every field is plain text."""
+    points, bullets, subheadings, terms, diagram = [], [], [], [], None
+    fence, block, paragraph = None, [], []
+
+    def flush():
+        if paragraph:
+            m = SENTENCE_RE.match(" ".join(paragraph))
+            points.append(_plain(m.group(1) if m else paragraph[0]))
+            paragraph.clear()
+
+    for line in section["text"].split("\n")[1:]:
+        marker = FENCE_RE.match(line.encode("utf-8"))
+        if fence:
+            if marker and marker.group(1)[:1].decode() == fence:
+                fence = None
+                if diagram is None and block:
+                    diagram = "\n".join(block)
+            else:
+                block.append(line)
+            continue
+        if marker:
+            flush()
+            fence, block = marker.group(1)[:1].decode(), []
+            continue
+        heading = HEADING_RE.match(line)
+        bullet = BULLET_RE.match(line)
+        if heading:
+            flush()
+            subheadings.append(_plain(heading.group(2)))
+        elif bullet:
+            flush()
+            bullets.append(_plain(bullet.group(1)))
+        elif line.strip() and not line.lstrip().startswith(("|", ">")):
+            paragraph.append(line.strip())
+        else:
+            flush()
+        terms.extend(t.strip(" :") for t in BOLD_RE.findall(line))
+    flush()
+    return {"source": section["source"], "heading": _plain(section["heading"]), "subheadings": subheadings,
+            "points": [p for p in points if len(p.split()) >= 4], "bullets": [b for b in bullets if b],
+            "terms": list(dict.fromkeys(t for t in terms if 2 <= len(t) <= 40)), "diagram": diagram}
+
+
+def _todo(text):
+    return f"<!-- derive: {text} -->"
+
+
+def skeleton(recipe, outlines, next_title):
+    """Lines for each script section, drawn from the outlines in recipe order."""
+    name, title, level = recipe
+    points = [p for o in outlines for p in o["points"]]
+    bullets = [b for o in outlines for b in o["bullets"]]
+    topics = [o["heading"] for o in outlines]
+    trouble = [b for b in bullets if TROUBLE_RE.search(b)]
+    numeric = [p for p in points + bullets if re.search(r"\d", p)]
+    diagram = next((o["diagram"] for o in outlines if o["diagram"]), None)
+    terms = [t for o in outlines for t in o["terms"]]
+    sources = sorted({o["source"] for o in outlines})
+
+    sections = {key: [] for key in SECTION_KEYS}
+    sections["hook"] = [points[0] if points else _todo("open with the problem this topic solves"),
+                        _todo("tighten to 20-30 seconds of narration")]
+    sections["story"] = [_todo("an everyday analogy covering: " + "; ".join(topics))]
+    sections["another_way"] = [_todo("a second analogy, from a different angle")]
+    sections["connecting"] = [f"**{o['heading']}.** " + " ".join(o["points"][:3]) for o in outlines if o["points"]]
+    if diagram:
+        sections["diagram"] = ["```", diagram, "```", "", _todo("narrate the diagram step by step")]
+    else:
+        sections["diagram"] = [_todo("draw the flow between: " + ", ".join(topics))]
+    sections["examples"] = [f"- {p}" for p in numeric[:3]] or [_todo("two or three real systems")]
+    sections["think_together"] = [f'"{topics[0]}: what would you choose, and why?"' if topics else "",
+                                  _todo("pause, then walk through the answer")]
+    sections["what_could_go_wrong"] = [f"- {b}" for b in trouble[:3]] or [_todo("a mini disaster story")]
+    sections["surprising_truth"] = [numeric[-1] if numeric else _todo("one counter-intuitive fact")]
+    recap = (terms or topics)[:5]
+    sections["recap"] = [f"- **{t}**" for t in recap] + [_todo("finish each bullet in one line")]
+    sections["one_liner"] = [f"**{min(points, key=len)}**" if points else _todo("one memorable sentence")]
+    sections["next_video"] = [f"Next: {next_title}." if next_title else _todo("tease the next topic")]
+    return {"name": name, "title": title, "level": level, "sources": sources, "sections": sections}
+
+
+def render(draft):
+    values = {"title": draft["title"], "length": "4-5", "level": draft["level"]}
+    for key in SECTION_KEYS:
+        parts = []
+        for line in draft["sections"][key]:
+            parts += [line] if line.startswith("- ") or "\n" in line or line in ("```", "") else [line, ""]
+        while parts and parts[-1] == "":
+            parts.pop()
+        values[key] = "\n".join(parts)
+    values["hook"] = _todo("drafted from " + ", ".join(draft["sources"])) + "\n\n" + values["hook"]
+    return {"markdown": SCRIPT_PLAN.render(values)}
+
+
+def _file_sha256(rel, memo, root=REPO_ROOT):
+    if rel not in memo:
+        with open(os.path.join(root, rel), "rb") as f:
+            memo[rel] = hashlib.sha256(f.read()).hexdigest()
+    return memo[rel]
+
+
+def derive(recipe, cache, catalog, file_hashes):
+    """Run a recipe through every stage; returns the final markdown."""
+    outlines = []
+    for rel, heading in recipe.sections:
+        _, section = cache.run("extract", [rel, heading, _file_sha256(rel, file_hashes)], extract)
+        _, result = cache.run("outline", [section], outline)
+        outlines.append(result)
+    following = catalog.next(topic_number(recipe.name)) if topic_number(recipe.name) in catalog else None
+    next_title = following.title if following else None
+    _, draft = cache.run("skeleton", [list(recipe[:3]), outlines, next_title], skeleton)
+    _, result = cache.run("render", [draft], render)
+    return result["markdown"]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--topic", type=int, action="append", metavar="N", help="only this topic (repeatable)")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, metavar="DIR")
+    parser.add_argument("--force", action="store_true", help="ignore cached stage outputs")
+    args = parser.parse_args(argv)
+
+    recipes = [r for r in RECIPES if not args.topic or topic_number(r.name) in args.topic]
+    if not recipes:
+        raise SystemExit("error: no recipe for the requested topic(s)")
+    cache, catalog, file_hashes = StageCache(force=args.force), load_catalog(), {}
+    os.makedirs(args.output, exist_ok=True)
+    for recipe in recipes:
+        try:
+            markdown = derive(recipe, cache, catalog, file_hashes)
+        except (OSError, ValueError) as e:
+            raise SystemExit(f"error: {recipe.name}: {e}")
+        path = os.path.join(args.output, recipe.name)
+        data = markdown.encode("utf-8")
+        try:
+            with open(path, "rb") as f:
+                unchanged = f.read() == data
+        except FileNotFoundError:
+            unchanged = False
+        if not unchanged:
+            atomic_write(path, data)
+        print(f"{'Unchanged' if unchanged else 'Wrote'} {path}")
+    summary = ", ".join(f"{stage} {cache.stats[stage, 'miss']} run / {cache.stats[stage, 'hit']} cached"
+                        for stage in STAGE_VERSIONS)
+    print(summary, file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
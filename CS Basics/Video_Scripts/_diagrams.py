@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""Extract, lint and pre-render the ASCII / box-drawing diagrams in the corpus.
+
+    python _diagrams.py list                     # every diagram: file:line and title
+    python _diagrams.py lint                     # ragged box borders; exits 1 if any
+    python _diagrams.py render [--out DIR]       # SVG per diagram, rendered once per content
+
+A diagram is a fenced block with no language tag (or a title in its place) that
+contains box-drawing characters or "+--" / "|" boxes. Extraction and linting
+are cached per file. Renders are cached under .cache/diagrams by a hash of the
+diagram text, so a diagram is only rasterized again when its text changes.
+"""
+
+import argparse
+import hashlib
+import os
+import re
+import shutil
+import sys
+import unicodedata
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from xml.sax.saxutils import escape
+
+from _fsutil import CACHE_DIR, REPO_ROOT, atomic_write, corpus_files, load_cache, refresh_per_file, save_cache
+from _mdsections import CLOSE, GLUED, INSIDE, LANGUAGE_RE, OPEN, Fences
+
+CACHE_NAME = os.path.join("diagrams", "files.pickle")
+RENDER_DIR = os.path.join(CACHE_DIR, "diagrams", "svg")
+
+# Bump when extraction / lint results or the SVG output change, so cached values are redone
+EXTRACT_VERSION = 2
+RENDER_VERSION = 1
+
+BOX_CHARS_RE = re.compile(r"[─-╿]|\+[-=]{2,}|[-=]{2,}\+|^\s*\|.*\|\s*$", re.M)
+TOP_EDGE_RE = re.compile(r"(?=([+┌╔╭][-─═━┬╤╦]{2,}[+┐╗╮]))")
+
+LEFT_SIDES = set("|│║┃+├╟╠┣")
+RIGHT_SIDES = set("|│║┃+┤╢╣┫")
+BOTTOM_LEFT = set("+└╚╰┗")
+BOTTOM_RIGHT = set("+┘╝╯┛")
+HORIZONTAL = set("-─═━┴╧╩")
+# How far from the expected column a border may drift and still count as that border
+DRIFT = 4
+
+Diagram = namedtuple("Diagram", "path line title text sha256 problems")
+
+
+def _char_width(ch):
+    if unicodedata.combining(ch):
+        return 0
+    return 2 if unicodedata.east_asian_width(ch) in "WF" else 1
+
+
+def grid_line(line):
+    """The line with a NUL after each double-width character, so index == display column."""
+    if line.isascii():
+        return line
+    out = []
+    for ch in line:
+        width = _char_width(ch)
+        if width:  # combining marks take no column and are dropped
+            out.append(ch if width == 1 else ch + "\0")
+    return "".join(out)
+
+
+def _near(grid, col, chars):
+    for delta in sorted(range(-DRIFT, DRIFT + 1), key=abs):
+        if delta and 0 <= col + delta < len(grid) and grid[col + delta] in chars:
+            return col + delta
+    return None
+
+
+def lint(text):
+    """Return (line offset within the diagram, message) for each box with a misaligned border.
+
+    Every top edge opens a box spanning its two corners; following rows must carry a
+    side border at both columns until a bottom edge closes the box at the left corner.
+    Boxes that never close are arrows or connectors, not boxes, and are ignored.
+    """
+    grids = [grid_line(line.rstrip()) for line in text.split("\n")]
+    problems = []
+    for row, grid in enumerate(grids):
+        for m in TOP_EDGE_RE.finditer(grid):
+            left, right = m.start(1), m.end(1) - 1
+            ragged = []
+            for offset in range(row + 1, len(grids)):
+                g = grids[offset]
+                at_left = g[left] if left < len(g) else " "
+                at_right = g[right] if right < len(g) else " "
+                if at_left in BOTTOM_LEFT and g[left + 1:left + 2] in HORIZONTAL:
+                    if ragged:
+                        first, col = ragged[0]
+                        problems.append((first, _misplaced("right border", col, right)
+                                         + f" ({len(ragged)} of {offset - row - 1} rows)"))
+                    if at_right not in BOTTOM_RIGHT:
+                        problems.append((offset, _misplaced("bottom-right corner", _near(g, right, BOTTOM_RIGHT), right)))
+                    break
+                if at_left not in LEFT_SIDES:
+                    break
+                if at_right not in RIGHT_SIDES:
+                    ragged.append((offset, _near(g, right, RIGHT_SIDES)))
+    return sorted(set(problems))
+
+
+def _misplaced(what, col, expected):
+    if col is None:
+        return f"missing {what} at column {expected + 1}"
+    return f"{what} at column {col + 1}, expected column {expected + 1}"
+
+
+def is_diagram(info, body):
+    if info and LANGUAGE_RE.match(info) and info not in ("text", "ascii", "txt"):
+        return False
+    return bool(BOX_CHARS_RE.search(body))
+
+
+def extract(rel, data):
+    """Per-file cache value: every diagram in the file with its lint results."""
+    diagrams = []
+    fences, start, body = Fences(), None, []
+    for lineno, raw in enumerate(data.split(b"\n"), 1):
+        kind = fences.feed(raw)
+        if kind == OPEN:
+            start, body = lineno, []
+        elif kind == INSIDE:
+            body.append(raw)
+        elif kind in (CLOSE, GLUED):
+            if kind == GLUED:
+                body.append(fences.glued_row(raw))
+            text = b"\n".join(body).decode("utf-8", "replace")
+            info = fences.info
+            if is_diagram(info, text):
+                first = start + 1
+                if fences.mangled:  # the title sits where the language tag goes
+                    text, first = info + "\n" + text, start
+                title = next((l.strip() for l in text.split("\n") if l.strip()), "")
+                if BOX_CHARS_RE.search(title):
+                    title = ""
+                digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+                problems = [(first + offset, message) for offset, message in lint(text)]
+                diagrams.append(Diagram(rel, start, title, text, digest, problems))
+    return diagrams
+
+
+def load_diagrams(root=REPO_ROOT, jobs=1):
+    cache = load_cache(CACHE_NAME, {})
+    if cache.get("version") != EXTRACT_VERSION:
+        cache = {"version": EXTRACT_VERSION, "files": {}}
+    files = cache["files"]
+    changed = refresh_per_file(files, root, corpus_files(root), extract, jobs=jobs)
+    if changed or not os.path.exists(os.path.join(CACHE_DIR, CACHE_NAME)):
+        save_cache(CACHE_NAME, cache)
+    return [d for rel in sorted(files) for d in files[rel]["value"]], changed
+
+
+def render_key(diagram):
+    return hashlib.sha256(f"{RENDER_VERSION}\0".encode() + diagram.text.encode("utf-8")).hexdigest()
+
+
+def render_path(key):
+    return os.path.join(RENDER_DIR, key[:2], key + ".svg")
+
+
+def render_svg(text, font_size=14):
+    """Monospace SVG of the diagram text; one <text> row per line, columns kept by xml:space."""
+    rows = [grid_line(line.rstrip()).replace("\0", "") for line in text.split("\n")]
+    cols = max((len(grid_line(line.rstrip())) for line in text.split("\n")), default=0)
+    char_w, line_h, pad = font_size * 0.6, font_size * 1.25, font_size
+    width = int(cols * char_w + 2 * pad)
+    height = int(len(rows) * line_h + 2 * pad)
+    out = [f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+           f'viewBox="0 0 {width} {height}">',
+           '<rect width="100%" height="100%" fill="#ffffff"/>',
+           f'<g font-family="DejaVu Sans Mono, Menlo, Consolas, monospace" font-size="{font_size}" '
+           f'fill="#111111" xml:space="preserve">']
+    for i, row in enumerate(rows):
+        if row.strip():
+            y = pad + (i + 0.8) * line_h
+            out.append(f'<text x="{pad}" y="{y:.1f}" textLength="{len(grid_line(row)) * char_w:.1f}">'
+                       f'{escape(row)}</text>')
+    out.append("</g></svg>\n")
+    return "\n".join(out).encode("utf-8")
+
+
+def _render_one(item):
+    key, text = item
+    atomic_write(render_path(key), render_svg(text))
+    return key
+
+
+def render_all(diagrams, jobs=1):
+    """Render every diagram whose content hash has no cached SVG yet. Returns the new keys."""
+    todo = {}
+    for d in diagrams:
+        key = render_key(d)
+        if key not in todo and not os.path.exists(render_path(key)):
+            todo[key] = d.text
+    for key in todo:
+        os.makedirs(os.path.dirname(render_path(key)), exist_ok=True)
+    if jobs > 1 and len(todo) > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            return list(pool.map(_render_one, todo.items(), chunksize=32))
+    return [_render_one(item) for item in todo.items()]
+
+
+def export(diagrams, out_dir):
+    """Place each render as <file stem>_<n>.svg in out_dir, linking to the cached copy."""
+    os.makedirs(out_dir, exist_ok=True)
+    counts = {}
+    for d in diagrams:
+        stem = os.path.splitext(os.path.basename(d.path))[0]
+        counts[stem] = counts.get(stem, 0) + 1
+        target = os.path.join(out_dir, f"{stem}_{counts[stem]}.svg")
+        source = render_path(render_key(d))
+        if os.path.exists(target):
+            if os.path.samefile(source, target):
+                continue
+            os.unlink(target)
+        try:
+            os.link(source, target)
+        except OSError:
+            shutil.copyfile(source, target)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=("list", "lint", "render"))
+    parser.add_argument("--out", metavar="DIR", help="render: also place <file>_<n>.svg copies here")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1, metavar="N")
+    args = parser.parse_args(argv)
+
+    diagrams, changed = load_diagrams(jobs=args.jobs)
+    print(f"{len(diagrams)} diagrams ({len(changed)} file(s) re-scanned)", file=sys.stderr)
+    if args.command == "list":
+        for d in diagrams:
+            print(f"{d.path}:{d.line}  {d.title}")
+    elif args.command == "lint":
+        problems = [(d.path, line, message) for d in diagrams for line, message in d.problems]
+        for path, line, message in problems:
+            print(f"{path}:{line}: {message}")
+        print(f"{len(problems)} misaligned border(s) in {len({p[0] for p in problems})} file(s)", file=sys.stderr)
+        if problems:
+            raise SystemExit(1)
+    else:
+        rendered = render_all(diagrams, args.jobs)
+        print(f"Rendered {len(rendered)} diagram(s), {len({render_key(d) for d in diagrams}) - len(rendered)} "
+              f"already cached in {RENDER_DIR}", file=sys.stderr)
+        if args.out:
+            export(diagrams, args.out)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""Small filesystem helpers shared by the Video_Scripts tooling."""
+
+import hashlib
+import os
+import pickle
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+VIDEO_SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(os.path.dirname(VIDEO_SCRIPTS_DIR))
+# The series plan: one table row per planned topic (number, title, level)
+SERIES_PLAN_PATH = os.path.join(os.path.dirname(VIDEO_SCRIPTS_DIR), "YouTube_Video_Series_Topics.md")
+
+# Derived state (indexes, per-file caches); safe to delete at any time.
+# VIDEO_SCRIPTS_CACHE points it elsewhere (the benchmarks use a scratch cache).
+CACHE_DIR = os.environ.get("VIDEO_SCRIPTS_CACHE") or os.path.join(REPO_ROOT, ".cache")
+
+
+def _target_mode(path):
+    # mkstemp creates 0600 files; keep the existing mode, or the usual umask default
+    try:
+        return os.stat(path).st_mode & 0o7777
+    except OSError:
+        umask = os.umask(0)
+        os.umask(umask)
+        return 0o666 & ~umask
+
+
+def atomic_write(path, data):
+    """Write bytes to path via a temp file in the same directory and an atomic rename.
+
+    Readers see either the old file or the complete new one, never a partial write.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix="." + os.path.basename(path) + ".", suffix=".tmp")
+    try:
+        os.chmod(tmp, _target_mode(path))
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def corpus_files(root=REPO_ROOT):
+    """Repo-relative paths of every published markdown file, sorted.
+
+    Hidden directories and underscore-prefixed tooling directories (e.g. _sources/) are skipped.
+    """
+    found = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = [d for d in dirnames if not d.startswith((".", "_"))]
+        rel = os.path.relpath(dirpath, root)
+        for name in filenames:
+            if name.endswith(".md"):
+                found.append(name if rel == "." else os.path.join(rel, name).replace(os.sep, "/"))
+    return sorted(found)
+
+
+def load_cache(name, default=None):
+    try:
+        with open(os.path.join(CACHE_DIR, name), "rb") as f:
+            return pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, TypeError, ValueError):
+        return default
+
+
+def save_cache(name, obj):
+    path = os.path.join(CACHE_DIR, name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    atomic_write(path, pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+def refresh_per_file(cache, root, relpaths, compute, jobs=1):
+    """Bring a per-file cache up to date and return the relpaths that were recomputed.
+
+    cache maps relpath -> {"size", "mtime_ns", "sha256", "value"}. A file is only read
+    when its stat changed, and compute(relpath, data) only runs when its bytes changed;
+    with jobs > 1 those calls are spread over a process pool (compute must be picklable).
+    Entries for files no longer in relpaths are dropped.
+    """
+    pending = []
+    for rel in relpaths:
+        path = os.path.join(root, rel)
+        st = os.stat(path)
+        entry = cache.get(rel)
+        if entry and entry["size"] == st.st_size and entry["mtime_ns"] == st.st_mtime_ns:
+            continue
+        with open(path, "rb") as f:
+            data = f.read()
+        digest = hashlib.sha256(data).hexdigest()
+        if entry and entry["sha256"] == digest:
+            entry.update(size=st.st_size, mtime_ns=st.st_mtime_ns)
+            continue
+        pending.append((rel, data, {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha256": digest}))
+    if jobs > 1 and len(pending) > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            values = list(pool.map(compute, [p[0] for p in pending], [p[1] for p in pending]))
+    else:
+        values = [compute(rel, data) for rel, data, _ in pending]
+    for (rel, _, entry), value in zip(pending, values):
+        entry["value"] = value
+        cache[rel] = entry
+    for rel in set(cache) - set(relpaths):
+        del cache[rel]
+    return [p[0] for p in pending]
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""Streaming markdown section parser for the large chapter files.
+
+Files are read line by line in binary mode, so offsets are byte offsets and
+only the section currently being yielded is ever held in memory.
+
+    python _mdsections.py FILE               # outline: offsets and heading paths
+    python _mdsections.py FILE "Quick Recap" # print one section (with subsections)
+"""
+
+import re
+import sys
+from collections import namedtuple
+
+HEADING_RE = re.compile(r"^(#{1,6})\s+(.*?)\s*#*\s*$")
+FENCE_RE = re.compile(rb"^ {0,3}(`{3,}|~{3,})")
+FENCE_INFO_RE = re.compile(rb"^ {0,3}(?:`{3,}|~{3,})\s*(.*?)\s*$")
+LANGUAGE_RE = re.compile(r"^[a-z][\w+#.-]*$")
+
+# What Fences.feed() says about a line; None means outside any fence
+OPEN, INSIDE, CLOSE, GLUED = "open", "inside", "close", "glued"
+
+# path: tuple of heading titles from the top level down to this section
+# start/end: byte range of the heading line plus its body (up to the next heading)
+Section = namedtuple("Section", "path level start end body")
+
+
+class Fences:
+    """Line-by-line tracker of fenced code blocks, fed raw (bytes) lines.
+
+    A fence closes on a line of at least as many of the same character and nothing
+    else. Some scripts carry a mangled form: a title where the language tag goes,
+    and the closing fence glued to the end of the last diagram row ("...┘```");
+    such a fence also closes on any line ending in its marker (GLUED).
+    fence, info and mangled describe the most recently opened block.
+    """
+
+    __slots__ = ("inside", "fence", "info", "mangled")
+
+    def __init__(self):
+        self.inside = False
+        self.fence = self.info = None
+        self.mangled = False
+
+    def feed(self, raw):
+        """OPEN, INSIDE, CLOSE or GLUED for one line, or None outside any fence."""
+        m = FENCE_RE.match(raw)
+        if not self.inside:
+            if not m:
+                return None
+            self.inside, self.fence = True, m.group(1)
+            self.info = FENCE_INFO_RE.match(raw).group(1).decode("utf-8", "replace")
+            self.mangled = bool(self.info) and not LANGUAGE_RE.match(self.info)
+            return OPEN
+        if (m and m.group(1)[:1] == self.fence[:1] and len(m.group(1)) >= len(self.fence)
+                and not raw[m.end():].strip()):
+            self.inside = False
+            return CLOSE
+        if self.mangled and raw.rstrip().endswith(self.fence):
+            self.inside = False
+            return GLUED
+        return INSIDE
+
+    def glued_row(self, raw):
+        """The content of a GLUED line, without its closing fence."""
+        return raw.rstrip()[:-len(self.fence)]
+
+
+def iter_headings(f):
+    """Yield (level, title, offset) for every heading in a binary file, skipping fenced code."""
+    offset = 0
+    fences = Fences()
+    for raw in f:
+        if fences.feed(raw) is None and raw[:1] == b"#":
+            m = HEADING_RE.match(raw.decode("utf-8", "replace"))
+            if m:
+                yield len(m.group(1)), m.group(2), offset
+        offset += len(raw)
+    yield 0, None, offset
+
+
+def iter_sections(path, bodies=True):
+    """Yield a Section per heading (plus the preamble, if any), in file order.
+
+    path may also be an open binary file. A section runs to the next heading of any
+    level; body is the decoded text after the heading line, or None when bodies=False.
+    """
+    if hasattr(path, "read"):
+        yield from _iter_sections(path, bodies)
+        return
+    with open(path, "rb") as f:
+        yield from _iter_sections(f, bodies)
+
+
+def _iter_sections(f, bodies):
+    stack = []
+    cur = ((), 0, 0)
+    chunks = []
+    fences = Fences()
+    offset = 0
+    for raw in f:
+        m = None
+        if fences.feed(raw) is None and raw[:1] == b"#":
+            m = HEADING_RE.match(raw.decode("utf-8", "replace"))
+        if m:
+            if offset > cur[2]:
+                yield _section(cur, offset, chunks, bodies)
+            level = len(m.group(1))
+            while stack and stack[-1][0] >= level:
+                stack.pop()
+            stack.append((level, m.group(2)))
+            cur = (tuple(t for _, t in stack), level, offset)
+            chunks = []
+        elif bodies:
+            chunks.append(raw)
+        offset += len(raw)
+    if offset > cur[2]:
+        yield _section(cur, offset, chunks, bodies)
+
+
+def _section(cur, end, chunks, bodies):
+    path, level, start = cur
+    body = b"".join(chunks).decode("utf-8", "replace") if bodies else None
+    return Section(path, level, start, end, body)
+
+
+def find_section(path, heading):
+    """Locate the first section whose title starts with heading (case-insensitive).
+
+    Returns (level, title, start, end) where end includes its subsections, or None.
+    Stops reading as soon as the section is closed by a same-or-higher-level heading.
+    """
+    wanted = heading.lower()
+    found = None
+    with open(path, "rb") as f:
+        for level, title, offset in iter_headings(f):
+            if found:
+                if title is None or level <= found[0]:
+                    return found[0], found[1], found[2], offset
+            elif title is not None and title.lower().startswith(wanted):
+                found = (level, title, offset)
+    return None
+
+
+def read_range(path, start, end):
+    with open(path, "rb") as f:
+        f.seek(start)
+        return f.read(end - start).decode("utf-8", "replace")
+
+
+def extract_section(path, heading):
+    """Text of the named section including its heading line and subsections, or None."""
+    loc = find_section(path, heading)
+    return read_range(path, loc[2], loc[3]) if loc else None
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv or len(argv) > 2:
+        raise SystemExit(__doc__)
+    if len(argv) == 2:
+        text = extract_section(argv[0], argv[1])
+        if text is None:
+            raise SystemExit(f"no section matching {argv[1]!r} in {argv[0]}")
+        sys.stdout.write(text)
+        return
+    for s in iter_sections(argv[0], bodies=False):
+        print(f"{s.start:>9} {s.end:>9}  {' > '.join(s.path) or '(preamble)'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,331 @@
+#!/usr/bin/env python3
+"""Split the video scripts into narration segments and synthesize only what changed.
+
+    python _narrate.py segments [--topic N]
+    python _narrate.py synth [--url URL] [--topic N] [--batch 16] [--queue 64] [--workers 4] [--out DIR]
+    python _narrate.py serve [--port 8766] [--fail-rate 0.2] [--latency 0.05]
+
+Each paragraph and list item of a Topic_*.md script is one segment; fenced
+diagrams and code, tables, headings, rules and HTML comments are not narrated,
+and markdown markup is stripped. A segment is keyed by the hash of its voice
+and text, and finished audio is stored under .cache/narration/audio/ by that
+key, so editing one paragraph re-synthesizes that paragraph only (and a
+sentence repeated across topics is synthesized once).
+
+"synth" feeds the uncached segments through a bounded queue to --workers
+consumers that send them to the synthesizer in batches of up to --batch; with
+--out it also writes one WAV per topic, concatenated from the cached segments.
+Without --url, segments go to an in-process stand-in; "serve" runs the same
+stand-in as a local HTTP service (POST /synthesize). The stand-in returns
+silent WAV audio sized to the words at WORDS_PER_MINUTE.
+"""
+
+import argparse
+import asyncio
+import base64
+import hashlib
+import io
+import json
+import os
+import random
+import re
+import time
+import wave
+from collections import namedtuple
+
+from _fsutil import CACHE_DIR, VIDEO_SCRIPTS_DIR, atomic_write
+from _near_duplicates import paragraphs
+from _publish import (BACKOFF_BASE, BACKOFF_CAP, REQUEST_TIMEOUT, RETRY_STATUSES, ConnectionPool, PublishError,
+                      format_message, read_message)
+from _script_budget import WORDS_PER_MINUTE
+from _script_model import load_scripts
+from _topic_registry import topic_number
+
+AUDIO_DIR = os.path.join(CACHE_DIR, "narration", "audio")
+
+VOICE = "standin-v1"
+STANDIN_RATE = 1000  # samples per second of the stand-in's 8-bit silence; keeps the audio cache small
+
+Segment = namedtuple("Segment", "topic section index text key")
+
+LINK_RE = re.compile(r"!?\[([^\]]*)\]\([^)]*\)")
+MARKUP_RE = re.compile(r"\*\*|__|(?<!\w)[*_](?=\S)|(?<=\S)[*_](?!\w)|`")
+TAG_RE = re.compile(r"<[^>]+>")
+
+
+class SynthesisError(Exception):
+    pass
+
+
+def narration_text(text):
+    """What the voice reads for one paragraph: links become their text, markup and tags go."""
+    text = TAG_RE.sub("", LINK_RE.sub(r"\1", text))
+    return " ".join(MARKUP_RE.sub("", text).split())
+
+
+def segment_key(text, voice=VOICE):
+    return hashlib.sha256(f"{voice}\0{text}".encode("utf-8")).hexdigest()
+
+
+def script_segments(script, voice=VOICE):
+    """Segments of one Script (see _script_model), in reading order."""
+    found = []
+    for section in script.sections:
+        label = section.key or section.heading
+        for index, (_, raw) in enumerate(paragraphs(section.body)):
+            text = narration_text(raw)
+            if text:
+                found.append(Segment(script.name, label, index, text, segment_key(text, voice)))
+    return found
+
+
+def audio_path(key):
+    return os.path.join(AUDIO_DIR, key[:2], key + ".wav")
+
+
+def standin_audio(text):
+    """Silent 8-bit mono WAV lasting as long as text takes to read at WORDS_PER_MINUTE."""
+    seconds = max(1, len(text.split())) * 60 / WORDS_PER_MINUTE
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(1)
+        w.setframerate(STANDIN_RATE)
+        w.writeframes(b"\x80" * int(seconds * STANDIN_RATE))
+    return buf.getvalue()
+
+
+class StandInSynthesizer:
+    """In-process stand-in for the TTS service; also what "serve" answers with."""
+
+    def __init__(self, fail_rate=0.0, latency=0.0):
+        self.fail_rate = fail_rate
+        self.latency = latency
+        self.batches = 0
+
+    async def synthesize(self, voice, texts):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if random.random() < self.fail_rate:
+            raise SynthesisError("injected failure")
+        self.batches += 1
+        return [standin_audio(text) for text in texts]
+
+    async def close(self):
+        pass
+
+    async def serve_connection(self, reader, writer):
+        try:
+            while True:
+                message = await read_message(reader)
+                if message is None:
+                    break
+                start_line, _, body = message
+                method, target, _ = start_line.split(" ", 2)
+                if (method, target.rstrip("/")) != ("POST", "/synthesize"):
+                    status, reply = 404, {"error": "not found"}
+                else:
+                    try:
+                        request = json.loads(body)
+                        audio = await self.synthesize(request["voice"], request["texts"])
+                        status, reply = 200, {"audio": [base64.b64encode(a).decode("ascii") for a in audio]}
+                    except SynthesisError as e:
+                        status, reply = 503, {"error": str(e)}
+                    except (ValueError, KeyError, TypeError) as e:
+                        status, reply = 400, {"error": f"bad request: {e}"}
+                extra = {"Content-Type": "application/json"}
+                if status == 503:
+                    extra["Retry-After"] = "0"
+                writer.write(format_message(f"HTTP/1.1 {status} -", extra, json.dumps(reply).encode()))
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except asyncio.CancelledError:
+            pass  # server shutting down mid-request; the connection just closes
+        finally:
+            writer.close()
+
+
+class HttpSynthesizer:
+    """Client for a TTS service speaking the stand-in's protocol, with retries."""
+
+    def __init__(self, url, connections, retries=5):
+        try:
+            self.pool = ConnectionPool(url, connections)
+        except PublishError as e:
+            raise SynthesisError(str(e)) from None
+        self.retries = retries
+
+    async def synthesize(self, voice, texts):
+        body = json.dumps({"voice": voice, "texts": texts}).encode("utf-8")
+        problem = None
+        for attempt in range(self.retries + 1):
+            if attempt:
+                delay = min(BACKOFF_CAP, BACKOFF_BASE * 2 ** (attempt - 1))
+                await asyncio.sleep(delay * random.uniform(0.5, 1.0))
+            try:
+                status, _, reply = await self.pool.request("POST", "/synthesize", body,
+                                                           {"Content-Type": "application/json"}, REQUEST_TIMEOUT)
+            except (OSError, asyncio.IncompleteReadError, asyncio.TimeoutError) as e:
+                problem = f"{type(e).__name__}: {e}"
+                continue
+            if status == 200:
+                audio = [base64.b64decode(a) for a in json.loads(reply)["audio"]]
+                if len(audio) != len(texts):
+                    raise SynthesisError(f"asked for {len(texts)} segments, got {len(audio)}")
+                return audio
+            if status not in RETRY_STATUSES:
+                raise SynthesisError(f"HTTP {status}: {reply[:200].decode('utf-8', 'replace')}")
+            problem = f"HTTP {status}"
+        raise SynthesisError(f"gave up after {self.retries + 1} attempts ({problem})")
+
+    async def close(self):
+        await self.pool.close()
+
+
+async def run_queue(segments, synthesizer, batch_size=16, queue_size=64, workers=4, voice=VOICE):
+    """Synthesize segments through a bounded queue; returns the number of batches sent.
+
+    The producer blocks while queue_size segments are waiting, so memory stays
+    flat however many segments changed. Each worker takes one segment, tops the
+    batch up with whatever else is already queued, and writes each result to
+    the audio cache as soon as its batch returns.
+    """
+    queue = asyncio.Queue(maxsize=queue_size)
+    batches = 0
+
+    async def produce():
+        for segment in segments:
+            await queue.put(segment)
+        for _ in range(workers):
+            await queue.put(None)
+
+    async def consume():
+        nonlocal batches
+        while True:
+            first = await queue.get()
+            if first is None:
+                return
+            batch, finished = [first], False
+            while len(batch) < batch_size and not queue.empty():
+                item = queue.get_nowait()
+                if item is None:
+                    finished = True
+                    break
+                batch.append(item)
+            audio = await synthesizer.synthesize(voice, [s.text for s in batch])
+            batches += 1
+            for segment, data in zip(batch, audio):
+                path = audio_path(segment.key)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                atomic_write(path, data)
+            if finished:
+                return
+
+    tasks = [asyncio.ensure_future(consume()) for _ in range(workers)]
+    try:
+        await asyncio.gather(produce(), *tasks)
+    finally:
+        for task in tasks:
+            task.cancel()
+        await synthesizer.close()
+    return batches
+
+
+def write_topic_audio(segments, path):
+    """Concatenate a topic's cached segment audio into one WAV at path."""
+    buf, params = io.BytesIO(), None
+    with wave.open(buf, "wb") as out:
+        for segment in segments:
+            with wave.open(audio_path(segment.key), "rb") as w:
+                if params is None:
+                    params = w.getparams()
+                    out.setparams(params)
+                elif w.getparams()[:3] != params[:3]:
+                    raise SynthesisError(f"{segment.key}: audio format differs from the topic's first segment")
+                out.writeframes(w.readframes(w.getnframes()))
+    atomic_write(path, buf.getvalue())
+
+
+def load_segments(directory=VIDEO_SCRIPTS_DIR, topics=None):
+    """{script name: [Segment]} for every script (or the requested topic numbers)."""
+    found = {}
+    for script in load_scripts(directory):
+        if not topics or topic_number(script.name) in topics:
+            found[script.name] = script_segments(script)
+    return found
+
+
+def synth(segments_by_topic, url=None, batch_size=16, queue_size=64, workers=4, out=None):
+    """Synthesize the uncached segments; returns (total, cached, synthesized, batches)."""
+    unique = {}
+    for segments in segments_by_topic.values():
+        for segment in segments:
+            unique.setdefault(segment.key, segment)
+    pending = [s for key, s in unique.items() if not os.path.exists(audio_path(key))]
+    batches = 0
+    if pending:
+        synthesizer = HttpSynthesizer(url, workers) if url else StandInSynthesizer()
+        batches = asyncio.run(run_queue(pending, synthesizer, batch_size, queue_size, workers))
+    if out:
+        os.makedirs(out, exist_ok=True)
+        for name, segments in segments_by_topic.items():
+            if segments:
+                write_topic_audio(segments, os.path.join(out, name[:-3] + ".wav"))
+    return len(unique), len(unique) - len(pending), len(pending), batches
+
+
+async def _serve(host, port, synthesizer):
+    server = await asyncio.start_server(synthesizer.serve_connection, host, port)
+    print(f"Stand-in TTS worker on http://{host}:{port}/synthesize (Ctrl-C to stop)", flush=True)
+    async with server:
+        await server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("segments", help="list narration segments and whether their audio is cached")
+    p.add_argument("--topic", type=int, action="append", metavar="N")
+    p = sub.add_parser("synth", help="synthesize changed segments")
+    p.add_argument("--url", help="TTS service base URL (default: the in-process stand-in)")
+    p.add_argument("--topic", type=int, action="append", metavar="N")
+    p.add_argument("--batch", type=int, default=16, metavar="N", help="segments per request")
+    p.add_argument("--queue", type=int, default=64, metavar="N", help="segments waiting in the queue at most")
+    p.add_argument("--workers", type=int, default=4, metavar="N", help="batches in flight at once")
+    p.add_argument("--out", metavar="DIR", help="also write one concatenated WAV per topic here")
+    p = sub.add_parser("serve", help="run the stand-in TTS worker as a local HTTP service")
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=8766)
+    p.add_argument("--fail-rate", type=float, default=0.0, help="fraction of batches answered with 503")
+    p.add_argument("--latency", type=float, default=0.0, help="seconds of delay per batch")
+    args = parser.parse_args(argv)
+
+    if args.command == "serve":
+        try:
+            asyncio.run(_serve(args.host, args.port, StandInSynthesizer(args.fail_rate, args.latency)))
+        except KeyboardInterrupt:
+            pass
+        return
+    segments_by_topic = load_segments(topics=args.topic)
+    if args.command == "segments":
+        for name, segments in segments_by_topic.items():
+            for s in segments:
+                state = "cached" if os.path.exists(audio_path(s.key)) else "new"
+                print(f"{name}  {s.section}#{s.index}  {s.key[:12]}  {state:<6}  {s.text[:70]}")
+        return
+    for flag in ("batch", "queue", "workers"):
+        if getattr(args, flag) < 1:
+            parser.error(f"--{flag} must be >= 1")
+    start = time.perf_counter()
+    try:
+        total, cached, synthesized, batches = synth(segments_by_topic, args.url, args.batch, args.queue,
+                                                    args.workers, args.out)
+    except SynthesisError as e:
+        raise SystemExit(f"error: {e}")
+    print(f"{total} unique segment(s) in {len(segments_by_topic)} topic(s): {cached} cached, "
+          f"{synthesized} synthesized in {batches} batch(es), {(time.perf_counter() - start) * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""Find paragraphs repeated (nearly) word for word across the corpus.
+
+    python _near_duplicates.py [--threshold 0.8] [--min-words 4] [--same-file] [--limit 20] [--jobs N]
+
+Every paragraph and list item outside code fences becomes a set of word
+3-shingles, summarised by a MinHash signature. Signatures are banded for
+locality-sensitive hashing, so only paragraphs that share a whole band are ever
+compared: finding clusters is roughly linear in the number of paragraphs rather
+than quadratic in the number of files. Candidates whose signatures agree on at
+least --threshold of their positions (the estimated Jaccard similarity) are
+joined into clusters.
+
+Signatures are cached per file in .cache/duplicates/, so a rerun only
+re-shingles files whose bytes changed.
+"""
+
+import argparse
+import hashlib
+import os
+import re
+import sys
+from array import array
+from collections import defaultdict
+
+from _fsutil import REPO_ROOT, corpus_files, load_cache, refresh_per_file, save_cache
+from _mdsections import HEADING_RE, OPEN, Fences
+
+CACHE_NAME = os.path.join("duplicates", "signatures.pickle")
+
+SHINGLE_SIZE = 3
+NUM_BINS = 64  # signature length; a power of two
+BANDS = 16
+ROWS = NUM_BINS // BANDS  # LSH catches pairs above roughly (1 / BANDS) ** (1 / ROWS) ~ 0.5 similarity
+SIGNATURE_VERSION = (2, SHINGLE_SIZE, NUM_BINS)
+
+EMPTY = 0xFFFFFFFF
+BULLET_RE = re.compile(r"^\s*(?:[-*+]|\d+[.)])\s+")
+WORD_RE = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+
+
+def paragraphs(text):
+    """Yield (line number, text) for each paragraph and list item outside code fences."""
+    fences, start, lines = Fences(), 0, []
+    for number, line in enumerate(text.split("\n"), 1):
+        kind = fences.feed(line.encode("utf-8"))
+        if kind not in (None, OPEN):
+            continue
+        stripped = line.strip()
+        block_end = (kind == OPEN or not stripped or HEADING_RE.match(line) or stripped.startswith(("|", "<!--"))
+                     or set(stripped) <= set("-*_=") or BULLET_RE.match(line))
+        if block_end and lines:
+            yield start, " ".join(lines)
+            lines = []
+        if kind == OPEN:
+            continue
+        if BULLET_RE.match(line):
+            start, lines = number, [BULLET_RE.sub("", line).strip()]
+        elif not block_end:
+            if not lines:
+                start = number
+            lines.append(stripped)
+    if lines:
+        yield start, " ".join(lines)
+
+
+def shingles(words):
+    """The set of word SHINGLE_SIZE-shingles; the whole text when it is shorter than one."""
+    if len(words) <= SHINGLE_SIZE:
+        return {" ".join(words)}
+    return {" ".join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)}
+
+
+def signatures(shingle_sets):
+    """One-permutation MinHash signatures for all of a file's paragraphs at once.
+
+    Each shingle hashes once into one of NUM_BINS bins, keeping the minimum per bin;
+    empty bins borrow from the next filled bin so that equal sets always produce equal
+    signatures. A shingle is hashed once per file however often it repeats, and the
+    per-bin minimum comes from sorting packed bin:value keys and reading them back as
+    32-bit halves rather than from a comparison per shingle.
+    """
+    keys, found = {}, []
+    low, high = (0, 1) if sys.byteorder == "little" else (1, 0)
+    for shingle_set in shingle_sets:
+        for shingle in [shingle for shingle in shingle_set if shingle not in keys]:
+            h = int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "little")
+            keys[shingle] = (h & (NUM_BINS - 1)) << 32 | h >> 32
+        halves = array("I", array("Q", sorted(map(keys.__getitem__, shingle_set), reverse=True)).tobytes())
+        mins = dict(zip(halves[high::2], halves[low::2]))  # descending, so each bin keeps its minimum
+        if len(mins) < NUM_BINS:
+            following = min(mins)  # empty bins past the last filled one wrap around to the first
+            for i in range(NUM_BINS - 1, -1, -1):
+                if i in mins:
+                    following = i
+                else:
+                    mins[i] = (mins[following] + 0x9E3779B9 * ((following - i) % NUM_BINS)) & 0xFFFFFFFF
+        found.append(array("I", map(mins.__getitem__, range(NUM_BINS))).tobytes())
+    return found
+
+
+def file_signatures(rel, data):
+    """Per-file cache value: [(line, word count, first words, signature bytes)]."""
+    units = []
+    for line, text in paragraphs(data.decode("utf-8", "replace")):
+        words = WORD_RE.findall(text.lower())
+        if words:
+            units.append((line, len(words), text[:100], shingles(words)))
+    return [unit[:3] + (sig,) for unit, sig in zip(units, signatures(unit[3] for unit in units))]
+
+
+def load_signatures(root=REPO_ROOT, jobs=1):
+    """{relpath: file_signatures(...)} for the whole corpus, refreshing changed files only."""
+    cache = load_cache(CACHE_NAME, {})
+    if cache.get("version") != SIGNATURE_VERSION:
+        cache = {"version": SIGNATURE_VERSION, "files": {}}
+    changed = refresh_per_file(cache["files"], root, corpus_files(root), file_signatures, jobs)
+    if changed:
+        save_cache(CACHE_NAME, cache)
+    return {rel: entry["value"] for rel, entry in cache["files"].items()}, changed
+
+
+def similarity(a, b):
+    """Estimated Jaccard similarity: the share of signature positions that agree."""
+    return sum(x == y for x, y in zip(array("I", a), array("I", b))) / NUM_BINS
+
+
+def find_clusters(units, threshold):
+    """Group units (tuples ending in a signature) into clusters of near-duplicates.
+
+    Each band of each signature is a bucket key; within a bucket a unit is compared
+    only to the bucket's representatives so far, so identical paragraphs repeated
+    hundreds of times cost one comparison each, not a quadratic number.
+    """
+    parent = list(range(len(units)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    width = ROWS * 4
+    for band in range(BANDS):
+        buckets = defaultdict(list)
+        for i, unit in enumerate(units):
+            buckets[unit[-1][band * width:(band + 1) * width]].append(i)
+        for members in buckets.values():
+            if len(members) < 2:
+                continue
+            representatives = []
+            for i in members:
+                sig = units[i][-1]
+                for r in representatives:
+                    if find(r) == find(i) or similarity(units[r][-1], sig) >= threshold:
+                        parent[find(i)] = find(r)
+                        break
+                else:
+                    representatives.append(i)
+    clusters = defaultdict(list)
+    for i in range(len(units)):
+        clusters[find(i)].append(i)
+    return [members for members in clusters.values() if len(members) > 1]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threshold", type=float, default=0.8, help="minimum estimated similarity (0-1)")
+    parser.add_argument("--min-words", type=int, default=4, help="ignore shorter paragraphs")
+    parser.add_argument("--same-file", action="store_true", help="also report repeats within a single file")
+    parser.add_argument("--limit", type=int, default=20, metavar="N", help="clusters to print (0 for all)")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="worker processes for re-shingling")
+    args = parser.parse_args(argv)
+
+    signatures, changed = load_signatures(jobs=args.jobs)
+    units = [(rel, line, words, text, sig) for rel, found in sorted(signatures.items())
+             for line, words, text, sig in found if words >= args.min_words]
+    clusters = []
+    for members in find_clusters(units, args.threshold):
+        files = {units[i][0] for i in members}
+        if len(files) > 1 or args.same_file:
+            clusters.append((len(members), len(files), sorted(members)))
+    clusters.sort(key=lambda c: (-c[0], -c[1], units[c[2][0]][0], units[c[2][0]][1]))
+
+    shown = clusters if args.limit <= 0 else clusters[:args.limit]
+    for copies, nfiles, members in shown:
+        print(f"{copies} copies in {nfiles} file(s): {units[members[0]][3]}")
+        for i in members:
+            rel, line = units[i][:2]
+            print(f"  {rel}:{line}")
+        print()
+    print(f"{len(units)} paragraphs in {len(signatures)} files ({len(changed)} re-shingled), "
+          f"{len(clusters)} near-duplicate cluster(s)"
+          + (f", {len(shown)} shown" if len(shown) < len(clusters) else ""), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
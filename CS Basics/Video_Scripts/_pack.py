@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+"""Packed, compressed copy of the corpus with random access by (file, heading).
+
+    python _pack.py build                 # write .cache/pack/corpus.pack from the repo
+    python _pack.py get FILE [HEADING]    # a section and its subsections (heading path, or a title prefix), or the whole file
+    python _pack.py list [FILE]           # packed files, or one file's sections
+    python _pack.py check                 # every file unpacks to its current bytes
+
+Every markdown section (as split by _mdsections) is compressed on its own with
+zlib against a shared preset dictionary. The dictionary is trained at build time
+from the lines that recur across many sections (skeleton headings, rules,
+diagram borders, boilerplate), so even small sections compress well. A
+reader mmaps the pack; fetching a section is a binary search of the key
+table, one slice and one small decompress (plus one per subsection).
+
+corpus.pack layout (integers little-endian u32 unless noted):
+
+    header    magic, counts, dictionary length, and the byte offset of each table (u64)
+    dict      preset dictionary
+    files     nfiles x (path_off, path_len, first_section, nsections), sorted by path
+    sections  nsections x (parent, title_off, title_len, block_off (u64), block_len, raw_len), in file order
+    keys      nsections x section_id, sorted by (path, heading path)
+    strings   utf-8 paths and heading titles
+    blocks    compressed sections
+
+A section's heading path ("Part 1 > Key-Value Stores") is its title prefixed by
+its parents' titles; the preamble has the empty path and parent NO_PARENT.
+"""
+
+import io
+import mmap
+import os
+import struct
+import sys
+import time
+import zlib
+from collections import Counter
+
+from _fsutil import CACHE_DIR, REPO_ROOT, atomic_write, corpus_files
+from _mdsections import iter_sections
+
+PACK_PATH = os.path.join(CACHE_DIR, "pack", "corpus.pack")
+
+MAGIC = b"VSPACK01"
+HEADER = struct.Struct("<8sIII6Q")
+FILE_REC = struct.Struct("<IIII")
+SECTION_REC = struct.Struct("<IIIQII")
+KEY_REC = struct.Struct("<I")
+NO_PARENT = 0xFFFFFFFF
+
+ZDICT_SIZE = 32 * 1024  # zlib only looks back 32 KiB, so a larger dictionary is wasted
+MIN_SECTIONS = 5  # a line must recur in this many sections to earn dictionary space
+LEVEL = 9
+
+
+def train_dictionary(sections, size=ZDICT_SIZE):
+    """Preset dictionary from the lines shared by the most sections, weighted by length.
+
+    zlib encodes nearer matches more cheaply, so the most valuable lines go last.
+    """
+    df = Counter()
+    for data in sections:
+        df.update({line for line in data.split(b"\n") if 4 <= len(line) <= 400})
+    ranked = sorted((n * len(line), line) for line, n in df.items() if n >= MIN_SECTIONS)
+    chosen, used = [], 0
+    for _, line in reversed(ranked):
+        if used + len(line) + 1 > size:
+            continue
+        chosen.append(line)
+        used += len(line) + 1
+    return b"\n".join(reversed(chosen)) + b"\n" if chosen else b""
+
+
+def compress(data, zdict):
+    c = zlib.compressobj(LEVEL, zlib.DEFLATED, -15, 9, zlib.Z_DEFAULT_STRATEGY, zdict) if zdict else \
+        zlib.compressobj(LEVEL, zlib.DEFLATED, -15)
+    return c.compress(data) + c.flush()
+
+
+def split_sections(data):
+    """[(heading path tuple, bytes)] covering data exactly; the preamble's path is ()."""
+    return [(s.path, data[s.start:s.end]) for s in iter_sections(io.BytesIO(data), bodies=False)]
+
+
+def build_pack(root=REPO_ROOT, path=PACK_PATH):
+    """Write the pack; returns (files, sections, raw bytes, packed bytes)."""
+    files = []
+    for rel in corpus_files(root):
+        with open(os.path.join(root, rel), "rb") as f:
+            files.append((rel, split_sections(f.read())))
+    zdict = train_dictionary(data for _, sections in files for _, data in sections)
+
+    strings, blocks = bytearray(), bytearray()
+
+    def intern(text):
+        raw = text.encode("utf-8")
+        strings.extend(raw)
+        return len(strings) - len(raw), len(raw)
+
+    file_recs, section_recs, keys, raw_total = [], [], [], 0
+    for rel, sections in files:
+        file_recs.append(FILE_REC.pack(*intern(rel), len(section_recs), len(sections)))
+        ids = {}
+        for heading, data in sections:
+            block = compress(data, zdict)
+            parent = ids.get(heading[:-1], NO_PARENT) if heading else NO_PARENT
+            ids[heading] = len(section_recs)
+            keys.append(((rel.encode("utf-8"), " > ".join(heading).encode("utf-8")), len(section_recs)))
+            section_recs.append(SECTION_REC.pack(parent, *intern(heading[-1] if heading else ""),
+                                                 len(blocks), len(block), len(data)))
+            blocks += block
+            raw_total += len(data)
+    key_table = b"".join(KEY_REC.pack(i) for _, i in sorted(keys))
+
+    dict_off = HEADER.size
+    files_off = dict_off + len(zdict)
+    sections_off = files_off + len(file_recs) * FILE_REC.size
+    keys_off = sections_off + len(section_recs) * SECTION_REC.size
+    strings_off = keys_off + len(key_table)
+    blocks_off = strings_off + len(strings)
+    header = HEADER.pack(MAGIC, len(file_recs), len(section_recs), len(zdict),
+                         dict_off, files_off, sections_off, keys_off, strings_off, blocks_off)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    data = b"".join([header, zdict, *file_recs, *section_recs, key_table, bytes(strings), bytes(blocks)])
+    atomic_write(path, data)
+    return len(file_recs), len(section_recs), raw_total, len(data)
+
+
+class Pack:
+    """Read-only view over a pack; lookups binary-search the mmapped tables."""
+
+    def __init__(self, path=PACK_PATH):
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, self.nfiles, self.nsections, dict_len, dict_off, self._files, self._sections,
+         self._keys, self._strings, self._blocks) = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a corpus pack (rebuild with 'build')")
+        self._zdict = self._mm[dict_off:dict_off + dict_len]
+
+    def close(self):
+        self._mm.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _raw_string(self, off, length):
+        start = self._strings + off
+        return self._mm[start:start + length]
+
+    def _file(self, file_id):
+        p_off, p_len, first, count = FILE_REC.unpack_from(self._mm, self._files + file_id * FILE_REC.size)
+        return self._raw_string(p_off, p_len).decode("utf-8"), first, count
+
+    def _section(self, sec_id):
+        return SECTION_REC.unpack_from(self._mm, self._sections + sec_id * SECTION_REC.size)
+
+    def _title(self, sec_id):
+        _, t_off, t_len, _, _, _ = self._section(sec_id)
+        return self._raw_string(t_off, t_len).decode("utf-8")
+
+    def _heading(self, sec_id):
+        titles = []
+        while sec_id != NO_PARENT:
+            titles.append(self._title(sec_id))
+            sec_id = self._section(sec_id)[0]
+        return " > ".join(reversed(titles))
+
+    def _within(self, sec_id, ancestor):
+        while sec_id != NO_PARENT and sec_id > ancestor:
+            sec_id = self._section(sec_id)[0]
+        return sec_id == ancestor
+
+    def _data(self, sec_id):
+        _, _, _, off, length, _ = self._section(sec_id)
+        start = self._blocks + off
+        d = zlib.decompressobj(-15, zdict=self._zdict) if self._zdict else zlib.decompressobj(-15)
+        return d.decompress(self._mm[start:start + length]) + d.flush()
+
+    def _find_file(self, rel):
+        key = rel.encode("utf-8")
+        lo, hi = 0, self.nfiles
+        while lo < hi:
+            mid = (lo + hi) // 2
+            p_off, p_len, first, count = FILE_REC.unpack_from(self._mm, self._files + mid * FILE_REC.size)
+            probe = self._raw_string(p_off, p_len)
+            if probe < key:
+                lo = mid + 1
+            elif probe > key:
+                hi = mid
+            else:
+                return first, count
+        return None
+
+    def _find_key(self, rel, heading):
+        key = (rel.encode("utf-8"), heading.encode("utf-8"))
+        lo, hi = 0, self.nsections
+        while lo < hi:
+            mid = (lo + hi) // 2
+            (sec_id,) = KEY_REC.unpack_from(self._mm, self._keys + mid * KEY_REC.size)
+            probe = (self._owner(sec_id), self._heading(sec_id).encode("utf-8"))
+            if probe < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self.nsections:
+            (sec_id,) = KEY_REC.unpack_from(self._mm, self._keys + lo * KEY_REC.size)
+            if (self._owner(sec_id), self._heading(sec_id).encode("utf-8")) == key:
+                return sec_id
+        return None
+
+    def _owner(self, sec_id):
+        # Files are stored in path order and own consecutive section ids
+        lo, hi = 0, self.nfiles - 1
+        while lo < hi:
+            mid = (lo + hi + 1) // 2
+            _, _, first, _ = FILE_REC.unpack_from(self._mm, self._files + mid * FILE_REC.size)
+            if first <= sec_id:
+                lo = mid
+            else:
+                hi = mid - 1
+        p_off, p_len, _, _ = FILE_REC.unpack_from(self._mm, self._files + lo * FILE_REC.size)
+        return self._raw_string(p_off, p_len)
+
+    def files(self):
+        return [self._file(i)[0] for i in range(self.nfiles)]
+
+    def sections(self, rel):
+        """Heading paths of a packed file, in file order ("" is the preamble)."""
+        found = self._find_file(rel)
+        if found is None:
+            raise KeyError(f"{rel} is not in the pack")
+        first, count = found
+        return [self._heading(i) for i in range(first, first + count)]
+
+    def read_file(self, rel):
+        found = self._find_file(rel)
+        if found is None:
+            raise KeyError(f"{rel} is not in the pack")
+        first, count = found
+        return b"".join(self._data(i) for i in range(first, first + count))
+
+    def section(self, rel, heading):
+        """Bytes of one section including its subsections, as _mdsections.extract_section returns.
+
+        heading is an exact heading path, else the first section whose title starts
+        with it (case-insensitive).
+        """
+        found = self._find_file(rel)
+        if found is None:
+            raise KeyError(f"{rel} is not in the pack")
+        first, count = found
+        sec_id = self._find_key(rel, heading)
+        if sec_id is None:
+            wanted = heading.lower()
+            sec_id = next((i for i in range(first, first + count) if self._title(i).lower().startswith(wanted)), None)
+            if sec_id is None:
+                raise KeyError(f"{rel} has no section matching {heading!r}")
+        end = sec_id + 1
+        while end < first + count and self._within(end, sec_id):
+            end += 1
+        return b"".join(self._data(i) for i in range(sec_id, end))
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    command, rest = (argv[0], argv[1:]) if argv else (None, [])
+    if command == "build" and not rest:
+        start = time.perf_counter()
+        nfiles, nsections, raw, packed = build_pack()
+        print(f"Packed {nfiles} files ({nsections} sections) into {PACK_PATH}: {raw / 1e6:.1f} MB -> "
+              f"{packed / 1e6:.1f} MB in {(time.perf_counter() - start) * 1000:.0f} ms")
+        return
+    if command not in ("get", "list", "check") or (command == "get" and not 1 <= len(rest) <= 2) \
+            or (command == "list" and len(rest) > 1) or (command == "check" and rest):
+        raise SystemExit(__doc__)
+    if not os.path.exists(PACK_PATH):
+        build_pack()
+    with Pack() as pack:
+        try:
+            if command == "get":
+                start = time.perf_counter()
+                data = pack.section(*rest) if len(rest) == 2 else pack.read_file(rest[0])
+                elapsed = time.perf_counter() - start
+                sys.stdout.buffer.write(data)
+                print(f"{len(data)} bytes in {elapsed * 1e6:.0f} us", file=sys.stderr)
+            elif command == "list":
+                for name in (pack.sections(rest[0]) if rest else pack.files()):
+                    print(name or "(preamble)")
+            else:
+                stale = []
+                for rel in pack.files():
+                    path = os.path.join(REPO_ROOT, rel)
+                    if not os.path.exists(path):
+                        stale.append(f"{rel}: removed since the pack was built")
+                        continue
+                    with open(path, "rb") as f:
+                        if f.read() != pack.read_file(rel):
+                            stale.append(f"{rel}: differs from the repo")
+                for line in stale:
+                    print(line)
+                print(f"{pack.nfiles} files, {len(stale)} stale", file=sys.stderr)
+                if stale:
+                    raise SystemExit(1)
+        except KeyError as e:
+            raise SystemExit(f"error: {e.args[0]}")
+
+
+if __name__ == "__main__":
+    main()
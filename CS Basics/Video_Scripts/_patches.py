@@ -0,0 +1,150 @@
+"""Heading-anchored patches for existing topic scripts.
+
+A patch targets a section by its heading text ("What Could Go Wrong" matches
+"## What Could Go Wrong? (Mini Disaster Story)") instead of an exact substring.
+Supported operations:
+
+    insert   - add text just before the anchor heading (ahead of its "---" rule)
+    append   - add text at the end of the anchor section (ahead of its "---" rule)
+    replace  - replace the anchor section's body
+
+Nothing is written into the script to mark a patch as applied. The caller
+passes the patch IDs it recorded for a file (the generator keeps them in its
+manifest), and a patch whose text already sits at its anchor counts as applied
+too, so re-running is a no-op. All patches for one file are applied on a
+single parse of that file.
+"""
+
+import re
+from collections import namedtuple, defaultdict
+
+from _mdsections import HEADING_RE, Fences
+
+Patch = namedtuple("Patch", "id target op anchor text")
+
+OPS = ("insert", "append", "replace")
+
+RULE_RE = re.compile(r"^\s*(-{3,}|\*{3,}|_{3,})\s*$")
+
+
+class PatchError(Exception):
+    pass
+
+
+def parse_sections(text):
+    """Split markdown into blocks [title, lines] in one pass.
+
+    Block 0 is the preamble (title None); each later block starts at a heading line.
+    Headings inside fenced code blocks are ignored.
+    """
+    blocks = [[None, []]]
+    fences = Fences()
+    for line in text.splitlines(keepends=True):
+        if fences.feed(line.encode("utf-8")) is None:
+            m = HEADING_RE.match(line)
+            if m:
+                blocks.append([m.group(2), [line]])
+                continue
+        blocks[-1][1].append(line)
+    return blocks
+
+
+def find_block(blocks, anchor):
+    wanted = anchor.lower()
+    for i, (title, _) in enumerate(blocks):
+        if title is not None and title.lower().startswith(wanted):
+            return i
+    raise PatchError(f"no section heading matching {anchor!r}")
+
+
+def _split_tail(lines):
+    # Trailing blank lines and "---" rules belong after any appended text
+    cut = len(lines)
+    while cut > 0 and (not lines[cut - 1].strip() or RULE_RE.match(lines[cut - 1])):
+        cut -= 1
+    return lines[:cut], lines[cut:]
+
+
+def _insert_at_end(lines, patch):
+    body, tail = _split_tail(lines)
+    if body and not body[-1].endswith("\n"):
+        body[-1] += "\n"
+    chunk = ["\n"] + [l + "\n" for l in patch.text.strip("\n").split("\n")]
+    if not tail:
+        tail = ["\n"]
+    elif tail[0].strip():
+        tail = ["\n"] + tail
+    return body + chunk + tail
+
+
+def _in_place(blocks, patch):
+    """Whether the patch's text already sits where the patch would put it."""
+    i = find_block(blocks, patch.anchor)
+    text = patch.text.strip()
+    if patch.op == "insert":
+        return text in "".join(blocks[i - 1][1])
+    if patch.op == "append":
+        return text in "".join(blocks[i][1])
+    if patch.op == "replace":
+        return "".join(_split_tail(blocks[i][1][1:])[0]).strip() == text
+    return False
+
+
+def _apply_one(blocks, patch):
+    i = find_block(blocks, patch.anchor)
+    if patch.op == "insert":
+        # The text before a heading lives at the end of the previous block
+        blocks[i - 1][1] = _insert_at_end(blocks[i - 1][1], patch)
+    elif patch.op == "append":
+        blocks[i][1] = _insert_at_end(blocks[i][1], patch)
+    elif patch.op == "replace":
+        _, tail = _split_tail(blocks[i][1][1:])
+        blocks[i][1] = _insert_at_end(blocks[i][1][:1] + tail, patch)
+    else:
+        raise PatchError(f"unknown patch op {patch.op!r} (expected one of {', '.join(OPS)})")
+
+
+def apply_to_text(text, patches, recorded=()):
+    """Apply patches to one document. Returns (new text, applied ids, already-applied ids).
+
+    recorded holds the IDs already applied to text; other patches whose text is in
+    place are reported as already applied as well.
+    """
+    blocks = parse_sections(text)
+    applied, skipped = [], []
+    for patch in patches:
+        if patch.id in recorded or _in_place(blocks, patch):
+            skipped.append(patch.id)
+            continue
+        _apply_one(blocks, patch)
+        applied.append(patch.id)
+    if not applied:
+        return text, applied, skipped
+    return "".join("".join(lines) for _, lines in blocks), applied, skipped
+
+
+def apply_patches(patches, read, write, recorded=None):
+    """Apply a batch of patches across files, reading and writing each file once.
+
+    read(target) returns a file's current text and write(target, text) persists the
+    patched text; recorded(target, text), if given, returns the IDs of the patches
+    known to be applied to that text. Returns a list of (target, patch id, status)
+    where status is "applied", "already applied" or an error message; files with
+    any failing patch are left untouched.
+    """
+    by_target = defaultdict(list)
+    for patch in patches:
+        by_target[patch.target].append(patch)
+    report = []
+    for target, group in by_target.items():
+        try:
+            text = read(target)
+            new_text, applied, skipped = apply_to_text(text, group, recorded(target, text) if recorded else ())
+        except (OSError, PatchError) as e:
+            report.extend((target, p.id, f"error: {e}") for p in group)
+            continue
+        if applied:
+            write(target, new_text)
+        report.extend((target, pid, "applied") for pid in applied)
+        report.extend((target, pid, "already applied") for pid in skipped)
+    return report
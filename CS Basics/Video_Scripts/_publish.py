@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+"""Upload changed Topic scripts to the publishing service, concurrently.
+
+    python _publish.py push URL [DIR] [--concurrency N] [--retries N] [--all]
+    python _publish.py serve [--port 8765] [--store DIR] [--fail-rate 0.2] [--latency 0.05]
+
+"push" PUTs each Topic_*.md whose bytes changed since the last successful push
+to URL/topics/<name>, over a small pool of keep-alive HTTP/1.1 connections with
+at most --concurrency requests in flight. Each request carries an
+Idempotency-Key derived from the name and content hash, so a retried upload is
+never applied twice; failed requests (connection errors, 408/429/5xx) are
+retried with jittered exponential backoff. What was pushed where is remembered
+in .cache/publish/.
+
+"serve" is a local stand-in for the service that speaks the same protocol,
+keeps uploads in memory (or in --store), replays responses for repeated
+idempotency keys, and can inject failures and latency to exercise the client.
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import random
+import re
+import time
+from urllib.parse import quote, unquote, urlsplit
+
+from _fsutil import VIDEO_SCRIPTS_DIR, atomic_write, load_cache, save_cache
+from _topic_registry import TOPIC_FILE_RE
+
+STATE_NAME = os.path.join("publish", "pushed.pickle")
+
+RETRY_STATUSES = {408, 425, 429, 500, 502, 503, 504}
+REQUEST_TIMEOUT = 30.0
+BACKOFF_BASE = 0.1
+BACKOFF_CAP = 5.0
+
+TOPIC_PATH_RE = re.compile(r"^/topics/([^/?]+)$")
+
+
+class PublishError(Exception):
+    pass
+
+
+def idempotency_key(name, data):
+    return hashlib.sha256(name.encode("utf-8") + b"\0" + data).hexdigest()
+
+
+async def read_message(reader):
+    """(start line, {lowercased header: value}, body) of one HTTP/1.1 message, or None at EOF."""
+    line = await reader.readline()
+    if not line:
+        return None
+    headers = {}
+    while True:
+        raw = await reader.readline()
+        if raw in (b"\r\n", b"\n", b""):
+            break
+        key, _, value = raw.decode("latin-1").partition(":")
+        headers[key.strip().lower()] = value.strip()
+    body = await reader.readexactly(int(headers.get("content-length", 0)))
+    return line.decode("latin-1").rstrip("\r\n"), headers, body
+
+
+def format_message(start, headers, body):
+    lines = [start] + [f"{k}: {v}" for k, v in headers.items()] + [f"Content-Length: {len(body)}", "", ""]
+    return "\r\n".join(lines).encode("latin-1") + body
+
+
+class ConnectionPool:
+    """Keep-alive HTTP/1.1 connections to one host; at most `size` requests in flight."""
+
+    def __init__(self, url, size):
+        parts = urlsplit(url)
+        if parts.scheme != "http":
+            raise PublishError(f"only http:// endpoints are supported, got {url!r}")
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.base = parts.path.rstrip("/")
+        self._idle = []
+        self._slots = asyncio.Semaphore(size)
+        self.opened = 0
+
+    async def request(self, method, path, body=b"", headers=None, timeout=None):
+        """(status, headers, body) of one request.
+
+        timeout bounds the request once it holds a slot, so time spent queued behind
+        other requests never counts against it.
+        """
+        async with self._slots:
+            return await asyncio.wait_for(self._send(method, path, body, headers), timeout)
+
+    async def _send(self, method, path, body, headers):
+        if self._idle:
+            reader, writer = self._idle.pop()
+        else:
+            reader, writer = await asyncio.open_connection(self.host, self.port)
+            self.opened += 1
+        try:
+            head = {"Host": f"{self.host}:{self.port}", "Connection": "keep-alive", **(headers or {})}
+            writer.write(format_message(f"{method} {self.base}{path} HTTP/1.1", head, body))
+            await writer.drain()
+            message = await read_message(reader)
+            if message is None:
+                raise ConnectionResetError("server closed the connection")
+        except BaseException:
+            writer.close()
+            raise
+        status_line, resp_headers, resp_body = message
+        if resp_headers.get("connection", "").lower() == "close":
+            writer.close()
+        else:
+            self._idle.append((reader, writer))
+        return int(status_line.split()[1]), resp_headers, resp_body
+
+    async def close(self):
+        for _, writer in self._idle:
+            writer.close()
+        self._idle = []
+
+
+async def upload(pool, name, data, retries):
+    """PUT one script, retrying transient failures. Returns (status, attempts)."""
+    headers = {"Content-Type": "text/markdown; charset=utf-8", "Idempotency-Key": idempotency_key(name, data)}
+    problem = None
+    for attempt in range(retries + 1):
+        if attempt:
+            delay = min(BACKOFF_CAP, BACKOFF_BASE * 2 ** (attempt - 1))
+            await asyncio.sleep(max(problem[1], delay * random.uniform(0.5, 1.0)))
+        try:
+            status, resp_headers, _ = await pool.request("PUT", f"/topics/{quote(name)}", data, headers,
+                                                         REQUEST_TIMEOUT)
+        except (OSError, asyncio.IncompleteReadError, asyncio.TimeoutError) as e:
+            problem = (f"{type(e).__name__}: {e}", 0.0)
+            continue
+        if status < 300:
+            return status, attempt + 1
+        if status not in RETRY_STATUSES:
+            raise PublishError(f"{name}: HTTP {status}")
+        try:
+            retry_after = float(resp_headers.get("retry-after", 0))
+        except ValueError:
+            retry_after = 0.0
+        problem = (f"HTTP {status}", min(retry_after, BACKOFF_CAP))
+    raise PublishError(f"{name}: gave up after {retries + 1} attempts ({problem[0]})")
+
+
+async def _push_all(url, items, concurrency, retries):
+    pool = ConnectionPool(url, concurrency)
+
+    async def one(name, data):
+        try:
+            return name, await upload(pool, name, data, retries)
+        except PublishError as e:
+            return name, e
+
+    try:
+        results = await asyncio.gather(*(one(name, data) for name, data in items))
+    finally:
+        await pool.close()
+    return results, pool.opened
+
+
+def changed_topics(directory, pushed, names=None):
+    """(name, bytes) for every script in directory whose hash differs from what was last pushed."""
+    if names is None:
+        names = sorted(n for n in os.listdir(directory) if TOPIC_FILE_RE.match(n))
+    items = []
+    for name in names:
+        with open(os.path.join(directory, name), "rb") as f:
+            data = f.read()
+        if pushed.get(name) != hashlib.sha256(data).hexdigest():
+            items.append((name, data))
+    return items
+
+
+def push(url, directory=VIDEO_SCRIPTS_DIR, names=None, concurrency=8, retries=5, everything=False):
+    """Upload changed scripts; returns (uploaded names, {name: error}). Progress goes to stdout."""
+    state = load_cache(STATE_NAME, {})
+    pushed = state.setdefault(url, {})
+    items = changed_topics(directory, {} if everything else pushed, names)
+    if not items:
+        print(f"Nothing to publish to {url}")
+        return [], {}
+    start = time.perf_counter()
+    results, opened = asyncio.run(_push_all(url, items, concurrency, retries))
+    data_by_name = dict(items)
+    uploaded, failed = [], {}
+    for name, outcome in results:
+        if isinstance(outcome, PublishError):
+            failed[name] = str(outcome)
+            print(f"Failed {outcome}")
+            continue
+        status, attempts = outcome
+        pushed[name] = hashlib.sha256(data_by_name[name]).hexdigest()
+        uploaded.append(name)
+        if attempts > 1:
+            print(f"Published {name} (HTTP {status}, {attempts} attempts)")
+    save_cache(STATE_NAME, state)
+    print(f"Published {len(uploaded)} of {len(items)} changed script(s) to {url} in "
+          f"{(time.perf_counter() - start) * 1000:.0f} ms over {opened} connection(s)")
+    return uploaded, failed
+
+
+class StandInService:
+    """In-memory stand-in for the publishing service."""
+
+    def __init__(self, store=None, fail_rate=0.0, latency=0.0):
+        self.store = store
+        self.fail_rate = fail_rate
+        self.latency = latency
+        self.topics = {}
+        self.replies = {}  # idempotency key -> (status, body)
+        self.requests = 0
+
+    def handle(self, method, target, headers, body):
+        self.requests += 1
+        m = TOPIC_PATH_RE.match(urlsplit(target).path)
+        if not m:
+            return 404, {"error": "not found"}
+        name = unquote(m.group(1))
+        if method == "GET":
+            if name not in self.topics:
+                return 404, {"error": f"no topic {name}"}
+            return 200, {"name": name, "sha256": hashlib.sha256(self.topics[name]).hexdigest()}
+        if method != "PUT":
+            return 405, {"error": f"{method} not allowed"}
+        key = headers.get("idempotency-key")
+        if key and key in self.replies:
+            status, reply = self.replies[key]
+            return status, dict(reply, replayed=True)
+        if random.random() < self.fail_rate:
+            return 503, {"error": "injected failure"}
+        status = 200 if name in self.topics else 201
+        self.topics[name] = body
+        if self.store:
+            atomic_write(os.path.join(self.store, os.path.basename(name)), body)
+        reply = {"name": name, "sha256": hashlib.sha256(body).hexdigest(), "replayed": False}
+        if key:
+            self.replies[key] = (status, reply)
+        return status, reply
+
+    async def serve_connection(self, reader, writer):
+        try:
+            while True:
+                message = await read_message(reader)
+                if message is None:
+                    break
+                start_line, headers, body = message
+                method, target, _ = start_line.split(" ", 2)
+                if self.latency:
+                    await asyncio.sleep(self.latency)
+                status, reply = self.handle(method, target, headers, body)
+                extra = {"Content-Type": "application/json"}
+                if status == 503:
+                    extra["Retry-After"] = "0"
+                writer.write(format_message(f"HTTP/1.1 {status} -", extra, json.dumps(reply).encode()))
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except asyncio.CancelledError:
+            pass  # server shutting down mid-request; the connection just closes
+        finally:
+            writer.close()
+
+
+async def _serve(host, port, service):
+    server = await asyncio.start_server(service.serve_connection, host, port)
+    print(f"Stand-in publishing service on http://{host}:{port}/ (Ctrl-C to stop)", flush=True)
+    async with server:
+        await server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("push", help="upload changed scripts")
+    p.add_argument("url")
+    p.add_argument("directory", nargs="?", default=VIDEO_SCRIPTS_DIR)
+    p.add_argument("--concurrency", type=int, default=8, metavar="N")
+    p.add_argument("--retries", type=int, default=5, metavar="N")
+    p.add_argument("--all", action="store_true", help="upload every script, not just changed ones")
+    p = sub.add_parser("serve", help="run the local stand-in service")
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=8765)
+    p.add_argument("--store", metavar="DIR", help="also write uploads into DIR")
+    p.add_argument("--fail-rate", type=float, default=0.0, help="fraction of uploads answered with 503")
+    p.add_argument("--latency", type=float, default=0.0, help="seconds of delay per request")
+    args = parser.parse_args(argv)
+
+    if args.command == "serve":
+        if args.store:
+            os.makedirs(args.store, exist_ok=True)
+        try:
+            asyncio.run(_serve(args.host, args.port, StandInService(args.store, args.fail_rate, args.latency)))
+        except KeyboardInterrupt:
+            pass
+        return
+    if args.concurrency < 1:
+        parser.error("--concurrency must be >= 1")
+    try:
+        _, failed = push(args.url, args.directory, None, args.concurrency, args.retries, args.all)
+    except PublishError as e:
+        raise SystemExit(f"error: {e}")
+    if failed:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""Check video scripts against their stated "## Video Length" budget.
+
+    python _script_budget.py [--wpm N] [--tolerance F] [--verbose] [--jobs N] [DIR]
+
+Counts narrated words per section (fenced diagrams, headings, rules and HTML
+comments excluded), converts them to minutes at --wpm, and fails if a script's
+estimate falls outside its "~A-B minutes" budget (widened by --tolerance).
+Section hints such as "The Hook (20-30 seconds)" are reported with --verbose.
+Per-file counts are cached, so reruns over the unchanged directory only stat files.
+"""
+
+import argparse
+import io
+import os
+import re
+import sys
+from collections import namedtuple
+
+from _fsutil import VIDEO_SCRIPTS_DIR, load_cache, refresh_per_file, save_cache
+from _mdsections import Fences, iter_sections
+from _script_model import LENGTH_RE, LEVEL_RE, SCRIPT_RE
+
+CACHE_NAME = os.path.join("budget", "scripts.pickle")
+COUNT_VERSION = 2  # bump when count_script() would count the same file differently
+
+# The series targets ~1100 words for a 4-5 minute video, i.e. roughly 230 words/minute
+WORDS_PER_MINUTE = 230
+TOLERANCE = 0.10
+
+HINT_RE = re.compile(r"\((\d+)\s*(?:-\s*(\d+))?\s*(seconds|secs?|minutes|mins?)\)", re.I)
+COMMENT_RE = re.compile(r"<!--.*?-->", re.S)
+RULE_RE = re.compile(r"^\s*(?:-{3,}|\*{3,}|_{3,})\s*$", re.M)
+WORD_RE = re.compile(r"[A-Za-z0-9]+(?:['’][A-Za-z]+)*")
+
+SectionCount = namedtuple("SectionCount", "title words hint")
+ScriptCount = namedtuple("ScriptCount", "budget level sections words")
+
+
+def count_words(text):
+    fences = Fences()
+    text = "\n".join(line for line in text.split("\n") if fences.feed(line.encode("utf-8")) is None)
+    text = COMMENT_RE.sub(" ", text)
+    return len(WORD_RE.findall(RULE_RE.sub(" ", text)))
+
+
+def _hint_seconds(title):
+    m = HINT_RE.search(title)
+    if not m:
+        return None
+    scale = 60 if m.group(3).lower().startswith("min") else 1
+    lo = int(m.group(1)) * scale
+    return lo, int(m.group(2) or m.group(1)) * scale
+
+
+def count_script(rel, data):
+    budget, level, sections = None, None, []
+    for s in iter_sections(io.BytesIO(data)):
+        title = s.path[-1] if s.path else ""
+        m = LENGTH_RE.search(title)
+        if m:
+            budget = (float(m.group(1)), float(m.group(2) or m.group(1)))
+            level_m = LEVEL_RE.search(title)
+            level = level_m.group(1) if level_m else None
+            continue
+        if s.level <= 1:
+            continue  # title line / preamble, not narrated
+        sections.append(SectionCount(HINT_RE.sub("", title).strip(), count_words(s.body), _hint_seconds(title)))
+    return ScriptCount(budget, level, sections, sum(c.words for c in sections))
+
+
+def load_counts(directory=VIDEO_SCRIPTS_DIR, jobs=1):
+    names = sorted(n for n in os.listdir(directory) if SCRIPT_RE.match(n))
+    cache = load_cache(CACHE_NAME, {})
+    if cache.get("version") != COUNT_VERSION:
+        cache = {"version": COUNT_VERSION}
+    files = cache.setdefault(os.path.abspath(directory), {})
+    changed = refresh_per_file(files, directory, names, count_script, jobs=jobs)
+    if changed or len(files) != len(names):
+        save_cache(CACHE_NAME, cache)
+    return {name: files[name]["value"] for name in names}, changed
+
+
+def minutes(words, wpm):
+    return words / wpm
+
+
+def check_budget(count, wpm=WORDS_PER_MINUTE, tolerance=TOLERANCE):
+    """Return a problem string, or None if the script fits its stated length."""
+    if count.budget is None:
+        return "no '## Video Length' budget"
+    lo, hi = count.budget
+    est = minutes(count.words, wpm)
+    if est < lo * (1 - tolerance):
+        return f"too short: ~{est:.1f} min for a {lo:g}-{hi:g} min budget ({count.words} words)"
+    if est > hi * (1 + tolerance):
+        return f"too long: ~{est:.1f} min for a {lo:g}-{hi:g} min budget ({count.words} words)"
+    return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("directory", nargs="?", default=VIDEO_SCRIPTS_DIR)
+    parser.add_argument("--wpm", type=float, default=WORDS_PER_MINUTE, help="narration speed in words per minute")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE,
+                        help="fractional slack around the stated budget (default %(default)s)")
+    parser.add_argument("--verbose", action="store_true", help="per-section words and time for every script")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1, metavar="N")
+    args = parser.parse_args(argv)
+
+    counts, changed = load_counts(args.directory, args.jobs)
+    failures = 0
+    for name, count in counts.items():
+        problem = check_budget(count, args.wpm, args.tolerance)
+        if problem:
+            failures += 1
+            print(f"FAIL {name}: {problem}")
+        if args.verbose:
+            print(f"{name}: {count.words} words, ~{minutes(count.words, args.wpm):.1f} min")
+            for s in count.sections:
+                secs = s.words / args.wpm * 60
+                note = ""
+                if s.hint and not (s.hint[0] * (1 - args.tolerance) <= secs <= s.hint[1] * (1 + args.tolerance)):
+                    note = f"  (target {s.hint[0]}-{s.hint[1]} s)"
+                print(f"    {s.title:<40} {s.words:>5} words  {secs:6.0f} s{note}")
+    print(f"{len(counts)} scripts ({len(changed)} re-counted), {failures} over or under budget", file=sys.stderr)
+    if failures:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""Structured model of the video scripts, backed by one shared byte buffer.
+
+    python _script_model.py check [DIR]   # skeleton gaps, out-of-order sections, round-trip
+    python _script_model.py stats [DIR]   # section coverage and memory footprint
+
+Every script follows the same "## " skeleton (Hook, Story, ... Next Video).
+load_scripts() reads a whole directory into a single buffer; a Script is its
+byte range and each ScriptSection is a few offsets into that buffer, so the text
+is only decoded when a caller asks for it. Edited section bodies are kept
+aside and spliced in by to_bytes(), which round-trips unedited scripts exactly.
+"""
+
+import io
+import os
+import re
+import sys
+import tracemalloc
+
+from _fsutil import VIDEO_SCRIPTS_DIR
+from _mdsections import iter_headings
+
+SCRIPT_RE = re.compile(r"^Topic_\d+_\w+\.md$")
+LENGTH_RE = re.compile(r"Video Length:\s*~?\s*(\d+(?:\.\d+)?)\s*(?:-\s*(\d+(?:\.\d+)?))?\s*min", re.I)
+LEVEL_RE = re.compile(r"Level:\s*(\w+)", re.I)
+
+# Canonical section keys in script order, with the heading prefixes used for each
+SKELETON = (
+    ("hook", ("The Hook", "Hook")),
+    ("story", ("The Story", "The Big Analogy")),
+    ("another_way", ("Another Way", "A Second Way to Think About It")),
+    ("connecting", ("Connecting to Software", "Now Let's Connect to Software")),
+    ("diagram", ("Let's Walk Through the Diagram", "Let's Look at the Diagram")),
+    ("examples", ("Real-World Examples", "Real Examples")),
+    ("think_together", ("Let's Think Together",)),
+    ("what_could_go_wrong", ("What Could Go Wrong",)),
+    ("surprising_truth", ("Surprising Truth", "Fun Fact")),
+    ("recap", ("Quick Recap",)),
+    ("one_liner", ("One-Liner to Remember",)),
+    ("next_video", ("Next Video",)),
+)
+SECTION_KEYS = tuple(key for key, _ in SKELETON)
+
+# The heading new scripts use for each key, as written in most of the series
+CANONICAL_HEADINGS = {
+    "hook": "The Hook (20-30 seconds)",
+    "story": "The Story",
+    "another_way": "Another Way to See It",
+    "connecting": "Connecting to Software",
+    "diagram": "Let's Walk Through the Diagram",
+    "examples": "Real-World Examples (2-3)",
+    "think_together": "Let's Think Together",
+    "what_could_go_wrong": "What Could Go Wrong? (Mini Disaster Story)",
+    "surprising_truth": "Surprising Truth / Fun Fact",
+    "recap": "Quick Recap (5 bullets)",
+    "one_liner": "One-Liner to Remember",
+    "next_video": "Next Video",
+}
+
+
+def section_key(heading):
+    """Skeleton key for a "## " heading, or None for headings outside the skeleton."""
+    folded = heading.casefold()
+    for key, prefixes in SKELETON:
+        if any(folded.startswith(p.casefold()) for p in prefixes):
+            return key
+    return None
+
+
+class ScriptSection:
+    """One "## " section: heading line plus body, as offsets into the shared buffer."""
+
+    __slots__ = ("key", "_buf", "start", "body_start", "end")
+
+    def __init__(self, key, buf, start, body_start, end):
+        self.key = key
+        self._buf = buf
+        self.start = start
+        self.body_start = body_start
+        self.end = end
+
+    def __repr__(self):
+        return f"<ScriptSection {self.key or self.heading!r} {self.end - self.start} bytes>"
+
+    @property
+    def heading(self):
+        line = str(self._buf[self.start:self.body_start], "utf-8").strip()
+        return line.lstrip("#").strip()
+
+    @property
+    def body(self):
+        return str(self._buf[self.body_start:self.end], "utf-8")
+
+    @property
+    def raw(self):
+        return self._buf[self.start:self.end]
+
+
+class Script:
+    __slots__ = ("name", "_buf", "start", "end", "sections", "_edits")
+
+    def __init__(self, name, buf, start, end, sections):
+        self.name = name
+        self._buf = buf
+        self.start = start
+        self.end = end
+        self.sections = sections
+        self._edits = None
+
+    def __repr__(self):
+        return f"<Script {self.name} {len(self.sections)} sections>"
+
+    @property
+    def preamble(self):
+        """Title, "## Video Length" header and anything else before the first skeleton section."""
+        first = self.sections[0].start if self.sections else self.end
+        return str(self._buf[self.start:first], "utf-8")
+
+    @property
+    def title(self):
+        for line in self.preamble.splitlines():
+            if line.startswith("# "):
+                return line[2:].strip()
+        return None
+
+    @property
+    def video_length(self):
+        m = LENGTH_RE.search(self.preamble)
+        return (float(m.group(1)), float(m.group(2) or m.group(1))) if m else None
+
+    @property
+    def level(self):
+        m = LEVEL_RE.search(self.preamble)
+        return m.group(1) if m else None
+
+    def get(self, key):
+        """First section with this skeleton key, or None."""
+        for s in self.sections:
+            if s.key == key:
+                return s
+        return None
+
+    def __getitem__(self, key):
+        s = self.get(key)
+        if s is None:
+            raise KeyError(f"{self.name} has no {key!r} section")
+        return s
+
+    def body(self, key):
+        if self._edits and key in self._edits:
+            return self._edits[key]
+        return self[key].body
+
+    def set_body(self, key, text):
+        self[key]  # KeyError for sections the script does not have
+        if self._edits is None:
+            self._edits = {}
+        self._edits[key] = text
+
+    @property
+    def edited(self):
+        return bool(self._edits)
+
+    def missing(self):
+        present = {s.key for s in self.sections}
+        return [key for key in SECTION_KEYS if key not in present]
+
+    def out_of_order(self):
+        """Skeleton keys that appear after a section that should follow them."""
+        order = [SECTION_KEYS.index(s.key) for s in self.sections if s.key]
+        return [SECTION_KEYS[i] for prev, i in zip(order, order[1:]) if i < prev]
+
+    def to_bytes(self):
+        buf = self._buf
+        if not self._edits:
+            return bytes(buf[self.start:self.end])
+        first = self.sections[0].start if self.sections else self.end
+        parts = [buf[self.start:first]]
+        done = set()
+        for s in self.sections:
+            if s.key in self._edits and s.key not in done:
+                done.add(s.key)
+                parts += [buf[s.start:s.body_start], self._edits[s.key].encode("utf-8")]
+            else:
+                parts.append(buf[s.start:s.end])
+        return b"".join(parts)
+
+    def to_markdown(self):
+        return self.to_bytes().decode("utf-8")
+
+
+def parse_script(name, buf, start, end):
+    """Build a Script over buf[start:end] (buf is shared, never copied)."""
+    view = memoryview(buf)[start:end]
+    heads = [(level, offset) for level, title, offset in iter_headings(io.BytesIO(view)) if level == 2]
+    sections = []
+    seen_skeleton = False
+    for i, (_, offset) in enumerate(heads):
+        line_end = buf.find(b"\n", start + offset, end)
+        body_start = end if line_end < 0 else line_end + 1
+        heading = str(buf[start + offset:body_start], "utf-8").lstrip("#").strip()
+        key = section_key(heading)
+        seen_skeleton = seen_skeleton or key is not None
+        if not seen_skeleton:
+            continue  # "## Video Length" and friends belong to the preamble
+        section_end = start + heads[i + 1][1] if i + 1 < len(heads) else end
+        sections.append(ScriptSection(key, buf, start + offset, body_start, section_end))
+    return Script(name, buf, start, end, tuple(sections))
+
+
+def load_scripts(directory=VIDEO_SCRIPTS_DIR):
+    """Parse every Topic script in directory into Scripts sharing one buffer, in name order."""
+    names = sorted(n for n in os.listdir(directory) if SCRIPT_RE.match(n))
+    chunks, spans, size = [], [], 0
+    for name in names:
+        with open(os.path.join(directory, name), "rb") as f:
+            data = f.read()
+        chunks.append(data)
+        spans.append((name, size, size + len(data)))
+        size += len(data)
+    buf = b"".join(chunks)
+    del chunks
+    return [parse_script(name, buf, start, end) for name, start, end in spans]
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv or argv[0] not in ("check", "stats") or len(argv) > 2:
+        raise SystemExit(__doc__)
+    directory = argv[1] if len(argv) > 1 else VIDEO_SCRIPTS_DIR
+    tracemalloc.start()
+    scripts = load_scripts(directory)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    if argv[0] == "stats":
+        print(f"{len(scripts)} scripts, {sum(len(s.sections) for s in scripts)} sections, "
+              f"{current / 1024:.0f} KiB held ({peak / 1024:.0f} KiB peak while loading)")
+        for key in SECTION_KEYS:
+            have = sum(1 for s in scripts if s.get(key) is not None)
+            print(f"  {key:<22} {have:>4}/{len(scripts)}")
+        extra = sum(1 for s in scripts for sec in s.sections if sec.key is None)
+        print(f"  {'(outside skeleton)':<22} {extra:>4}")
+        return
+
+    problems = 0
+    for script in scripts:
+        notes = []
+        if script.missing():
+            notes.append("missing " + ", ".join(script.missing()))
+        if script.out_of_order():
+            notes.append("out of order: " + ", ".join(script.out_of_order()))
+        with open(os.path.join(directory, script.name), "rb") as f:
+            if f.read() != script.to_bytes():
+                notes.append("does not round-trip")
+        if notes:
+            problems += 1
+            print(f"{script.name}: {'; '.join(notes)}")
+    print(f"{len(scripts)} scripts, {problems} with skeleton problems", file=sys.stderr)
+    if problems:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""Persistent full-text index over the chapters and video scripts.
+
+    python _search_index.py update                    # (re)index changed files only
+    python _search_index.py query "consistent hashing"
+
+The index is a positional inverted index (term -> sections -> word positions)
+over every markdown section in the repo, written to .cache/search/index.bin
+in a flat layout that is memory-mapped and binary-searched at query time.
+Per-file tokenization is cached, so an update only re-reads files whose bytes
+changed and then rewrites the merged index.
+
+index.bin layout (all integers little-endian u32 unless noted):
+
+    header    magic, counts, and the byte offset of each table (u64)
+    files     nfiles x (path_off, path_len)
+    sections  nsections x (file_id, start, end, heading_off, heading_len)
+    terms     nterms x (term_off, term_len, postings_off (u64), nsec, npos), sorted by term
+    postings  per term: sec_ids[nsec], bounds[nsec + 1], positions[npos]
+    strings   utf-8 paths, headings and terms
+"""
+
+import io
+import mmap
+import os
+import re
+import struct
+import sys
+import time
+from array import array
+from bisect import bisect_left
+from collections import defaultdict, namedtuple
+
+from _fsutil import CACHE_DIR, REPO_ROOT, atomic_write, corpus_files, load_cache, refresh_per_file, save_cache
+from _mdsections import iter_sections
+
+INDEX_PATH = os.path.join(CACHE_DIR, "search", "index.bin")
+STATE_NAME = os.path.join("search", "files.pickle")
+
+MAGIC = b"VSIDX001"
+HEADER = struct.Struct("<8sIII6Q")
+FILE_REC = struct.Struct("<II")
+SECTION_REC = struct.Struct("<IIIII")
+TERM_REC = struct.Struct("<IIQII")
+
+WORD_RE = re.compile(r"[a-z0-9]+")
+
+Hit = namedtuple("Hit", "path heading start end count")
+
+
+def tokenize(text):
+    return WORD_RE.findall(text.lower())
+
+
+def index_file(rel, data):
+    """Per-file cache value: sections plus flat postings arrays (few objects, cheap to pickle).
+
+    words[k] occurs in sections pair_secs[word_bounds[k]:word_bounds[k + 1]]; pair p's
+    positions are positions[pair_bounds[p]:pair_bounds[p + 1]].
+    """
+    sections = []
+    terms = defaultdict(list)
+    for i, s in enumerate(iter_sections(io.BytesIO(data))):
+        sections.append((" > ".join(s.path), s.start, s.end))
+        positions = defaultdict(list)
+        for pos, word in enumerate(tokenize((s.path[-1] + "\n" if s.path else "") + s.body)):
+            positions[word].append(pos)
+        for word, plist in positions.items():
+            terms[word].append((i, plist))
+    words = sorted(terms)
+    word_bounds, pair_secs, pair_bounds, positions = array("I", [0]), array("I"), array("I", [0]), array("I")
+    for word in words:
+        for sec, plist in terms[word]:
+            pair_secs.append(sec)
+            positions.extend(plist)
+            pair_bounds.append(len(positions))
+        word_bounds.append(len(pair_secs))
+    return {"sections": sections, "words": words, "word_bounds": word_bounds,
+            "pair_secs": pair_secs, "pair_bounds": pair_bounds, "positions": positions}
+
+
+def write_index(cache, path=INDEX_PATH):
+    strings = bytearray()
+
+    def intern(text):
+        raw = text.encode("utf-8")
+        strings.extend(raw)
+        return len(strings) - len(raw), len(raw)
+
+    files, sections = [], []
+    merged = defaultdict(list)
+    for file_id, rel in enumerate(sorted(cache)):
+        value = cache[rel]["value"]
+        files.append(FILE_REC.pack(*intern(rel)))
+        base = len(sections)
+        for heading, start, end in value["sections"]:
+            sections.append(SECTION_REC.pack(file_id, start, end, *intern(heading)))
+        wb = value["word_bounds"]
+        for k, word in enumerate(value["words"]):
+            merged[word].append((base, value, wb[k], wb[k + 1]))
+
+    term_recs, postings = [], bytearray()
+    for word in sorted(merged):
+        secs, bounds, positions = array("I"), array("I", [0]), array("I")
+        for base, value, lo, hi in merged[word]:
+            pb, pos = value["pair_bounds"], value["positions"]
+            secs.extend([base + sec for sec in value["pair_secs"][lo:hi]])
+            shift = len(positions) - pb[lo]
+            positions.extend(pos[pb[lo]:pb[hi]])
+            bounds.extend([b + shift for b in pb[lo + 1:hi + 1]])
+        if sys.byteorder == "big":
+            for arr in (secs, bounds, positions):
+                arr.byteswap()
+        off = len(postings)
+        postings += secs.tobytes() + bounds.tobytes() + positions.tobytes()
+        term_recs.append((word, off, len(secs), len(positions)))
+    terms = b"".join(TERM_REC.pack(*intern(w), off, nsec, npos) for w, off, nsec, npos in term_recs)
+
+    files_off = HEADER.size
+    sections_off = files_off + len(files) * FILE_REC.size
+    terms_off = sections_off + len(sections) * SECTION_REC.size
+    postings_off = terms_off + len(terms)
+    strings_off = postings_off + len(postings)
+    header = HEADER.pack(MAGIC, len(files), len(sections), len(term_recs),
+                         files_off, sections_off, terms_off, postings_off, strings_off,
+                         strings_off + len(strings))
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    atomic_write(path, b"".join([header, *files, *sections, terms, bytes(postings), bytes(strings)]))
+
+
+def update_index(root=REPO_ROOT, path=INDEX_PATH):
+    """Re-tokenize changed files and rewrite the index if anything moved. Returns (changed, removed)."""
+    cache = load_cache(STATE_NAME, {})
+    before = set(cache)
+    changed = refresh_per_file(cache, root, corpus_files(root), index_file)
+    removed = sorted(before - set(cache))
+    if changed or removed or not os.path.exists(path):
+        write_index(cache, path)
+    save_cache(STATE_NAME, cache)
+    return changed, removed
+
+
+class SearchIndex:
+    """Read-only view over index.bin; lookups binary-search the mmapped term table."""
+
+    def __init__(self, path=INDEX_PATH):
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._mm)
+        (magic, self.nfiles, self.nsections, self.nterms, self._files, self._sections,
+         self._terms, self._postings, self._strings, _) = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a search index (rebuild with 'update')")
+
+    def close(self):
+        self._view.release()
+        self._mm.close()
+
+    def _string(self, off, length):
+        start = self._strings + off
+        return self._mm[start:start + length].decode("utf-8")
+
+    def _array(self, off, n):
+        view = self._view[off:off + 4 * n]
+        if sys.byteorder == "little":
+            return view.cast("I")
+        arr = array("I", view)
+        arr.byteswap()
+        return arr
+
+    def _term(self, word):
+        key = word.encode("utf-8")
+        lo, hi = 0, self.nterms
+        while lo < hi:
+            mid = (lo + hi) // 2
+            off, length, post_off, nsec, npos = TERM_REC.unpack_from(self._mm, self._terms + mid * TERM_REC.size)
+            start = self._strings + off
+            probe = self._mm[start:start + length]
+            if probe < key:
+                lo = mid + 1
+            elif probe > key:
+                hi = mid
+            else:
+                base = self._postings + post_off
+                return (self._array(base, nsec), self._array(base + 4 * nsec, nsec + 1),
+                        self._array(base + 4 * (2 * nsec + 1), npos))
+        return None
+
+    def section(self, sec_id):
+        file_id, start, end, h_off, h_len = SECTION_REC.unpack_from(self._mm, self._sections + sec_id * SECTION_REC.size)
+        p_off, p_len = FILE_REC.unpack_from(self._mm, self._files + file_id * FILE_REC.size)
+        return self._string(p_off, p_len), self._string(h_off, h_len), start, end
+
+    def search(self, query, limit=20):
+        """Sections containing query as a phrase, most occurrences first."""
+        words = tokenize(query)
+        if not words:
+            return []
+        postings = []
+        for word in words:
+            p = self._term(word)
+            if p is None:
+                return []
+            postings.append(p)
+        # Walk the rarest term's sections and bisect into the others
+        order = sorted(range(len(words)), key=lambda i: len(postings[i][0]))
+        hits = []
+        rare_secs, rare_bounds, _ = postings[order[0]]
+        for sec in rare_secs:
+            slots = []
+            for sec_ids, bounds, positions in postings:
+                j = bisect_left(sec_ids, sec)
+                if j == len(sec_ids) or sec_ids[j] != sec:
+                    break
+                slots.append(positions[bounds[j]:bounds[j + 1]])
+            else:
+                count = _phrase_count(slots)
+                if count:
+                    hits.append((count, sec))
+        hits.sort(key=lambda h: (-h[0], h[1]))
+        return [Hit(*self.section(sec), count) for count, sec in hits[:limit]]
+
+
+def _phrase_count(slots):
+    if len(slots) == 1:
+        return len(slots[0])
+    rest = [set(s) for s in slots[1:]]
+    return sum(1 for p in slots[0] if all(p + i + 1 in s for i, s in enumerate(rest)))
+
+
+def is_video_topic(path):
+    return os.path.basename(path).startswith("Topic_")
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == ["update"] and len(argv) == 1:
+        start = time.perf_counter()
+        changed, removed = update_index()
+        print(f"Indexed {len(changed)} changed file(s), dropped {len(removed)} "
+              f"in {(time.perf_counter() - start) * 1000:.1f} ms")
+        return
+    if argv[:1] == ["query"] and len(argv) >= 2:
+        if not os.path.exists(INDEX_PATH):
+            update_index()
+        index = SearchIndex()
+        start = time.perf_counter()
+        hits = index.search(" ".join(argv[1:]))
+        elapsed = time.perf_counter() - start
+        for title, group in (("Chapters", [h for h in hits if not is_video_topic(h.path)]),
+                             ("Video topics", [h for h in hits if is_video_topic(h.path)])):
+            if group:
+                print(f"{title}:")
+                for h in group:
+                    print(f"  {h.path}:{h.start}  {h.heading}  ({h.count}x)")
+        print(f"{len(hits)} section(s) in {elapsed * 1000:.3f} ms")
+        index.close()
+        return
+    raise SystemExit(__doc__)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,308 @@
+"""Output sinks for the script generator.
+
+    DirectorySink  files under a directory (atomic writes, keeps the --incremental manifest)
+    MemorySink     a dict of name -> bytes, for tests and dry tooling
+    ArchiveSink    one .zip / .tar / .tar.gz / .tgz file, written in batches
+    DryRunSink     wraps another sink; records what would change instead of writing
+
+open_sink(target) picks one from a path: archive extensions give an ArchiveSink,
+anything else a DirectorySink.
+"""
+
+import hashlib
+import io
+import json
+import os
+import tarfile
+import tempfile
+import time
+import zipfile
+
+from _fsutil import atomic_write
+
+# Per-output content hashes from the last run; lets --incremental skip unchanged files
+MANIFEST_NAME = ".generate_manifest.json"
+
+ARCHIVE_SUFFIXES = (".zip", ".tar", ".tar.gz", ".tgz")
+
+
+class DirectorySink:
+    parallel_safe = True  # picklable; workers can write their own files
+
+    def __init__(self, root):
+        self.root = os.path.abspath(root)  # created by the first write, so dry runs leave no trace
+
+    def __str__(self):
+        return self.root
+
+    def path(self, name):
+        return os.path.join(self.root, name)
+
+    def read(self, name):
+        try:
+            with open(self.path(name), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def size(self, name):
+        try:
+            return os.stat(self.path(name)).st_size
+        except OSError:
+            return None
+
+    def previous(self, name):
+        return self.read(name)
+
+    def unchanged(self, name, entry, digest):
+        # Same bytes as last run; only re-hash the file on disk if its stat moved
+        if not entry or entry.get("sha256") != digest:
+            return False
+        try:
+            st = os.stat(self.path(name))
+        except OSError:
+            return False
+        if st.st_size == entry.get("size") and st.st_mtime_ns == entry.get("mtime_ns"):
+            return True
+        if hashlib.sha256(self.read(name) or b"").hexdigest() != digest:
+            return False
+        entry.update(size=st.st_size, mtime_ns=st.st_mtime_ns)
+        return True
+
+    def write(self, name, data):
+        os.makedirs(os.path.dirname(self.path(name)), exist_ok=True)
+        atomic_write(self.path(name), data)
+        st = os.stat(self.path(name))
+        return {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+    def load_manifest(self):
+        try:
+            return json.loads(self.read(MANIFEST_NAME) or b"{}")
+        except ValueError:
+            return {}
+
+    def save_manifest(self, manifest):
+        self.write(MANIFEST_NAME, (json.dumps(manifest, indent=2, sort_keys=True) + "\n").encode("utf-8"))
+
+    def close(self):
+        pass
+
+    def abort(self):
+        pass
+
+
+class MemorySink:
+    parallel_safe = False
+
+    def __init__(self, files=None):
+        self.files = dict(files or {})
+        self.manifest = {}
+
+    def __str__(self):
+        return "<memory>"
+
+    def read(self, name):
+        return self.files.get(name)
+
+    def size(self, name):
+        return len(self.files[name]) if name in self.files else None
+
+    def previous(self, name):
+        return self.files.get(name)
+
+    def unchanged(self, name, entry, digest):
+        # No stat to trust, so the stored bytes are hashed; an edited entry is rewritten
+        if not entry or entry.get("sha256") != digest or name not in self.files:
+            return False
+        return hashlib.sha256(self.files[name]).hexdigest() == digest
+
+    def write(self, name, data):
+        self.files[name] = data
+        return {"size": len(data)}
+
+    def load_manifest(self):
+        return dict(self.manifest)
+
+    def save_manifest(self, manifest):
+        self.manifest = dict(manifest)
+
+    def close(self):
+        pass
+
+    def abort(self):
+        pass
+
+
+class ArchiveSink:
+    """Write-only archive, rebuilt on every run; members are buffered and flushed every BATCH_BYTES.
+
+    Nothing touches the disk until the first flush, so a dry run over an archive
+    leaves no trace. read() sees the archive being built (empty at the start);
+    size() and previous() see the one already at the target.
+    """
+
+    parallel_safe = False
+    BATCH_BYTES = 4 << 20
+
+    def __init__(self, path):
+        self.target = os.path.abspath(path)
+        self.kind = "zip" if path.endswith(".zip") else "tar"
+        self._mtime = int(os.environ.get("SOURCE_DATE_EPOCH", time.time()))
+        self._pending = []
+        self._pending_bytes = 0
+        self._archive = None
+        self._existing = None
+
+    def __str__(self):
+        return self.target
+
+    def _open(self):
+        # Stream into a temp file beside the target; renamed into place on close()
+        directory = os.path.dirname(self.target)
+        os.makedirs(directory, exist_ok=True)
+        prefix = "." + os.path.basename(self.target) + "."
+        fd, self._tmp = tempfile.mkstemp(dir=directory, prefix=prefix, suffix=".tmp")
+        self._file = os.fdopen(fd, "w+b")
+        if self.kind == "zip":
+            self._archive = zipfile.ZipFile(self._file, "w", zipfile.ZIP_DEFLATED)
+        else:
+            mode = "w:gz" if self.target.endswith((".tar.gz", ".tgz")) else "w"
+            self._archive = tarfile.open(fileobj=self._file, mode=mode)
+
+    def _previous_members(self):
+        # {name: bytes} of the archive a close() would replace; empty if there is none
+        if self._existing is None:
+            self._existing = {}
+            try:
+                if self.kind == "zip":
+                    with zipfile.ZipFile(self.target) as z:
+                        self._existing = {i.filename: z.read(i) for i in z.infolist() if not i.is_dir()}
+                else:
+                    with tarfile.open(self.target) as t:
+                        self._existing = {m.name: t.extractfile(m).read() for m in t.getmembers() if m.isfile()}
+            except (OSError, zipfile.BadZipFile, tarfile.TarError):
+                pass
+        return self._existing
+
+    def read(self, name):
+        return None
+
+    def size(self, name):
+        data = self._previous_members().get(name)
+        return None if data is None else len(data)
+
+    def previous(self, name):
+        return self._previous_members().get(name)
+
+    def unchanged(self, name, entry, digest):
+        return False
+
+    def write(self, name, data):
+        self._pending.append((name, data))
+        self._pending_bytes += len(data)
+        if self._pending_bytes >= self.BATCH_BYTES:
+            self.flush()
+        return {"size": len(data)}
+
+    def flush(self):
+        if self._pending and self._archive is None:
+            self._open()
+        for name, data in self._pending:
+            if self.kind == "zip":
+                info = zipfile.ZipInfo(name, time.gmtime(self._mtime)[:6])
+                info.compress_type = zipfile.ZIP_DEFLATED
+                info.external_attr = 0o644 << 16
+                self._archive.writestr(info, data)
+            else:
+                info = tarfile.TarInfo(name)
+                info.size, info.mtime, info.mode = len(data), self._mtime, 0o644
+                self._archive.addfile(info, io.BytesIO(data))
+        self._pending, self._pending_bytes = [], 0
+
+    def load_manifest(self):
+        return {}
+
+    def save_manifest(self, manifest):
+        pass
+
+    def close(self):
+        # The archive only appears on disk once it is complete
+        self.flush()
+        if self._archive is None:
+            self._open()  # a run that wrote nothing still leaves an (empty) archive
+        self._archive.close()
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        os.chmod(self._tmp, 0o644)
+        os.replace(self._tmp, self.target)
+
+    def abort(self):
+        if self._archive is None:
+            return
+        self._archive.close()
+        self._file.close()
+        os.unlink(self._tmp)
+        self._archive = None
+
+
+class DryRunSink:
+    """Render against another sink without touching it.
+
+    Each write is classified as added, changed or unchanged against what the target
+    holds before the run: the manifest entry and file stat are checked first, then
+    the size, and the previous bytes are only read when those cannot tell. changes
+    holds (name, status, old bytes or None, new bytes).
+    """
+
+    parallel_safe = False
+
+    def __init__(self, target):
+        self.target = target
+        self.manifest = target.load_manifest()
+        self.changes = []
+        self._written = {}
+
+    def __str__(self):
+        return f"{self.target} (dry run)"
+
+    def read(self, name):
+        data = self._written.get(name)
+        return data if data is not None else self.target.read(name)
+
+    def unchanged(self, name, entry, digest):
+        return False  # always render, so every output is classified
+
+    def write(self, name, data):
+        self._written[name] = data
+        digest = hashlib.sha256(data).hexdigest()
+        size = self.target.size(name)
+        if size is None:
+            self.changes.append((name, "added", None, data))
+        elif self.target.unchanged(name, self.manifest.get(name), digest):
+            self.changes.append((name, "unchanged", None, data))
+        else:
+            old = self.target.previous(name) if size == len(data) else None
+            if old == data:
+                self.changes.append((name, "unchanged", None, data))
+            else:
+                self.changes.append((name, "changed", old if old is not None else self.target.previous(name), data))
+        return {"size": len(data)}
+
+    def load_manifest(self):
+        return dict(self.manifest)
+
+    def save_manifest(self, manifest):
+        pass
+
+    def close(self):
+        self.target.abort()
+
+    def abort(self):
+        self.target.abort()
+
+
+def open_sink(target):
+    if target.endswith(ARCHIVE_SUFFIXES):
+        return ArchiveSink(target)
+    return DirectorySink(target)
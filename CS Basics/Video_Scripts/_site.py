@@ -0,0 +1,544 @@
+#!/usr/bin/env python3
+"""Build the chapters and video scripts into a static HTML site, incrementally.
+
+    python _site.py [--out DIR] [--jobs N] [--force]
+
+Every corpus markdown file becomes one page, or several for large chapters
+(over PAGINATE_OVER bytes), which are split at "#" to "###" headings into pages of
+about PAGE_TARGET bytes with a pager and, on the first page, a table of
+contents. Links between files are rewritten to .html and pointed at the page
+that holds the target heading.
+
+A per-file outline (headings, anchors, outgoing links) is cached in
+.cache/site/. Each file's pages are keyed by its content hash, the site
+template version, its own page split and the heading-to-page maps of every
+file it links to; only files whose key changed are re-rendered, across a
+process pool. Output defaults to .cache/site/html.
+"""
+
+import argparse
+import hashlib
+import html
+import os
+import re
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import quote, unquote
+
+from _check_links import ANCHOR_TAG_RE, EXTERNAL_RE, LINK_RE, resolve, slugify
+from _fsutil import CACHE_DIR, REPO_ROOT, atomic_write, corpus_files, load_cache, refresh_per_file, save_cache
+from _mdsections import FENCE_RE, HEADING_RE
+from _template import compile_template
+
+DEFAULT_OUT = os.path.join(CACHE_DIR, "site", "html")
+OUTLINE_NAME = os.path.join("site", "outlines.pickle")
+STATE_NAME = os.path.join("site", "pages.pickle")
+
+PAGINATE_OVER = 128 * 1024
+PAGE_TARGET = 64 * 1024
+
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<title>{title}</title>
+<link rel="stylesheet" href="{root}style.css">
+</head>
+<body>
+<nav class="crumbs"><a href="{root}index.html">Home</a>{crumbs}</nav>
+{pager}<main>
+{body}
+</main>
+{pager}</body>
+</html>
+"""
+PAGE_PLAN = compile_template(PAGE_TEMPLATE)
+
+STYLESHEET = """body { max-width: 52rem; margin: 0 auto; padding: 1rem; font: 16px/1.6 system-ui, sans-serif; color: #222; }
+pre { background: #f6f8fa; padding: 0.75rem; overflow-x: auto; font-size: 0.85rem; line-height: 1.35; }
+code { font-family: ui-monospace, Menlo, Consolas, monospace; }
+table { border-collapse: collapse; margin: 1rem 0; }
+th, td { border: 1px solid #ccc; padding: 0.3rem 0.6rem; vertical-align: top; }
+blockquote { margin: 1rem 0; padding-left: 1rem; border-left: 4px solid #ddd; color: #555; }
+nav.crumbs, nav.pager { font-size: 0.9rem; color: #666; margin: 0.5rem 0; }
+nav.pager a { margin: 0 0.5rem; }
+"""
+
+# Bump when the markdown rendering changes; the page template is hashed in automatically
+RENDERER_VERSION = 2
+SITE_VERSION = (RENDERER_VERSION, hashlib.sha256((PAGE_TEMPLATE + STYLESHEET).encode()).hexdigest()[:16])
+
+FENCE_LINE_RE = re.compile(r"^ {0,3}(`{3,}|~{3,})\s*([^`]*)$")
+RULE_RE = re.compile(r"^ {0,3}([-*_])(?: *\1){2,} *$")
+TABLE_SEP_RE = re.compile(r"^\s*\|?\s*:?-{2,}:?\s*(?:\|\s*:?-{2,}:?\s*)*\|?\s*$")
+LIST_ITEM_RE = re.compile(r"^(\s*)([-*+]|\d{1,9}[.)])(?:\s+(.*)|$)")
+TASK_RE = re.compile(r"^\[([ xX])\]\s+")
+
+SAFE_TAGS = {"a", "b", "br", "center", "code", "del", "details", "div", "em", "i", "img", "ins", "kbd",
+             "mark", "p", "s", "span", "strong", "sub", "summary", "sup", "u"}
+# Raw tags are rebuilt with only these attributes; URL-valued ones must pass safe_url()
+SAFE_ATTRS = {"alt", "href", "id", "name", "src", "title"}
+URL_ATTRS = {"href", "src"}
+SAFE_SCHEMES = {"http", "https", "mailto"}
+HTML_BLOCK_RE = re.compile(r"^ {0,3}</?([a-zA-Z][a-zA-Z0-9]*)[\s/>]")
+ATTR_RE = re.compile(r"""([a-zA-Z_:][-\w:.]*)(?:\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s"'=<>`]+)))?""")
+SCHEME_RE = re.compile(r"^([a-zA-Z][a-zA-Z0-9+.-]*):")
+CODE_SPAN_RE = re.compile(r"(`+)(.+?)\1")
+AUTOLINK_RE = re.compile(r"<(https?://[^>\s]+)>")
+IMAGE_RE = re.compile(r"!\[([^\]]*)\]\(\s*<?([^)\s>]+)>?(?:\s+\"[^\"]*\")?\s*\)")
+INLINE_LINK_RE = re.compile(r"\[((?:[^\[\]]|\[[^\]]*\])*)\]\(\s*<?([^)\s>]+)>?(?:\s+\"[^\"]*\")?\s*\)")
+INLINE_TAG_RE = re.compile(r"<(/?)([a-zA-Z][a-zA-Z0-9]*)(?:\s[^<>]*)?/?>|<!--.*?-->")
+STRONG_RE = re.compile(r"\*\*(?=\S)(.+?)(?<=\S)\*\*|(?<!\w)__(?=\S)(.+?)(?<=\S)__(?!\w)")
+EM_RE = re.compile(r"(?<![\w*])\*(?=[^\s*])(.+?)(?<=[^\s*])\*(?![\w*])|(?<!\w)_(?=[^\s_])(.+?)(?<=[^\s_])_(?!\w)")
+DEL_RE = re.compile(r"~~(?=\S)(.+?)(?<=\S)~~")
+HOLE_RE = re.compile(r"\x00(\d+)\x00")
+
+
+def unique_slug(seen, title):
+    """GitHub's anchor for a heading: the slug, suffixed -1, -2 ... when it repeats in a file."""
+    slug = slugify(title)
+    anchor = f"{slug}-{seen[slug]}" if seen[slug] else slug
+    seen[slug] += 1
+    return anchor
+
+
+def outline_file(rel, data):
+    """Per-file cache value: title, size, cut points, anchors with offsets, and linked .md files."""
+    title, cuts, anchors, links = None, [], {}, set()
+    seen = Counter()
+    fence, offset = None, 0
+    for raw in data.splitlines(keepends=True):
+        marker = FENCE_RE.match(raw)
+        if fence:
+            if marker and marker.group(1)[:1] == fence:
+                fence = None
+        elif marker:
+            fence = marker.group(1)[:1]
+        else:
+            line = raw.decode("utf-8", "replace")
+            m = HEADING_RE.match(line)
+            if m:
+                level = len(m.group(1))
+                anchors.setdefault(unique_slug(seen, m.group(2)), offset)
+                if level == 1 and title is None:
+                    title = _plain(m.group(2))
+                elif level <= 3:
+                    cuts.append((offset, _plain(m.group(2))))
+            for name in ANCHOR_TAG_RE.findall(line):
+                anchors.setdefault(name.lower(), offset)
+            for target in LINK_RE.findall(line):
+                if not EXTERNAL_RE.match(target):
+                    path, _ = resolve(rel, target)
+                    if path and path.endswith(".md"):
+                        links.add(path)
+        offset += len(raw)
+    return {"title": title or os.path.basename(rel)[:-3].replace("_", " "), "size": len(data),
+            "cuts": cuts, "anchors": anchors, "links": sorted(links)}
+
+
+def _plain(text):
+    return re.sub(r"[*_`]", "", text).strip()
+
+
+def paginate(outline):
+    """[(start, end, title)] byte ranges of a file's pages; one page unless the file is large."""
+    size = outline["size"]
+    if size <= PAGINATE_OVER or not outline["cuts"]:
+        return [(0, size, outline["title"])]
+    pages, start, title = [], 0, outline["title"]
+    cuts = outline["cuts"] + [(size, None)]
+    for (offset, heading), (following, _) in zip(cuts, cuts[1:]):
+        if offset > start and following - start > PAGE_TARGET:
+            pages.append((start, offset, title))
+            start, title = offset, heading
+    pages.append((start, size, title))
+    return pages
+
+
+def anchor_pages(outline, pages):
+    """{anchor: page index} for every heading and explicit anchor in the file."""
+    starts = [start for start, _, _ in pages]
+    found = {}
+    for anchor, offset in outline["anchors"].items():
+        index = 0
+        while index + 1 < len(starts) and starts[index + 1] <= offset:
+            index += 1
+        found[anchor] = index
+    return found
+
+
+def page_path(rel, index):
+    return rel[:-3] + (".html" if index == 0 else f"-p{index + 1}.html")
+
+
+class _Page:
+    """What the renderer needs to know about the page being rendered."""
+
+    def __init__(self, rel, path, anchor_maps):
+        self.rel = rel
+        self.path = path
+        self.anchor_maps = anchor_maps
+        self.seen = Counter()
+
+    def slug(self, title):
+        return unique_slug(self.seen, title)
+
+    def href(self, target):
+        """Rewrite a markdown link target for the site: .md -> the .html page holding the anchor."""
+        if EXTERNAL_RE.match(target):
+            return target
+        path, anchor = resolve(self.rel, target)
+        dest_rel = path or self.rel
+        if not dest_rel.endswith(".md"):
+            return target
+        pages = self.anchor_maps.get(dest_rel, {})
+        dest = page_path(dest_rel, pages.get(unquote(anchor).lower(), 0) if anchor else 0)
+        suffix = "#" + anchor if anchor else ""
+        if dest == self.path:
+            return suffix or "#"
+        return quote(os.path.relpath(dest, os.path.dirname(self.path) or ".").replace(os.sep, "/")) + suffix
+
+
+def safe_url(url):
+    """url if it is relative or uses an allowed scheme (http, https, mailto), else None."""
+    m = SCHEME_RE.match("".join(url.split()))  # browsers ignore whitespace inside the scheme
+    return url if not m or m.group(1).lower() in SAFE_SCHEMES else None
+
+
+def clean_tag(m):
+    """A SAFE_TAGS tag matched by INLINE_TAG_RE, rebuilt with only its allowed attributes; else None."""
+    name = (m.group(2) or "").lower()
+    if name not in SAFE_TAGS:
+        return None
+    if m.group(1):
+        return f"</{name}>"
+    attrs = []
+    for am in ATTR_RE.finditer(m.string, m.end(2), m.end() - 1):
+        key = am.group(1).lower()
+        value = next((v for v in am.group(2, 3, 4) if v is not None), "")
+        if key in SAFE_ATTRS and (key not in URL_ATTRS or safe_url(html.unescape(value)) is not None):
+            attrs.append(f' {key}="{html.escape(html.unescape(value))}"')
+    return f"<{name}{''.join(attrs)}>"
+
+
+def sanitize_html(text):
+    """Raw HTML with allowed tags rebuilt (see clean_tag) and every other tag escaped."""
+    return INLINE_TAG_RE.sub(lambda m: clean_tag(m) or html.escape(m.group(0)), text)
+
+
+def render_inline(text, page):
+    holes = []
+
+    def keep(markup):
+        holes.append(markup)
+        return f"\x00{len(holes) - 1}\x00"
+
+    def tag(m):
+        markup = clean_tag(m)
+        return keep(markup) if markup else m.group(0)
+
+    def link_target(url):
+        return html.escape(page.href(url) if safe_url(url) is not None else "#")
+
+    text = CODE_SPAN_RE.sub(lambda m: keep(f"<code>{html.escape(m.group(2).strip())}</code>"), text)
+    text = AUTOLINK_RE.sub(lambda m: keep(f'<a href="{html.escape(m.group(1))}">{html.escape(m.group(1))}</a>'), text)
+    text = IMAGE_RE.sub(lambda m: keep(f'<img src="{link_target(m.group(2))}" '
+                                       f'alt="{html.escape(m.group(1))}">'), text)
+    text = INLINE_LINK_RE.sub(lambda m: keep(f'<a href="{link_target(m.group(2))}">'
+                                             f'{render_inline(m.group(1), page)}</a>'), text)
+    text = INLINE_TAG_RE.sub(tag, text)
+    text = html.escape(text, quote=False)
+    text = STRONG_RE.sub(lambda m: f"<strong>{m.group(1) or m.group(2)}</strong>", text)
+    text = EM_RE.sub(lambda m: f"<em>{m.group(1) or m.group(2)}</em>", text)
+    text = DEL_RE.sub(r"<del>\1</del>", text)
+    while "\x00" in text:
+        text = HOLE_RE.sub(lambda m: holes[int(m.group(1))], text)
+    return text
+
+
+def _cells(line):
+    line = line.strip()
+    if line.startswith("|"):
+        line = line[1:]
+    if line.endswith("|") and not line.endswith("\\|"):
+        line = line[:-1]
+    return [c.strip() for c in re.split(r"(?<!\\)\|", line)]
+
+
+def _starts_block(line):
+    return bool(not line.strip() or FENCE_LINE_RE.match(line) or HEADING_RE.match(line) or RULE_RE.match(line)
+                or line.lstrip().startswith((">", "|")) or LIST_ITEM_RE.match(line))
+
+
+def _indent(line):
+    return len(line) - len(line.lstrip(" "))
+
+
+def render_blocks(lines, page):
+    """HTML for a list of markdown lines, as (kind, html) blocks."""
+    out, i, n = [], 0, len(lines)
+    while i < n:
+        line = lines[i]
+        stripped = line.strip()
+        if not stripped:
+            i += 1
+            continue
+        m = FENCE_LINE_RE.match(line)
+        if m:
+            marker, info = m.group(1), m.group(2).strip()
+            code, i = [], i + 1
+            while i < n:
+                s = lines[i].strip()
+                if s.startswith(marker[0] * len(marker)) and not s.strip(marker[0]):
+                    i += 1
+                    break
+                if s.endswith(marker) and s != marker:  # closing fence glued to the last row
+                    code.append(lines[i].rstrip()[:-len(marker)])
+                    i += 1
+                    break
+                code.append(lines[i])
+                i += 1
+            lang = info.split()[0] if info else ""
+            cls = f' class="language-{html.escape(lang)}"' if lang.isidentifier() else ""
+            out.append(("code", f"<pre><code{cls}>{html.escape(chr(10).join(code))}</code></pre>"))
+            continue
+        m = HEADING_RE.match(line)
+        if m:
+            level = len(m.group(1))
+            out.append(("heading", f'<h{level} id="{html.escape(page.slug(m.group(2)))}">'
+                                   f"{render_inline(m.group(2), page)}</h{level}>"))
+            i += 1
+            continue
+        if RULE_RE.match(line):
+            out.append(("rule", "<hr>"))
+            i += 1
+            continue
+        if stripped.startswith("|") and i + 1 < n and TABLE_SEP_RE.match(lines[i + 1]):
+            head = _cells(line)
+            rows, i = [], i + 2
+            while i < n and lines[i].strip().startswith("|"):
+                rows.append(_cells(lines[i]))
+                i += 1
+            parts = ["<table>", "<thead><tr>" + "".join(f"<th>{render_inline(c, page)}</th>" for c in head)
+                     + "</tr></thead>", "<tbody>"]
+            parts += ["<tr>" + "".join(f"<td>{render_inline(c, page)}</td>" for c in row) + "</tr>" for row in rows]
+            out.append(("table", "\n".join(parts + ["</tbody>", "</table>"])))
+            continue
+        if stripped.startswith(">"):
+            quoted = []
+            while i < n and lines[i].strip().startswith(">"):
+                quoted.append(re.sub(r"^\s*> ?", "", lines[i]))
+                i += 1
+            inner = "\n".join(h for _, h in render_blocks(quoted, page))
+            out.append(("quote", f"<blockquote>\n{inner}\n</blockquote>"))
+            continue
+        if LIST_ITEM_RE.match(line):
+            markup, i = _render_list(lines, i, page)
+            out.append(("list", markup))
+            continue
+        m = HTML_BLOCK_RE.match(line)
+        if m and m.group(1).lower() in SAFE_TAGS:
+            block = []
+            while i < n and lines[i].strip():
+                block.append(lines[i])
+                i += 1
+            out.append(("html", sanitize_html("\n".join(block))))
+            continue
+        para = []
+        while i < n and (not para or not _starts_block(lines[i])):
+            para.append(lines[i].strip() if not lines[i].endswith("  ") else lines[i].lstrip() + "<br>")
+            i += 1
+        text = render_inline("\n".join(para).replace("<br>", "\x01"), page).replace("\x01", "<br>")
+        out.append(("para", f"<p>{text}</p>"))
+    return out
+
+
+def _render_list(lines, i, page):
+    """Render the list starting at lines[i]; returns (html, index after the list)."""
+    first = LIST_ITEM_RE.match(lines[i])
+    indent, ordered = len(first.group(1)), first.group(2)[0].isdigit()
+    items, content_indent, n = [], indent + 2, len(lines)
+    while i < n:
+        line = lines[i]
+        m = LIST_ITEM_RE.match(line)
+        if m and len(m.group(1)) <= indent + 1 and m.group(2)[0].isdigit() == ordered:
+            items.append([m.group(3) or ""])
+            content_indent = len(m.group(1)) + len(m.group(2)) + 1
+        elif not line.strip():
+            j = i + 1
+            while j < n and not lines[j].strip():
+                j += 1
+            nxt = LIST_ITEM_RE.match(lines[j]) if j < n else None
+            if j < n and (_indent(lines[j]) > indent + 1 or
+                          (nxt and len(nxt.group(1)) <= indent + 1 and nxt.group(2)[0].isdigit() == ordered)):
+                items[-1].append("")
+            else:
+                break
+        elif _indent(line) > indent + 1:
+            items[-1].append(line[min(content_indent, _indent(line)):])
+        elif not _starts_block(line) and items[-1][-1]:
+            items[-1].append(line.strip())  # lazy paragraph continuation
+        else:
+            break
+        i += 1
+    while items and items[-1] and items[-1][-1] == "":
+        items[-1].pop()
+    tag = "ol" if ordered else "ul"
+    start = int(first.group(2)[:-1]) if ordered else 1
+    parts = [f"<{tag}" + (f' start="{start}"' if start != 1 else "") + ">"]
+    for item in items:
+        tight = "" not in item
+        box = TASK_RE.match(item[0])
+        if box:
+            item[0] = item[0][box.end():]
+        blocks = render_blocks(item, page)
+        body = "\n".join(h[3:-4] if tight and kind == "para" else h for kind, h in blocks)
+        if box:
+            body = f'<input type="checkbox" disabled{" checked" if box.group(1) != " " else ""}> ' + body
+        parts.append(f"<li>{body}</li>")
+    parts.append(f"</{tag}>")
+    return "\n".join(parts), i
+
+
+def _crumbs(rel):
+    return "".join(f" / {html.escape(part.replace('_', ' '))}" for part in rel.split("/")[:-1])
+
+
+def _pager(pages, index, rel):
+    if len(pages) == 1:
+        return ""
+    base = os.path.basename
+    links = []
+    if index > 0:
+        links.append(f'<a href="{quote(base(page_path(rel, index - 1)))}">&larr; Previous</a>')
+    links.append(f"Page {index + 1} of {len(pages)}")
+    if index + 1 < len(pages):
+        links.append(f'<a href="{quote(base(page_path(rel, index + 1)))}">Next &rarr;</a>')
+    return f'<nav class="pager">{" ".join(links)}</nav>\n'
+
+
+def render_file(rel, root, out, pages, anchor_maps):
+    """Write the page(s) for one markdown file; returns their output paths. Runs in a worker process."""
+    with open(os.path.join(root, rel), "rb") as f:
+        data = f.read()
+    outputs = []
+    seen = Counter()
+    for index, (start, end, title) in enumerate(pages):
+        path = page_path(rel, index)
+        page = _Page(rel, path, anchor_maps)
+        page.seen = seen  # heading ids are numbered across the whole file, as in the markdown
+        body = "\n".join(h for _, h in render_blocks(data[start:end].decode("utf-8", "replace").split("\n"), page))
+        if index == 0 and len(pages) > 1:
+            toc = "".join(f'<li><a href="{quote(os.path.basename(page_path(rel, k)))}">{html.escape(t)}</a></li>'
+                          for k, (_, _, t) in enumerate(pages))
+            body = f'<nav class="toc"><ol>{toc}</ol></nav>\n' + body
+        depth = path.count("/")
+        pager = _pager(pages, index, rel)
+        document = PAGE_PLAN.render({"title": html.escape(title), "root": "../" * depth, "crumbs": _crumbs(rel),
+                                     "pager": pager, "body": body})
+        dest = os.path.join(out, path)
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+        atomic_write(dest, document.encode("utf-8"))
+        outputs.append(path)
+    return outputs
+
+
+def render_index(outlines):
+    groups = {}
+    for rel in sorted(outlines):
+        groups.setdefault(os.path.dirname(rel) or "", []).append(rel)
+    parts = []
+    for group, rels in groups.items():
+        if group:
+            parts.append(f"<h2>{html.escape(group.replace('_', ' '))}</h2>")
+        parts.append("<ul>" + "".join(f'<li><a href="{quote(page_path(rel, 0))}">'
+                                      f'{html.escape(outlines[rel]["title"])}</a></li>' for rel in rels) + "</ul>")
+    return PAGE_PLAN.render({"title": "System Design for Staff SWE", "root": "", "crumbs": "", "pager": "",
+                             "body": "<h1>System Design for Staff SWE</h1>\n" + "\n".join(parts)})
+
+
+def _write_if_changed(path, data):
+    try:
+        with open(path, "rb") as f:
+            if f.read() == data:
+                return False
+    except FileNotFoundError:
+        pass
+    atomic_write(path, data)
+    return True
+
+
+def build(out=DEFAULT_OUT, root=REPO_ROOT, jobs=1, force=False):
+    """Bring the site in out up to date; returns (pages rendered, files rebuilt, files unchanged, pages removed)."""
+    files = corpus_files(root)
+    cache = load_cache(OUTLINE_NAME, {})
+    if cache.get("version") != SITE_VERSION:
+        cache = {"version": SITE_VERSION, "files": {}}
+    if refresh_per_file(cache["files"], root, files, outline_file, jobs) or not cache["files"]:
+        save_cache(OUTLINE_NAME, cache)
+    outlines = {rel: entry["value"] for rel, entry in cache["files"].items()}
+    pages = {rel: paginate(outlines[rel]) for rel in files}
+    anchor_maps = {rel: anchor_pages(outlines[rel], pages[rel]) for rel in files}
+    map_digests = {rel: hashlib.sha256(repr(sorted(m.items())).encode()).hexdigest() for rel, m in anchor_maps.items()}
+
+    out = os.path.abspath(out)
+    state = load_cache(STATE_NAME, {})
+    built = state.setdefault(out, {})
+    work, keys = [], {}
+    for rel in files:
+        linked = [t for t in outlines[rel]["links"] if t in outlines and t != rel]
+        keys[rel] = hashlib.sha256(repr((SITE_VERSION, cache["files"][rel]["sha256"], pages[rel],
+                                         [(t, map_digests[t]) for t in linked])).encode()).hexdigest()
+        previous = built.get(rel)
+        if (force or not previous or previous["key"] != keys[rel]
+                or not all(os.path.exists(os.path.join(out, p)) for p in previous["outputs"])):
+            maps = {t: anchor_maps[t] for t in linked + [rel]}
+            work.append((rel, root, out, pages[rel], maps))
+    if jobs > 1 and len(work) > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            results = list(pool.map(render_file, *zip(*work)))
+    else:
+        results = [render_file(*w) for w in work]
+
+    removed = 0
+    for (rel, *_), outputs in zip(work, results):
+        for stale in set(built.get(rel, {}).get("outputs", ())) - set(outputs):
+            removed += _remove(os.path.join(out, stale))
+        built[rel] = {"key": keys[rel], "outputs": outputs}
+    for rel in set(built) - set(files):
+        for stale in built.pop(rel)["outputs"]:
+            removed += _remove(os.path.join(out, stale))
+    os.makedirs(out, exist_ok=True)
+    _write_if_changed(os.path.join(out, "style.css"), STYLESHEET.encode("utf-8"))
+    _write_if_changed(os.path.join(out, "index.html"), render_index(outlines).encode("utf-8"))
+    save_cache(STATE_NAME, state)
+    return sum(len(r) for r in results), len(work), len(files) - len(work), removed
+
+
+def _remove(path):
+    try:
+        os.unlink(path)
+        return 1
+    except FileNotFoundError:
+        return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--out", default=DEFAULT_OUT, metavar="DIR")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1, metavar="N",
+                        help="processes used to render changed files (default: one per CPU)")
+    parser.add_argument("--force", action="store_true", help="re-render every page")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    rendered, rebuilt, unchanged, removed = build(args.out, jobs=args.jobs, force=args.force)
+    print(f"{rendered} page(s) from {rebuilt} file(s) rendered, {unchanged} unchanged, {removed} removed "
+          f"in {(time.perf_counter() - start) * 1000:.0f} ms -> {args.out}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""Content-addressed snapshots of the generator's outputs.
+
+    python _snapshots.py list
+    python _snapshots.py show RUN
+    python _snapshots.py diff RUN [RUN2] [--patch]   # RUN2 defaults to the files on disk now
+    python _snapshots.py restore RUN [--delete]
+
+The generator records a run whenever it leaves a directory output different
+from the last recorded run: the name -> sha256 map of every file it manages
+(rendered topics and patch targets), plus a "before" run first when those
+files were edited by hand since then. File contents live once each in
+.snapshots/objects/, however many runs share them; a run itself is a small
+JSON file in .snapshots/runs/.
+
+The store is the only copy of overwritten outputs, so it lives outside the
+disposable .cache/ (VIDEO_SCRIPTS_SNAPSHOTS points it elsewhere); only the
+stat cache used for hashing is kept under .cache/.
+
+RUN is a run id, a unique prefix of one, or "latest". Files are hashed through
+a stat cache, so diffing against disk and restoring only read the files whose
+stat moved, and a restore writes only the files that differ.
+"""
+
+import argparse
+import difflib
+import hashlib
+import json
+import os
+import sys
+import time
+import zlib
+
+from _fsutil import REPO_ROOT, atomic_write, load_cache, refresh_per_file, save_cache
+
+SNAPSHOT_DIR = os.environ.get("VIDEO_SCRIPTS_SNAPSHOTS") or os.path.join(REPO_ROOT, ".snapshots")
+OBJECTS_DIR = os.path.join(SNAPSHOT_DIR, "objects")
+RUNS_DIR = os.path.join(SNAPSHOT_DIR, "runs")
+STAT_NAME = os.path.join("snapshots", "stat.pickle")
+
+
+class SnapshotError(Exception):
+    pass
+
+
+def object_path(digest):
+    return os.path.join(OBJECTS_DIR, digest[:2], digest)
+
+
+def put_blob(data, digest):
+    path = object_path(digest)
+    if not os.path.exists(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        atomic_write(path, zlib.compress(data, 6))
+
+
+def get_blob(digest):
+    try:
+        with open(object_path(digest), "rb") as f:
+            return zlib.decompress(f.read())
+    except FileNotFoundError:
+        raise SnapshotError(f"object {digest[:12]} is missing from the store") from None
+
+
+def _store(rel, data):
+    digest = hashlib.sha256(data).hexdigest()
+    put_blob(data, digest)
+    return digest
+
+
+def current_files(root, names):
+    """{name: sha256} for the names that exist under root, storing any new contents.
+
+    Only files whose stat changed since the last call are read.
+    """
+    root = os.path.abspath(root)
+    present = sorted(n for n in names if os.path.isfile(os.path.join(root, n)))
+    stats = load_cache(STAT_NAME, {})
+    cache = stats.setdefault(root, {})
+    known = set(cache)
+    changed = refresh_per_file(cache, root, present, _store)
+    for name in present:
+        if name not in changed and not os.path.exists(object_path(cache[name]["sha256"])):
+            with open(os.path.join(root, name), "rb") as f:  # the store was cleared under us
+                _store(name, f.read())
+    if changed or set(cache) != known:
+        save_cache(STAT_NAME, stats)
+    return {name: cache[name]["sha256"] for name in present}
+
+
+def list_runs():
+    """Every recorded run, oldest first."""
+    try:
+        names = sorted(n for n in os.listdir(RUNS_DIR) if n.endswith(".json"))
+    except FileNotFoundError:
+        return []
+    runs = []
+    for name in names:
+        with open(os.path.join(RUNS_DIR, name), encoding="utf-8") as f:
+            runs.append(json.load(f))
+    return runs
+
+
+def load_run(ref):
+    runs = list_runs()
+    if ref == "latest":
+        if not runs:
+            raise SnapshotError("no runs recorded yet")
+        return runs[-1]
+    matches = [r for r in runs if r["id"].startswith(ref)]
+    if len(matches) != 1:
+        raise SnapshotError(f"{'no' if not matches else 'more than one'} run matching {ref!r}")
+    return matches[0]
+
+
+def record_run(root, names, label, argv=None, only_if_changed=False):
+    """Snapshot names under root as a new run; returns its id, or None if none of them exist.
+
+    With only_if_changed, nothing is recorded either when the files match the
+    latest run for this root.
+    """
+    root = os.path.abspath(root)
+    files = current_files(root, names)
+    if not files:
+        return None
+    if only_if_changed:
+        previous = [r for r in list_runs() if r["root"] == root]
+        if previous and previous[-1]["files"] == files:
+            return None
+    now = time.time_ns()
+    run_id = time.strftime("%Y%m%dT%H%M%S", time.localtime(now // 10**9)) + f".{now // 10**6 % 1000:03d}"
+    while os.path.exists(os.path.join(RUNS_DIR, run_id + ".json")):  # two runs in one millisecond
+        run_id += "a"
+    run = {"id": run_id, "label": label, "root": root, "argv": argv or [], "files": files}
+    os.makedirs(RUNS_DIR, exist_ok=True)
+    atomic_write(os.path.join(RUNS_DIR, run_id + ".json"), json.dumps(run, indent=1, sort_keys=True).encode())
+    return run_id
+
+
+def diff_files(old, new):
+    """(added, removed, changed) names between two name -> sha256 maps."""
+    added = sorted(set(new) - set(old))
+    removed = sorted(set(old) - set(new))
+    changed = sorted(n for n in set(old) & set(new) if old[n] != new[n])
+    return added, removed, changed
+
+
+def restore_run(run, delete=False):
+    """Make the run's root hold exactly its files again; returns (written, deleted).
+
+    Names the run does not know are left alone unless delete is set.
+    """
+    root = run["root"]
+    now = current_files(root, run["files"])
+    written = [n for n in sorted(run["files"]) if now.get(n) != run["files"][n]]
+    for name in written:
+        path = os.path.join(root, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        atomic_write(path, get_blob(run["files"][name]))
+    deleted = []
+    if delete:
+        later = {n for r in list_runs() if r["root"] == root for n in r["files"]}
+        for name in sorted(later - set(run["files"])):
+            try:
+                os.unlink(os.path.join(root, name))
+                deleted.append(name)
+            except FileNotFoundError:
+                pass
+    current_files(root, run["files"])  # refresh the stat cache for what was just written
+    return written, deleted
+
+
+def _text(digest):
+    return get_blob(digest).decode("utf-8", "replace").splitlines(keepends=True) if digest else []
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("list", help="recorded runs, oldest first")
+    p = sub.add_parser("show", help="the files of one run")
+    p.add_argument("run")
+    p = sub.add_parser("diff", help="what changed between two runs (or a run and the disk)")
+    p.add_argument("run")
+    p.add_argument("other", nargs="?")
+    p.add_argument("--patch", action="store_true", help="print a unified diff of each changed file")
+    p = sub.add_parser("restore", help="write a run's files back")
+    p.add_argument("run")
+    p.add_argument("--delete", action="store_true", help="also remove managed files the run did not have")
+    args = parser.parse_args(argv)
+
+    try:
+        if args.command == "list":
+            runs = list_runs()
+            previous = {}
+            for run in runs:
+                added, removed, changed = diff_files(previous.get(run["root"], {}), run["files"])
+                previous[run["root"]] = run["files"]
+                print(f"{run['id']}  {run['label']:<9} {len(run['files']):>4} files  "
+                      f"+{len(added)} -{len(removed)} ~{len(changed)}  {run['root']}")
+            print(f"{len(runs)} run(s)", file=sys.stderr)
+        elif args.command == "show":
+            run = load_run(args.run)
+            print(f"{run['id']}  {run['label']}  {run['root']}  {' '.join(run['argv'])}")
+            for name, digest in sorted(run["files"].items()):
+                print(f"  {digest[:12]}  {name}")
+        elif args.command == "diff":
+            old = load_run(args.run)
+            if args.other:
+                new_files, new_label = load_run(args.other)["files"], args.other
+            else:
+                new_files, new_label = current_files(old["root"], old["files"]), "disk"
+            added, removed, changed = diff_files(old["files"], new_files)
+            for mark, names in (("A", added), ("D", removed), ("M", changed)):
+                for name in names:
+                    print(f"{mark} {name}")
+            if args.patch:
+                for name in added + removed + changed:
+                    sys.stdout.writelines(difflib.unified_diff(
+                        _text(old["files"].get(name)), _text(new_files.get(name)),
+                        f"{old['id']}/{name}", f"{new_label}/{name}"))
+            print(f"{len(added)} added, {len(removed)} removed, {len(changed)} changed", file=sys.stderr)
+        else:
+            run = load_run(args.run)
+            written, deleted = restore_run(run, args.delete)
+            for name in written:
+                print(f"Restored {name}")
+            for name in deleted:
+                print(f"Deleted {name}")
+            print(f"{len(written)} restored, {len(deleted)} deleted, "
+                  f"{len(run['files']) - len(written)} already matched {run['id']}", file=sys.stderr)
+    except SnapshotError as e:
+        raise SystemExit(f"error: {e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""The series skeleton, compiled once into a render plan that topics fill in.
+
+    python _template.py check [DIR]      # which scripts follow the skeleton exactly; batch render time
+    python _template.py convert FILE...  # rewrite full scripts as field sources, in place
+
+Every script shares one layout: title, "## Video Length" header, the twelve
+skeleton headings with "---" rules between them, and the Next Video footer.
+SERIES_TEMPLATE spells that layout out once; compile_template() turns it into
+a RenderPlan, an alternating list of literal fragments and field names, so
+rendering a topic is a single join with no parsing.
+
+A field source under _sources/ holds only what differs per topic:
+
+    title: News Feed: Backpressure and Load Shedding
+    length: 4-5
+    level: Staff
+
+    ## hook
+
+    World Cup final. ...
+
+    ## story
+    ...
+
+with one "## <key>" block per skeleton section (keys as in _script_model).
+render_source() passes any other text (a complete script) through unchanged.
+"""
+
+import re
+import string
+import sys
+import time
+
+from _fsutil import VIDEO_SCRIPTS_DIR, atomic_write
+from _mdsections import Fences
+from _script_model import CANONICAL_HEADINGS, SECTION_KEYS, load_scripts
+
+HEADER_FIELDS = ("title", "length", "level")
+
+SERIES_TEMPLATE = (
+    "# {title}\n\n## Video Length: ~{length} minutes | Level: {level}\n\n---\n\n"
+    + "\n\n---\n\n".join(f"## {CANONICAL_HEADINGS[key]}\n\n{{{key}}}" for key in SECTION_KEYS)
+    + "\n"
+)
+
+HEADER_RE = re.compile(r"^([a-z_]+):[ \t]*(.*)$")
+FIELD_SOURCE_RE = re.compile(r"^title:")
+
+
+class RenderPlan:
+    """Literal fragments interleaved with field names: fragments[0] field[0] fragments[1] ..."""
+
+    __slots__ = ("fragments", "fields")
+
+    def __init__(self, fragments, fields):
+        self.fragments = fragments
+        self.fields = fields
+
+    def render(self, values):
+        parts = [None] * (2 * len(self.fields) + 1)
+        parts[::2] = self.fragments
+        try:
+            parts[1::2] = [values[name] for name in self.fields]
+        except KeyError as e:
+            raise ValueError(f"missing field {e.args[0]!r}") from None
+        return "".join(parts)
+
+    def render_many(self, values_list):
+        return [self.render(values) for values in values_list]
+
+    def parse(self, text):
+        """The field values that render() would turn back into exactly text, or None."""
+        fragments = self.fragments
+        if not text.startswith(fragments[0]) or not text.endswith(fragments[-1]):
+            return None
+        values, pos, stop = {}, len(fragments[0]), len(text) - len(fragments[-1])
+        for name, fragment in zip(self.fields[:-1], fragments[1:-1]):
+            end = text.find(fragment, pos, stop)
+            if end < 0:
+                return None
+            values[name], pos = text[pos:end], end + len(fragment)
+        if pos > stop:
+            return None
+        values[self.fields[-1]] = text[pos:stop]
+        return values
+
+
+def compile_template(template):
+    fragments, fields = [], []
+    literal = ""
+    for text, name, spec, conversion in string.Formatter().parse(template):
+        literal += text
+        if name is None:
+            continue
+        if spec or conversion:
+            raise ValueError(f"template field {name!r} uses a format spec; only plain fields are supported")
+        fragments.append(literal)
+        fields.append(name)
+        literal = ""
+    fragments.append(literal)
+    return RenderPlan(tuple(fragments), tuple(fields))
+
+
+SCRIPT_PLAN = compile_template(SERIES_TEMPLATE)
+
+
+def is_field_source(text):
+    return FIELD_SOURCE_RE.match(text) is not None
+
+
+def parse_fields(text):
+    """Field values from a field source (see the module docstring)."""
+    head, _, body = text.partition("\n\n")
+    values = {}
+    for line in head.split("\n"):
+        m = HEADER_RE.match(line)
+        if not m or m.group(1) not in HEADER_FIELDS:
+            raise ValueError(f"bad header line {line!r}; expected one of {', '.join(HEADER_FIELDS)}")
+        values[m.group(1)] = m.group(2)
+    key, lines, fences = None, [], Fences()
+    for line in body.split("\n"):
+        if fences.feed(line.encode("utf-8")) is None and line.startswith("## ") and line[3:].strip() in SECTION_KEYS:
+            if key is not None:
+                values[key] = "\n".join(lines).strip("\n")
+            key, lines = line[3:].strip(), []
+            if key in values:
+                raise ValueError(f"section {key!r} appears twice")
+        elif key is not None:
+            lines.append(line)
+        elif line.strip():
+            raise ValueError(f"text before the first section: {line!r}")
+    if key is not None:
+        values[key] = "\n".join(lines).strip("\n")
+    missing = [name for name in SCRIPT_PLAN.fields if name not in values]
+    if missing:
+        raise ValueError("missing " + ", ".join(missing))
+    return values
+
+
+def format_fields(values):
+    """Field source text for values; the inverse of parse_fields()."""
+    head = "".join(f"{name}: {values[name]}\n" for name in HEADER_FIELDS)
+    return head + "".join(f"\n## {key}\n\n{values[key]}\n" for key in SECTION_KEYS)
+
+
+def render_source(text):
+    """Final script text for a _sources/ file: field sources go through SCRIPT_PLAN."""
+    if not is_field_source(text):
+        return text
+    return SCRIPT_PLAN.render(parse_fields(text))
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    command, rest = (argv[0], argv[1:]) if argv else (None, [])
+    if command == "convert" and rest:
+        for path in rest:
+            with open(path, encoding="utf-8") as f:
+                text = f.read()
+            values = SCRIPT_PLAN.parse(text)
+            if values is None:
+                raise SystemExit(f"error: {path} does not follow the series skeleton exactly")
+            source = format_fields(values)
+            if render_source(source) != text:
+                raise SystemExit(f"error: {path} would not render back identically")
+            atomic_write(path, source.encode("utf-8"))
+            print(f"Converted {path}")
+    elif command == "check" and len(rest) <= 1:
+        scripts = load_scripts(rest[0] if rest else VIDEO_SCRIPTS_DIR)
+        texts = [s.to_markdown() for s in scripts]
+        fitting = [(s.name, text, SCRIPT_PLAN.parse(text)) for s, text in zip(scripts, texts)]
+        fitting = [f for f in fitting if f[2] is not None]
+        start = time.perf_counter()
+        rendered = SCRIPT_PLAN.render_many([values for _, _, values in fitting])
+        elapsed = time.perf_counter() - start
+        mismatched = [name for (name, text, _), out in zip(fitting, rendered) if out != text]
+        for name in mismatched:
+            print(f"{name}: does not render back identically")
+        print(f"{len(fitting)} of {len(scripts)} scripts follow the series skeleton exactly; "
+              f"rendered in {elapsed * 1000:.2f} ms", file=sys.stderr)
+        if mismatched:
+            raise SystemExit(1)
+    else:
+        raise SystemExit(__doc__)
+
+
+if __name__ == "__main__":
+    main()
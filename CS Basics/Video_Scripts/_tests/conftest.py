@@ -0,0 +1,31 @@
+"""Shared setup for the Video_Scripts tooling tests.
+
+    python -m pytest "CS Basics/Video_Scripts/_tests"
+
+The tooling modules import each other by bare name, so their directory goes on
+sys.path. Caches and the snapshot store point at a scratch directory before
+any of them is imported, and each test gets its own through scratch_state.
+"""
+
+import os
+import sys
+import tempfile
+
+import pytest
+
+_SCRATCH = tempfile.mkdtemp(prefix="video_scripts_tests.")
+os.environ["VIDEO_SCRIPTS_CACHE"] = os.path.join(_SCRATCH, "cache")
+os.environ["VIDEO_SCRIPTS_SNAPSHOTS"] = os.path.join(_SCRATCH, "snapshots")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import _fsutil  # noqa: E402
+import _snapshots  # noqa: E402
+
+
+@pytest.fixture
+def scratch_state(tmp_path, monkeypatch):
+    """A fresh cache directory and snapshot store under tmp_path."""
+    monkeypatch.setattr(_fsutil, "CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setattr(_snapshots, "OBJECTS_DIR", str(tmp_path / "snapshots" / "objects"))
+    monkeypatch.setattr(_snapshots, "RUNS_DIR", str(tmp_path / "snapshots" / "runs"))
+    return tmp_path
@@ -0,0 +1,63 @@
+import os
+
+import pytest
+
+import _catalog
+from _catalog import update_catalog
+
+PLAN = """| # | Topic | Level | Notes |
+|---|-------|-------|-------|
+| 1 | Alpha planned | B | — |
+| 2 | Beta planned | B | — |
+| 3 | Gamma planned | I | — |
+"""
+
+
+def script(title, level="Beginner"):
+    return f"# {title}\n\n## Video Length: ~4-5 minutes | Level: {level}\n\n---\n\n## The Hook\n\nText.\n"
+
+
+@pytest.fixture
+def scripts(scratch_state, monkeypatch):
+    directory = scratch_state / "scripts"
+    directory.mkdir()
+    (directory / "Topic_1_Alpha.md").write_text(script("Alpha"), encoding="utf-8")
+    (directory / "Topic_2_Beta.md").write_text(script("Beta", "Staff"), encoding="utf-8")
+    plan = scratch_state / "plan.md"
+    plan.write_text(PLAN, encoding="utf-8")
+    monkeypatch.setattr(_catalog, "SERIES_PLAN_PATH", str(plan))
+    return directory
+
+
+def test_full_scan(scripts):
+    catalog, changed = update_catalog(directory=str(scripts))
+    assert changed == ["Topic_1_Alpha.md", "Topic_2_Beta.md"]
+    entry = catalog.get(2)
+    assert (entry.name, entry.slug, entry.title, entry.level, entry.length, entry.planned_title) == \
+        ("Topic_2_Beta.md", "Beta", "Beta", "Staff", (4.0, 5.0), "Beta planned")
+    assert catalog.next(1).number == 2 and catalog.prev(1) is None
+    assert catalog.gaps() == [3] and catalog.next_free() == 3
+    assert update_catalog(directory=str(scripts))[1] == []
+
+
+def test_names_refresh_only_those_files(scripts):
+    update_catalog(directory=str(scripts))
+    (scripts / "Topic_2_Beta.md").write_text(script("Beta, revised"), encoding="utf-8")
+    (scripts / "Topic_1_Alpha.md").write_text(script("Alpha, unseen"), encoding="utf-8")
+    catalog, changed = update_catalog(["Topic_2_Beta.md"], directory=str(scripts))
+    assert changed == ["Topic_2_Beta.md"]
+    assert catalog.get(2).title == "Beta, revised"
+    assert catalog.get(1).title == "Alpha"
+
+
+def test_named_file_that_is_gone_is_dropped(scripts):
+    update_catalog(directory=str(scripts))
+    os.unlink(scripts / "Topic_2_Beta.md")
+    catalog, _ = update_catalog(["Topic_2_Beta.md"], directory=str(scripts))
+    assert 2 not in catalog and len(catalog) == 1
+
+
+def test_names_do_not_seed_an_empty_catalog(scripts):
+    catalog, changed = update_catalog(["Topic_1_Alpha.md"], directory=str(scripts))
+    assert changed == ["Topic_1_Alpha.md", "Topic_2_Beta.md"]
+    assert len(catalog) == 2
@@ -0,0 +1,140 @@
+import tarfile
+import time
+import zipfile
+
+import pytest
+
+from _generate_scripts import PATCHES, main
+from _sinks import MANIFEST_NAME, DirectorySink, MemorySink
+from _topic_registry import discover_topics
+
+OUTPUTS = sorted({s.name for s in discover_topics().values()} | {p.target for p in PATCHES})
+
+
+class Recording:
+    """Sink mixin that remembers which outputs were written, in order."""
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.writes = []
+
+    def write(self, name, data):
+        if name != MANIFEST_NAME:
+            self.writes.append(name)
+        return super().write(name, data)
+
+
+class RecordingSink(Recording, MemorySink):
+    pass
+
+
+class RecordingDirectorySink(Recording, DirectorySink):
+    pass
+
+
+def generate(*argv, sink=None):
+    main(["--no-snapshot", *argv], sink=sink)
+
+
+def directory_files(root):
+    return {p.name: p.read_bytes() for p in root.iterdir() if p.name != MANIFEST_NAME}
+
+
+def test_first_run_writes_every_output(scratch_state):
+    sink = RecordingSink()
+    generate(sink=sink)
+    assert sorted(sink.writes) == OUTPUTS
+    assert sorted(sink.manifest) == OUTPUTS
+
+
+def test_second_incremental_run_writes_nothing(scratch_state, capsys):
+    sink = RecordingSink()
+    generate("--incremental", sink=sink)
+    sink.writes.clear()
+    generate("--incremental", sink=sink)
+    assert sink.writes == []
+    assert f"0 written, {len(OUTPUTS) - len(PATCHES)} unchanged" in capsys.readouterr().out
+
+
+def test_edited_output_is_rerendered(scratch_state):
+    root = scratch_state / "out"
+    generate("--incremental", "--output", str(root))
+    rendered = directory_files(root)
+    edited = next(name for name in OUTPUTS if name not in {p.target for p in PATCHES})
+    (root / edited).write_bytes(b"edited by hand\n")
+    sink = RecordingDirectorySink(str(root))
+    generate("--incremental", sink=sink)
+    assert sink.writes == [edited]
+    assert directory_files(root) == rendered
+
+
+def test_jobs_output_matches_serial(scratch_state):
+    serial, parallel = scratch_state / "serial", scratch_state / "parallel"
+    generate("--jobs", "1", "--output", str(serial))
+    generate("--jobs", "2", "--output", str(parallel))
+    assert sorted(directory_files(parallel)) == OUTPUTS
+    assert directory_files(parallel) == directory_files(serial)
+
+
+def test_edited_memory_output_is_rerendered(scratch_state):
+    sink = RecordingSink()
+    generate("--incremental", sink=sink)
+    rendered = dict(sink.files)
+    sink.files[OUTPUTS[-1]] = b"edited\n"
+    sink.writes.clear()
+    generate("--incremental", sink=sink)
+    assert sink.writes == [OUTPUTS[-1]]
+    assert sink.files == rendered
+
+
+def test_publish_needs_a_directory_output(scratch_state):
+    sink = RecordingSink()
+    with pytest.raises(SystemExit, match="--publish uploads from a directory output"):
+        generate("--publish", "http://127.0.0.1:9/", sink=sink)
+    assert sink.writes == []
+
+
+def test_dry_run_classifies_without_writing(scratch_state, capsys):
+    sink = RecordingSink()
+    generate(sink=sink)
+    changed, added = OUTPUTS[-1], OUTPUTS[-2]
+    sink.files[changed] = b"edited\n"
+    del sink.files[added]
+    before = dict(sink.files)
+    sink.writes.clear()
+    capsys.readouterr()
+    generate("--dry-run", sink=sink)
+    out = capsys.readouterr().out
+    assert sink.writes == [] and sink.files == before
+    assert f"Would update {changed}\n" in out and f"Would create {added}\n" in out
+    assert f"Dry run: 1 changed, 1 added, {len(OUTPUTS) - len(PATCHES) - 2} unchanged" in out
+
+
+@pytest.mark.parametrize("suffix", [".zip", ".tar.gz"])
+def test_archive_round_trip(scratch_state, monkeypatch, capsys, suffix):
+    monkeypatch.setenv("SOURCE_DATE_EPOCH", "1700000000")
+    expected = MemorySink()
+    generate(sink=expected)
+    path = scratch_state / "out" / ("scripts" + suffix)
+    generate("--output", str(path))
+    if suffix == ".zip":
+        with zipfile.ZipFile(path) as z:
+            members = {i.filename: z.read(i) for i in z.infolist()}
+            assert {i.date_time for i in z.infolist()} == {time.gmtime(1700000000)[:6]}
+    else:
+        with tarfile.open(path) as t:
+            members = {m.name: t.extractfile(m).read() for m in t.getmembers()}
+            assert {m.mtime for m in t.getmembers()} == {1700000000}
+    assert members == expected.files
+    assert [p.name for p in path.parent.iterdir()] == [path.name]
+
+    capsys.readouterr()
+    generate("--dry-run", "--output", str(path))
+    # An archive is rebuilt whole, so the patch target is classified too
+    assert f"Dry run: 0 changed, 0 added, {len(OUTPUTS)} unchanged" in capsys.readouterr().out
+    assert [p.name for p in path.parent.iterdir()] == [path.name]
+
+
+def test_archive_dry_run_leaves_no_trace(scratch_state):
+    generate("--dry-run", "--output", str(scratch_state / "new" / "scripts.zip"))
+    assert not (scratch_state / "new").exists()
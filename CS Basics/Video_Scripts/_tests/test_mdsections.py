@@ -0,0 +1,55 @@
+import io
+
+from _mdsections import iter_sections
+
+DOC = b"""Preamble.
+
+# Top
+
+```python
+# a comment, not a heading
+```
+
+## Diagram
+
+```MULTI-REGION CACHE
++------+
+| box  |
++------+```
+
+Narrate it: after the glued fence.
+
+## Next
+
+Done.
+"""
+
+
+def sections(data=DOC, bodies=True):
+    return list(iter_sections(io.BytesIO(data), bodies))
+
+
+def test_paths_levels_and_byte_ranges():
+    found = sections()
+    assert [(s.path, s.level) for s in found] == [((), 0), (("Top",), 1), (("Top", "Diagram"), 2),
+                                                   (("Top", "Next"), 2)]
+    assert found[0].start == 0 and found[-1].end == len(DOC)
+    assert all(a.end == b.start for a, b in zip(found, found[1:]))
+    for s in found[1:]:
+        assert DOC[s.start:s.end].startswith(b"#")
+
+
+def test_fenced_headings_stay_in_the_body():
+    top = sections()[1]
+    assert "# a comment, not a heading" in top.body
+
+
+def test_glued_closing_fence_ends_the_block():
+    diagram, following = sections()[2:]
+    assert "Narrate it: after the glued fence." in diagram.body
+    assert following.path == ("Top", "Next") and following.body == "\nDone.\n"
+
+
+def test_bodies_false_keeps_offsets_only():
+    assert [s.body for s in sections(bodies=False)] == [None] * 4
+    assert [(s.start, s.end) for s in sections(bodies=False)] == [(s.start, s.end) for s in sections()]
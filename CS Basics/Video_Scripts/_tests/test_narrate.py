@@ -0,0 +1,48 @@
+from _narrate import script_segments, segment_key
+from _script_model import parse_script
+
+# The mangled fence some scripts carry: a title as the info string and the
+# closing fence glued to the last diagram row
+SCRIPT = """# Glued Fences
+
+## Video Length: ~4-5 minutes | Level: Staff
+
+---
+
+## Let's Walk Through the Diagram
+
+```CACHE - CONSISTENCY
+┌──────────┐
+│  Origin  │
+└──────────┘```
+
+Narrate it: the **origin** writes, then [the caches](x.md) catch up.
+
+---
+
+## Real-World Examples (2-3)
+
+- First example.
+- Second `example`.
+""".encode("utf-8")
+
+
+def segments():
+    return script_segments(parse_script("Topic_900_Glued.md", SCRIPT, 0, len(SCRIPT)))
+
+
+def test_glued_fence_closes_before_the_narration():
+    found = segments()
+    assert [(s.section, s.index, s.text) for s in found] == [
+        ("diagram", 0, "Narrate it: the origin writes, then the caches catch up."),
+        ("examples", 0, "First example."),
+        ("examples", 1, "Second example."),
+    ]
+    assert not any("Origin" in s.text or "┘" in s.text for s in found)
+
+
+def test_segments_are_keyed_by_voice_and_text():
+    found = segments()
+    assert all(s.topic == "Topic_900_Glued.md" for s in found)
+    assert [s.key for s in found] == [segment_key(s.text) for s in found]
+    assert script_segments(parse_script("x", SCRIPT, 0, len(SCRIPT)), voice="other")[0].key != found[0].key
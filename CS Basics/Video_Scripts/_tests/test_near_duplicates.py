@@ -0,0 +1,38 @@
+from _near_duplicates import file_signatures, find_clusters, paragraphs, shingles, signatures, similarity
+
+BASE = ("Caches keep hot data close to the reader so that most requests never reach the database "
+        "and the slow path is only taken on a miss or after an explicit invalidation")
+NEAR = BASE.replace("explicit invalidation", "explicit eviction")
+OTHER = ("Consensus protocols elect a leader and replicate an ordered log so that a majority of nodes "
+         "agree on every committed entry even while some of them are down")
+
+
+def test_paragraphs_skip_fences_and_headings():
+    text = "# Title\n\nFirst line\ncontinues here.\n\n```\nnot prose\n```\n\n- item one\n- item two\n"
+    assert list(paragraphs(text)) == [(3, "First line continues here."), (10, "item one"), (11, "item two")]
+
+
+def test_signatures_estimate_jaccard_similarity():
+    base, near, other = signatures([shingles(t.lower().split()) for t in (BASE, NEAR, OTHER)])
+    assert similarity(base, base) == 1.0
+    assert similarity(base, near) >= 0.8
+    assert similarity(base, other) < 0.2
+
+
+def test_batching_does_not_change_a_signature():
+    sets = [shingles(t.lower().split()) for t in (BASE, NEAR, OTHER, "short one")]
+    assert signatures(sets) == [signatures([s])[0] for s in sets]
+
+
+def test_file_signatures():
+    data = f"# T\n\n{BASE}\n\n{OTHER}\n".encode("utf-8")
+    (line1, words1, text1, sig1), (line2, _, _, sig2) = file_signatures("a.md", data)
+    assert (line1, words1, text1, line2) == (3, len(BASE.split()), BASE[:100], 5)
+    assert sig1 == signatures([shingles(BASE.lower().split())])[0] and sig1 != sig2
+
+
+def test_lsh_clusters_near_duplicates_only():
+    units = [(name, sig) for name, sig in zip(
+        ("a", "b", "c", "d"), signatures([shingles(t.lower().split()) for t in (BASE, OTHER, NEAR, BASE)]))]
+    assert sorted(map(sorted, find_clusters(units, 0.8))) == [[0, 2, 3]]
+    assert find_clusters(units, 1.0) == [[0, 3]]
@@ -0,0 +1,57 @@
+import pytest
+
+from _mdsections import extract_section
+from _pack import Pack, build_pack, compress, train_dictionary
+
+SKELETON = "## Quick Recap\n\n---\n\n## One-Liner to Remember\n\n---\n"
+
+
+def topic(n):
+    return (f"# Topic {n}\n\n## The Hook\n\nHook {n}.\n\n### Detail\n\nMore {n}.\n\n"
+            + SKELETON + f"\nNext is {n + 1}.\n")
+
+
+@pytest.fixture
+def packed(scratch_state):
+    root = scratch_state / "corpus"
+    root.mkdir()
+    for n in range(1, 7):
+        (root / f"Topic_{n}_T.md").write_text(topic(n), encoding="utf-8")
+    (root / "README.md").write_text("No headings at all.\n", encoding="utf-8")
+    path = str(scratch_state / "corpus.pack")
+    return root, path, build_pack(str(root), path)
+
+
+def test_dictionary_holds_lines_shared_by_many_sections():
+    sections = [b"## Quick Recap\nline %d\n" % i for i in range(10)]
+    zdict = train_dictionary(sections)
+    assert b"## Quick Recap" in zdict and b"line 1" not in zdict
+    assert len(compress(sections[0], zdict)) < len(compress(sections[0], b""))
+    assert train_dictionary(sections[:2]) == b""
+
+
+def test_every_file_unpacks_to_its_bytes(packed):
+    root, path, (files, sections, raw, _) = packed
+    assert (files, sections) == (7, 6 * 5 + 1)
+    assert raw == sum(p.stat().st_size for p in root.iterdir())
+    with Pack(path) as pack:
+        assert pack.files() == ["README.md"] + [f"Topic_{n}_T.md" for n in range(1, 7)]
+        for p in root.iterdir():
+            assert pack.read_file(p.name) == p.read_bytes()
+
+
+def test_sections_by_heading_path_or_prefix(packed):
+    root, path, _ = packed
+    with Pack(path) as pack:
+        assert pack.sections("Topic_3_T.md") == [
+            "Topic 3", "Topic 3 > The Hook", "Topic 3 > The Hook > Detail", "Topic 3 > Quick Recap",
+            "Topic 3 > One-Liner to Remember"]
+        assert pack.sections("README.md") == [""]
+        assert pack.section("Topic_3_T.md", "Topic 3 > The Hook") == \
+            extract_section(str(root / "Topic_3_T.md"), "The Hook").encode("utf-8")
+        assert pack.section("Topic_3_T.md", "the hook") == pack.section("Topic_3_T.md", "Topic 3 > The Hook")
+        assert pack.section("Topic_3_T.md", "Detail") == b"### Detail\n\nMore 3.\n\n"
+        with pytest.raises(KeyError):
+            pack.section("Topic_3_T.md", "No Such Heading")
+        with pytest.raises(KeyError):
+            pack.read_file("missing.md")
@@ -0,0 +1,81 @@
+from _patches import Patch, apply_patches
+
+SCRIPT = """# Title
+
+## The Hook
+
+Hook text.
+
+---
+
+## Quick Recap
+
+- one
+- two
+
+---
+
+## Next Video
+
+Soon.
+"""
+
+
+def run(files, patches, recorded=None):
+    writes = []
+
+    def write(target, text):
+        writes.append(target)
+        files[target] = text
+
+    return apply_patches(patches, files.__getitem__, write, recorded), writes
+
+
+def test_ops_land_at_their_anchor_ahead_of_the_rule():
+    files = {"a.md": SCRIPT}
+    patches = [Patch("p1", "a.md", "append", "Quick Recap", "- three"),
+               Patch("p2", "a.md", "insert", "Next Video", "Inserted."),
+               Patch("p3", "a.md", "replace", "The Hook", "New hook.")]
+    report, writes = run(files, patches)
+    assert report == [("a.md", "p1", "applied"), ("a.md", "p2", "applied"), ("a.md", "p3", "applied")]
+    assert writes == ["a.md"]
+    text = files["a.md"]
+    assert "## The Hook\n\nNew hook.\n\n---\n" in text
+    assert "Hook text." not in text
+    assert "- two\n\n- three\n\nInserted.\n\n---\n\n## Next Video" in text
+
+
+def test_rerun_is_a_no_op():
+    files = {"a.md": SCRIPT}
+    patches = [Patch("p1", "a.md", "append", "Quick Recap", "- three")]
+    run(files, patches)
+    patched = files["a.md"]
+    report, writes = run(files, patches)
+    assert report == [("a.md", "p1", "already applied")]
+    assert writes == [] and files["a.md"] == patched
+
+
+def test_recorded_ids_are_skipped():
+    files = {"a.md": SCRIPT}
+    patches = [Patch("p1", "a.md", "append", "Quick Recap", "- three")]
+    report, writes = run(files, patches, recorded=lambda target, text: {"p1"})
+    assert report == [("a.md", "p1", "already applied")]
+    assert writes == []
+
+
+def test_failing_patch_leaves_its_file_untouched():
+    files = {"a.md": SCRIPT, "b.md": SCRIPT}
+    patches = [Patch("ok", "a.md", "append", "Quick Recap", "- three"),
+               Patch("bad", "a.md", "append", "No Such Heading", "x"),
+               Patch("other", "b.md", "append", "Next Video", "Later.")]
+    report, writes = run(files, patches)
+    assert ("a.md", "ok", "error: no section heading matching 'No Such Heading'") in report
+    assert ("b.md", "other", "applied") in report
+    assert files["a.md"] == SCRIPT and writes == ["b.md"]
+
+
+def test_headings_inside_fences_are_not_anchors():
+    text = "# T\n\n```\n## Quick Recap\n```\n\n## Quick Recap\n\n- one\n"
+    files = {"a.md": text}
+    run(files, [Patch("p1", "a.md", "append", "Quick Recap", "- two")])
+    assert files["a.md"] == "# T\n\n```\n## Quick Recap\n```\n\n## Quick Recap\n\n- one\n\n- two\n\n"
@@ -0,0 +1,55 @@
+import asyncio
+import threading
+
+import pytest
+
+import _publish
+from _publish import StandInService, push
+
+
+class FlakyService(StandInService):
+    """Answers the first PUT of every topic with 503."""
+
+    def __init__(self, latency):
+        super().__init__(latency=latency)
+        self.failed = set()
+
+    def handle(self, method, target, headers, body):
+        if method == "PUT" and target not in self.failed:
+            self.failed.add(target)
+            self.requests += 1
+            return 503, {"error": "injected failure"}
+        return super().handle(method, target, headers, body)
+
+
+@pytest.fixture
+def service():
+    """A FlakyService listening on a free port, served from its own thread and loop."""
+    service = FlakyService(latency=0.05)
+    loop = asyncio.new_event_loop()
+    server = loop.run_until_complete(asyncio.start_server(service.serve_connection, "127.0.0.1", 0))
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    service.url = f"http://127.0.0.1:{server.sockets[0].getsockname()[1]}"
+    yield service
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join()
+    server.close()
+    loop.run_until_complete(server.wait_closed())
+    loop.close()
+
+
+def test_queued_uploads_do_not_time_out(scratch_state, service, monkeypatch):
+    # 12 uploads through one connection take ~1.2 s, far past the per-request timeout
+    monkeypatch.setattr(_publish, "REQUEST_TIMEOUT", 0.5)
+    monkeypatch.setattr(_publish, "BACKOFF_BASE", 0.01)
+    directory = scratch_state / "scripts"
+    directory.mkdir()
+    names = [f"Topic_{n}_T.md" for n in range(1, 13)]
+    for name in names:
+        (directory / name).write_bytes(f"# {name}\n".encode())
+    uploaded, failed = push(service.url, str(directory), concurrency=1, retries=1)
+    assert failed == {}
+    assert sorted(uploaded) == sorted(names)
+    assert sorted(service.topics) == sorted(names)
+    assert push(service.url, str(directory), concurrency=1, retries=1) == ([], {})
@@ -0,0 +1,33 @@
+from _script_budget import count_script, count_words
+
+# Same mangled fence as in test_narrate.py: a title for the info string and the
+# closing fence glued to the last diagram row
+DIAGRAM = """
+```CACHE - CONSISTENCY
+┌──────────┐
+│  Origin  │
+└──────────┘```
+
+Narrate it: the origin writes first.
+
+---
+"""
+
+
+def test_glued_fence_is_not_narration():
+    assert count_words(DIAGRAM) == 6
+
+
+def test_regular_fences_comments_and_rules_are_skipped():
+    text = "One two.\n\n```python\nx = 1\n```\n\n<!-- not read -->\n\n---\n\nThree.\n"
+    assert count_words(text) == 3
+
+
+def test_sections_budget_and_hints():
+    data = ("# Title\n\n## Video Length: ~4-5 minutes | Level: Staff\n\n---\n\n## The Hook (20-30 seconds)\n\n"
+            "Hook words here.\n\n## Let's Walk Through the Diagram\n" + DIAGRAM).encode("utf-8")
+    count = count_script("Topic_900_Glued.md", data)
+    assert (count.budget, count.level) == ((4.0, 5.0), "Staff")
+    assert [(s.title, s.words, s.hint) for s in count.sections] == [
+        ("The Hook", 3, (20, 30)), ("Let's Walk Through the Diagram", 6, None)]
+    assert count.words == 9
@@ -0,0 +1,69 @@
+import pytest
+
+from _search_index import SearchIndex, update_index
+
+CHAPTER = """# Caching
+
+Intro text.
+
+## Consistent Hashing
+
+Consistent hashing maps keys to a ring. With consistent hashing, adding a node moves few keys.
+
+## Eviction
+
+LRU eviction drops the least recently used key. Hashing is not involved.
+"""
+
+TOPIC = "# Rings\n\nA hash ring is how consistent hashing places nodes.\n"
+
+
+@pytest.fixture
+def corpus(scratch_state):
+    root = scratch_state / "corpus"
+    (root / "Section1").mkdir(parents=True)
+    (root / "Section1" / "Chapter.md").write_text(CHAPTER, encoding="utf-8")
+    (root / "Topic_1_Rings.md").write_text(TOPIC, encoding="utf-8")
+    return root, str(scratch_state / "index.bin")
+
+
+def search(path, query):
+    index = SearchIndex(path)
+    try:
+        return [(hit.path, hit.heading, hit.count) for hit in index.search(query)]
+    finally:
+        index.close()
+
+
+def test_phrase_query_ranks_by_occurrences(corpus):
+    root, path = corpus
+    assert update_index(str(root), path) == (["Section1/Chapter.md", "Topic_1_Rings.md"], [])
+    assert search(path, "Consistent HASHING") == [
+        ("Section1/Chapter.md", "Caching > Consistent Hashing", 3), ("Topic_1_Rings.md", "Rings", 1)]
+    assert search(path, "keys maps") == []
+    assert search(path, "hashing") == [("Section1/Chapter.md", "Caching > Consistent Hashing", 3),
+                                       ("Section1/Chapter.md", "Caching > Eviction", 1),
+                                       ("Topic_1_Rings.md", "Rings", 1)]
+    assert search(path, "no such words") == [] and search(path, "...") == []
+
+
+def test_hits_carry_section_byte_ranges(corpus):
+    root, path = corpus
+    update_index(str(root), path)
+    index = SearchIndex(path)
+    hit = index.search("lru eviction")[0]
+    index.close()
+    assert CHAPTER.encode("utf-8")[hit.start:hit.end].startswith(b"## Eviction\n")
+    assert hit.end == len(CHAPTER.encode("utf-8"))
+
+
+def test_update_reindexes_changed_and_removed_files(corpus):
+    root, path = corpus
+    update_index(str(root), path)
+    assert update_index(str(root), path) == ([], [])
+    (root / "Topic_1_Rings.md").write_text("# Rings\n\nNothing about that any more.\n", encoding="utf-8")
+    assert update_index(str(root), path) == (["Topic_1_Rings.md"], [])
+    assert [h[0] for h in search(path, "consistent hashing")] == ["Section1/Chapter.md"]
+    (root / "Section1" / "Chapter.md").unlink()
+    assert update_index(str(root), path) == ([], ["Section1/Chapter.md"])
+    assert search(path, "consistent hashing") == []
@@ -0,0 +1,46 @@
+import pytest
+
+from _snapshots import load_run, record_run, restore_run
+
+
+@pytest.fixture
+def outputs(scratch_state):
+    root = scratch_state / "out"
+    (root / "sub").mkdir(parents=True)
+    (root / "a.md").write_bytes(b"alpha\n")
+    (root / "sub" / "b.md").write_bytes(b"beta\n")
+    return root
+
+
+def test_restore_brings_back_edited_and_deleted_files(outputs):
+    run_id = record_run(str(outputs), ["a.md", "sub/b.md"], "first")
+    (outputs / "a.md").write_bytes(b"edited by hand\n")
+    (outputs / "sub" / "b.md").unlink()
+    written, deleted = restore_run(load_run(run_id))
+    assert written == ["a.md", "sub/b.md"] and deleted == []
+    assert (outputs / "a.md").read_bytes() == b"alpha\n"
+    assert (outputs / "sub" / "b.md").read_bytes() == b"beta\n"
+    assert restore_run(load_run(run_id)) == ([], [])
+
+
+def test_only_if_changed(outputs):
+    first = record_run(str(outputs), ["a.md", "sub/b.md"], "first")
+    assert record_run(str(outputs), ["a.md", "sub/b.md"], "again", only_if_changed=True) is None
+    (outputs / "a.md").write_bytes(b"alpha, longer\n")
+    second = record_run(str(outputs), ["a.md", "sub/b.md"], "again", only_if_changed=True)
+    assert second and second != first
+    assert load_run("latest")["id"] == second
+
+
+def test_nothing_to_record(outputs):
+    assert record_run(str(outputs), ["missing.md"], "none") is None
+
+
+def test_delete_removes_files_from_later_runs(outputs):
+    first = record_run(str(outputs), ["a.md"], "first")
+    (outputs / "c.md").write_bytes(b"gamma\n")
+    record_run(str(outputs), ["a.md", "c.md"], "second")
+    assert restore_run(load_run(first)) == ([], [])
+    assert (outputs / "c.md").exists()
+    assert restore_run(load_run(first), delete=True) == ([], ["c.md"])
+    assert not (outputs / "c.md").exists()
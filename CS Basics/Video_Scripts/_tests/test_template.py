@@ -0,0 +1,45 @@
+import os
+
+import pytest
+
+from _fsutil import VIDEO_SCRIPTS_DIR
+from _script_model import SECTION_KEYS
+from _template import (SCRIPT_PLAN, SERIES_TEMPLATE, compile_template, format_fields, parse_fields,
+                       render_source)
+from _topic_registry import discover_topics, load_topic
+
+VALUES = dict({"title": "Caching {not a field}", "length": "4-5", "level": "Staff"},
+              **{key: f"Body of {key}.\n\n```\n## not a section\n```" for key in SECTION_KEYS})
+
+
+def test_plan_renders_like_str_format():
+    assert SCRIPT_PLAN.render(VALUES) == SERIES_TEMPLATE.format(**VALUES)
+    plan = compile_template("a{x}b{{literal}}{y}")
+    assert (plan.fragments, plan.fields) == (("a", "b{literal}", ""), ("x", "y"))
+    assert plan.render({"x": "1", "y": "2"}) == "a1b{literal}2"
+    with pytest.raises(ValueError, match="missing field 'y'"):
+        plan.render({"x": "1"})
+    with pytest.raises(ValueError, match="format spec"):
+        compile_template("{x:>4}")
+
+
+def test_parse_inverts_render():
+    text = SCRIPT_PLAN.render(VALUES)
+    assert SCRIPT_PLAN.parse(text) == VALUES
+    assert SCRIPT_PLAN.parse(text.replace("## Quick Recap", "## Recap")) is None
+    assert SCRIPT_PLAN.render_many([VALUES, VALUES]) == [text, text]
+
+
+def test_field_source_round_trip():
+    source = format_fields(VALUES)
+    assert parse_fields(source) == VALUES
+    assert render_source(source) == SCRIPT_PLAN.render(VALUES)
+    assert render_source("# A complete script\n") == "# A complete script\n"
+    with pytest.raises(ValueError, match="missing recap"):
+        render_source(source.replace("## recap", "## unknown"))
+
+
+@pytest.mark.parametrize("source", sorted(discover_topics().values()), ids=lambda s: s.name)
+def test_sources_render_the_published_scripts(source):
+    with open(os.path.join(VIDEO_SCRIPTS_DIR, source.name), encoding="utf-8") as f:
+        assert render_source(load_topic(source)) == f.read()
@@ -0,0 +1,51 @@
+"""Lazy registry of generator topic sources, keyed by topic number.
+
+Each topic lives in its own file under _sources/, named exactly like the
+output it produces (Topic_<n>_<Slug>.md). Discovery only lists file names;
+a topic body is read from disk the first time it is asked for.
+"""
+
+import os
+import re
+from collections import namedtuple
+
+SOURCE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "_sources")
+
+TOPIC_FILE_RE = re.compile(r"^Topic_(\d+)_\w+\.md$")
+
+TopicSource = namedtuple("TopicSource", "number name path")
+
+
+def topic_number(name):
+    m = TOPIC_FILE_RE.match(name)
+    return int(m.group(1)) if m else None
+
+
+def discover_topics(source_dir=SOURCE_DIR):
+    """Return {topic number: TopicSource} without reading any topic bodies."""
+    registry = {}
+    with os.scandir(source_dir) as it:
+        for entry in it:
+            number = topic_number(entry.name)
+            if number is None or not entry.is_file():
+                continue
+            if number in registry:
+                raise ValueError(f"duplicate source for topic {number}: "
+                                 f"{registry[number].name} and {entry.name}")
+            registry[number] = TopicSource(number, entry.name, entry.path)
+    return registry
+
+
+def select_topics(registry, numbers=None):
+    """Sources for the requested topic numbers (all of them, in order, if numbers is empty)."""
+    if not numbers:
+        return [registry[n] for n in sorted(registry)]
+    missing = sorted(set(numbers) - set(registry))
+    if missing:
+        raise KeyError(f"no source for topic(s) {', '.join(map(str, missing))}")
+    return [registry[n] for n in sorted(set(numbers))]
+
+
+def load_topic(source):
+    with open(source.path, "r", encoding="utf-8") as f:
+        return f.read()
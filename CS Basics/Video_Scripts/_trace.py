@@ -0,0 +1,117 @@
+"""Opt-in spans and counters for the generator pipeline.
+
+    with span("render", topics=5):
+        ...
+    count("bytes_written", len(data))
+
+Nothing is recorded until start_tracing() is called; until then span() hands back one
+shared no-op context manager and count() returns immediately. A Tracer renders
+what it recorded as a summary table, a JSON document, or Chrome trace-event
+JSON (load it in chrome://tracing or Perfetto).
+"""
+
+import json
+import os
+import threading
+import time
+from collections import Counter
+
+TRACE_FORMATS = ("summary", "json", "chrome")
+
+_tracer = None
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("tracer", "name", "args", "start")
+
+    def __init__(self, tracer, name, args):
+        self.tracer = tracer
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        end = time.perf_counter_ns()
+        self.tracer.spans.append((self.name, self.start, end - self.start, threading.get_ident(), self.args))
+        return False
+
+
+class Tracer:
+    def __init__(self):
+        self.origin = time.perf_counter_ns()
+        self.pid = os.getpid()
+        self.spans = []  # (name, start ns, duration ns, thread id, args)
+        self.counters = Counter()
+
+    def summary(self):
+        totals = {}
+        for name, _, dur, _, _ in self.spans:
+            calls, total, longest = totals.get(name, (0, 0, 0))
+            totals[name] = (calls + 1, total + dur, max(longest, dur))
+        lines = ["Trace:"]
+        width = max((len(n) for n in list(totals) + list(self.counters)), default=0)
+        for name, (calls, total, longest) in totals.items():
+            lines.append(f"  {name:<{width}}  {calls:>4}x  {total / 1e6:9.2f} ms total  {longest / 1e6:9.2f} ms max")
+        for name, value in sorted(self.counters.items()):
+            lines.append(f"  {name:<{width}}  {value:>12}")
+        return "\n".join(lines) + "\n"
+
+    def to_json(self):
+        return json.dumps({
+            "spans": [{"name": name, "start_ms": (start - self.origin) / 1e6, "duration_ms": dur / 1e6,
+                       "thread": tid, "args": args} for name, start, dur, tid, args in self.spans],
+            "counters": dict(self.counters),
+        }, indent=2) + "\n"
+
+    def to_chrome(self):
+        events = [{"name": name, "ph": "X", "ts": (start - self.origin) / 1e3, "dur": dur / 1e3,
+                   "pid": self.pid, "tid": tid, "args": args} for name, start, dur, tid, args in self.spans]
+        end = max((start + dur for _, start, dur, _, _ in self.spans), default=self.origin)
+        events += [{"name": name, "ph": "C", "ts": (end - self.origin) / 1e3, "pid": self.pid,
+                    "args": {name: value}} for name, value in sorted(self.counters.items())]
+        return json.dumps({"traceEvents": events, "displayTimeUnit": "ms"}) + "\n"
+
+    def render(self, fmt):
+        return {"summary": self.summary, "json": self.to_json, "chrome": self.to_chrome}[fmt]()
+
+
+def start_tracing():
+    """Start recording (a fresh Tracer) and return it."""
+    global _tracer
+    _tracer = Tracer()
+    return _tracer
+
+
+def stop_tracing():
+    """Stop recording and return the Tracer that was active, if any."""
+    global _tracer
+    tracer, _tracer = _tracer, None
+    return tracer
+
+
+def span(name, /, **args):
+    if _tracer is None:
+        return _NULL_SPAN
+    return _Span(_tracer, name, args)
+
+
+def count(name, n=1, /):
+    if _tracer is None:
+        return
+    _tracer.counters[name] += n
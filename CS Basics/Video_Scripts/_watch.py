@@ -0,0 +1,128 @@
+"""Watch a directory for file changes: inotify on Linux, stat polling elsewhere.
+
+    for names in watch(directory, accept=TOPIC_FILE_RE.match):
+        ...  # names: file names written, renamed into place or removed since the last batch
+
+Bursts of events (editors write a temp file, rename it, touch it again) are
+debounced: a batch is yielded once nothing has changed for `debounce` seconds.
+"""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import time
+
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_FROM = 0x040
+IN_MOVED_TO = 0x080
+IN_DELETE = 0x200
+IN_Q_OVERFLOW = 0x4000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = os.O_CLOEXEC
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_DELETE
+
+EVENT = struct.Struct("iIII")  # wd, mask, cookie, len; followed by len bytes of name
+
+
+def _inotify():
+    """libc with inotify symbols, or None where inotify is unavailable."""
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+    except OSError:
+        return None
+    return libc if hasattr(libc, "inotify_init1") and hasattr(libc, "inotify_add_watch") else None
+
+
+class InotifyWatcher:
+    def __init__(self, directory, libc):
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        if libc.inotify_add_watch(self.fd, os.fsencode(directory), WATCH_MASK) < 0:
+            errno = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(errno, f"cannot watch {directory}")
+        self.directory = directory
+
+    def close(self):
+        os.close(self.fd)
+
+    def changes(self, timeout):
+        """Names changed within timeout seconds (empty set if none)."""
+        if not select.select([self.fd], [], [], timeout)[0]:
+            return set()
+        names = set()
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return names
+        offset = 0
+        while offset < len(data):
+            _, mask, _, length = EVENT.unpack_from(data, offset)
+            offset += EVENT.size
+            if mask & IN_Q_OVERFLOW:
+                names.update(os.listdir(self.directory))  # lost events: treat everything as changed
+            elif length:
+                names.add(os.fsdecode(data[offset:offset + length].rstrip(b"\0")))
+            offset += length
+        return names
+
+
+class PollingWatcher:
+    def __init__(self, directory, interval=0.25):
+        self.directory = directory
+        self.interval = interval
+        self._snapshot = self._scan()
+
+    def _scan(self):
+        snapshot = {}
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                try:
+                    st = entry.stat()
+                except FileNotFoundError:
+                    continue
+                snapshot[entry.name] = (st.st_size, st.st_mtime_ns)
+        return snapshot
+
+    def close(self):
+        pass
+
+    def changes(self, timeout):
+        time.sleep(min(timeout, self.interval))
+        current = self._scan()
+        previous, self._snapshot = self._snapshot, current
+        return {name for name in previous.keys() | current.keys() if previous.get(name) != current.get(name)}
+
+
+def open_watcher(directory, polling=False):
+    libc = None if polling else _inotify()
+    if libc is not None:
+        try:
+            return InotifyWatcher(directory, libc)
+        except OSError:
+            pass  # out of watches, unsupported filesystem, ...: fall back to polling
+    return PollingWatcher(directory)
+
+
+def watch(directory, accept=None, debounce=0.05, polling=False):
+    """Yield sets of changed file names in directory, forever; accept filters names."""
+    watcher = open_watcher(directory, polling)
+    try:
+        while True:
+            pending = {n for n in watcher.changes(3600) if not accept or accept(n)}
+            if not pending:
+                continue
+            while True:
+                more = watcher.changes(debounce)
+                if not more:
+                    break
+                pending.update(n for n in more if not accept or accept(n))
+            yield pending
+    finally:
+        watcher.close()